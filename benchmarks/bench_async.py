@@ -0,0 +1,106 @@
+"""
+1,000 asyncio clients querying the notes through the async facade.
+
+Every client runs a few rounds of queries drawn from a small set, with an
+edit now and then. Calling the service directly blocks the event loop for
+every scan; the facade keeps the loop responsive (see the worst heartbeat
+lag) and single-flight turns the many identical queries in flight into one
+service call each.
+
+Run with: python -m benchmarks.bench_async [notes]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from repositories import NotesInMemoryRepository
+from services import CreateNoteReq, EditBodyReq, NotesService, RankedFindReq
+from services.async_service import AsyncNotesService
+
+CLIENTS = 1000
+ROUNDS = 5
+QUERIES = [f"topic{i} plan" for i in range(20)]
+
+
+class EmptyStorage:
+    def load(self) -> dict:
+        return {}
+
+
+class NoCoalescing(AsyncNotesService):
+    """Baseline running every read on the service thread"""
+    async def _read(self, fn, *args):
+        return await self._call(fn, *args)
+
+
+class Blocking:
+    """Baseline calling the service on the event loop"""
+    def __init__(self, service: NotesService):
+        self.__service = service
+
+    async def find_ranked(self, req):
+        return self.__service.find_ranked(req)
+
+    async def edit_body(self, req):
+        return self.__service.edit_body(req)
+
+    async def close(self):
+        pass
+
+
+async def heartbeat(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def client(notes, rng: random.Random, count: int) -> None:
+    for _ in range(ROUNDS):
+        if rng.random() < 0.01:
+            note_id = rng.randrange(1, count + 1)
+            await notes.edit_body(EditBodyReq(note_id, f"edited {rng.random()}"))
+        else:
+            await notes.find_ranked(RankedFindReq(rng.choice(QUERIES)))
+
+
+async def run(label: str, make, count: int) -> None:
+    repo = NotesInMemoryRepository(EmptyStorage())
+    service = NotesService(repo, repo, cache_size=0)
+    service.add_many(
+        CreateNoteReq(
+            f"Note {i}", f"topic{i % 20} plan and notes {i} " * 10, [f"t{i % 50}"]
+        )
+        for i in range(count)
+    )
+    notes = make(service, repo)
+    lags: list[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.ensure_future(heartbeat(lags, stop))
+    rng = random.Random(1)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(notes, rng, count) for _ in range(CLIENTS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    await notes.close()
+
+    stats = service.cache_stats()
+    print(
+        f"  {label:<16} {elapsed:7.2f}s  {stats.misses:5} service scans  "
+        f"worst loop lag {max(lags, default=0) * 1000:7.1f}ms"
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{count} notes, {CLIENTS} clients x {ROUNDS} rounds")
+    asyncio.run(run("blocking", lambda service, _: Blocking(service), count))
+    asyncio.run(run("facade", NoCoalescing, count))
+    asyncio.run(run("single-flight", AsyncNotesService, count))
+
+
+if __name__ == "__main__":
+    main()
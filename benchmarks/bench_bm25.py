@@ -0,0 +1,81 @@
+"""
+search-notes BM25 ranking against scoring every note per query.
+
+Run with: python -m benchmarks.bench_bm25 [notes]
+"""
+import heapq
+import math
+import random
+import sys
+import time
+from collections import Counter
+
+from models import Note
+from services.bm25_index import BM25Index
+from services.text import tokenize
+
+WORDS = [f"word{i}" for i in range(5_000)]
+QUERIES = ["word1 word2", "word42 word4242", "word7 word77 word777", "missing"]
+
+
+def naive_search(notes: list[Note], query: str, limit: int = 10) -> list:
+    """BM25 recomputed from scratch: tokenize and score every note"""
+    docs = [
+        Counter(tokenize(n.body.value)) + Counter(tokenize(n.title.value) * 3)
+        for n in notes
+    ]
+    lengths = [sum(d.values()) for d in docs]
+    average = sum(lengths) / len(docs)
+    terms = set(tokenize(query))
+    df = {t: sum(1 for d in docs if t in d) for t in terms}
+    scores = []
+    for note, doc, length in zip(notes, docs, lengths):
+        score = 0.0
+        for term in terms:
+            if doc[term]:
+                idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+                norm = 1.2 * (0.25 + 0.75 * length / average)
+                score += idf * doc[term] * 2.2 / (doc[term] + norm)
+        if score:
+            scores.append((note.note_id, score))
+    return heapq.nlargest(limit, scores, key=lambda p: p[1])
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rng = random.Random(0)
+    # zipf-like word distribution, so common terms have long postings
+    weights = [1 / (i + 1) for i in range(len(WORDS))]
+    notes = [
+        Note(i, " ".join(rng.choices(WORDS, weights, k=3)),
+             " ".join(rng.choices(WORDS, weights, k=40)))
+        for i in range(count)
+    ]
+
+    index = BM25Index()
+    start = time.perf_counter()
+    for note in notes:
+        index.upsert(note.note_id, note)
+    print(f"index {count} notes: {time.perf_counter() - start:8.3f}s")
+
+    start = time.perf_counter()
+    for note in notes[:1_000]:
+        index.upsert(note.note_id, note)
+    print(f"re-index 1000 edits:  {time.perf_counter() - start:8.3f}s")
+
+    start = time.perf_counter()
+    for query in QUERIES:
+        index.search(query)
+    elapsed = time.perf_counter() - start
+    print(f"indexed, {len(QUERIES)} queries: {elapsed:8.3f}s")
+
+    sample = notes[:min(count, 50_000)]
+    start = time.perf_counter()
+    for query in QUERIES:
+        naive_search(sample, query)
+    elapsed = time.perf_counter() - start
+    print(f"full scan, {len(sample)} notes: {elapsed:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
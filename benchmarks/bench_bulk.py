@@ -0,0 +1,63 @@
+"""
+Bulk inserts against one add per record, with the service indexes attached.
+
+Run with: python -m benchmarks.bench_bulk [records]
+"""
+import sys
+import time
+
+from models import Contact
+from models.values import Phone
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from services import CreateNoteReq, NotesService
+from services.contacts_service import ContactsService
+
+
+class EmptyStorage:
+    def load(self) -> dict:
+        return {}
+
+
+def _letters(number: int) -> str:
+    """Spell a number with letters, names can't contain digits"""
+    return "".join("abcdefghij"[int(d)] for d in str(number))
+
+
+def timed(label: str, run) -> None:
+    start = time.perf_counter()
+    run()
+    print(f"  {label:<12} {time.perf_counter() - start:8.3f}s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    reqs = [
+        CreateNoteReq(f"Note {i}", "some body text", ["work"]) for i in range(count)
+    ]
+    rows = [(f"Contact {_letters(i)}", f"+38067{i:07d}") for i in range(count)]
+
+    def notes_service() -> NotesService:
+        repo = NotesInMemoryRepository(EmptyStorage())
+        return NotesService(repo, repo)
+
+    def contacts_service() -> ContactsService:
+        return ContactsService(ContactsInMemoryRepository(EmptyStorage()))
+
+    print(f"add {count} notes")
+    timed("one by one", lambda: [
+        service.add_note(req) for service in [notes_service()] for req in reqs
+    ])
+    timed("add_many", lambda: notes_service().add_many(reqs))
+
+    print(f"add or merge {count} contacts")
+    timed("one by one", lambda: [
+        service.add_contact_or_phone(name, phone)
+        for service in [contacts_service()] for name, phone in rows
+    ])
+    timed("upsert_many", lambda: contacts_service().upsert_many(
+        Contact(name, phones=[Phone(phone)]) for name, phone in rows
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Birthday and note date aggregations over columns against walking the records.
+
+Run with: python -m benchmarks.bench_columns [rows]
+"""
+import random
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from repositories.columns import ColumnStore, day_of_year, epoch_seconds
+from services import analytics
+
+
+def timed(label: str, run) -> None:
+    start = time.perf_counter()
+    run()
+    print(f"  {label:<16} {time.perf_counter() - start:8.3f}s")
+
+
+def _parse(birthday: str) -> date:
+    return datetime.strptime(birthday, "%d.%m.%Y").date()
+
+
+def _celebrated(birthday: date, year: int) -> date:
+    if (birthday.month, birthday.day) == (2, 29):
+        return date(year, 3, 1) - timedelta(days=1)
+    return birthday.replace(year=year)
+
+
+def _store(records, columns) -> ColumnStore:
+    store = ColumnStore(columns)
+    for key, record in enumerate(records):
+        store.upsert(key, record)
+    return store
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(7)
+    first, start = date(1950, 1, 1), datetime(2025, 1, 1)
+    contacts = [
+        SimpleNamespace(birthday=first + timedelta(days=rng.randrange(25_000)))
+        for _ in range(count)
+    ]
+    for contact in contacts:
+        contact.birthday = f"{contact.birthday:%d.%m.%Y}"
+    notes = [
+        SimpleNamespace(updated_at=start + timedelta(seconds=rng.randrange(10**8)))
+        for _ in range(count)
+    ]
+
+    def walk_months():
+        counts = Counter(_parse(c.birthday).month for c in contacts)
+        return [counts[m] for m in range(1, 13)]
+
+    def walk_weekends():
+        return [
+            c for c in contacts
+            if _celebrated(_parse(c.birthday), 2027).weekday() >= 5
+        ]
+
+    def walk_weeks():
+        return sorted(Counter(
+            (d := n.updated_at.date()) - timedelta(days=d.weekday()) for n in notes
+        ).items())
+
+    print(f"{count} rows, walking the records")
+    timed("months", walk_months)
+    timed("weekends", walk_weekends)
+    timed("weeks", walk_weeks)
+
+    for label in ("numpy", "python"):
+        with ExitStack() as stack:
+            if label == "python":
+                stack.enter_context(mock.patch("repositories.columns.numpy", None))
+                stack.enter_context(mock.patch("services.analytics.numpy", None))
+            elif analytics.numpy is None:
+                print("numpy is not installed, skipped")
+                continue
+
+            print(f"{count} rows, {label} columns")
+            birthdays = _store(contacts, {
+                "birthday_day": lambda c: day_of_year(_parse(c.birthday)),
+            })
+            updates = _store(notes, {
+                "updated": lambda n: epoch_seconds(n.updated_at),
+            })
+            timed("months", lambda: analytics.birthdays_per_month(
+                birthdays.columns()
+            ))
+            timed("weekends", lambda: analytics.weekend_birthdays(
+                birthdays.columns(), 2027
+            ))
+            timed("weeks", lambda: analytics.per_week(updates.columns(), "updated"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Argument completion from sorted prefix indexes against a startswith scan.
+
+Run with: python -m benchmarks.bench_completion [contacts] [tags]
+"""
+import random
+import string
+import sys
+import time
+
+from services.completion_index import PrefixIndex
+
+PREFIXES = ["a", "jo", "mar", "zzz", "Qx"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+
+def timed(label: str, complete, repeat: int = 100) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for prefix in PREFIXES:
+            complete(prefix)
+    elapsed = (time.perf_counter() - start) / (repeat * len(PREFIXES))
+    print(f"  {label:<8} {elapsed * 1e6:10.1f}us per Tab")
+
+
+def main():
+    contacts = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tags = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    rng = random.Random(0)
+
+    for label, count in (("names", contacts), ("tags", tags)):
+        values = [_word(rng).title() for _ in range(count)]
+        start = time.perf_counter()
+        index = PrefixIndex()
+        index.update(values)
+        print(f"{count} {label}, built in {time.perf_counter() - start:.3f}s")
+        timed("scan", lambda p: [
+            v for v in values if v.casefold().startswith(p.casefold())
+        ][:200], repeat=5)
+        timed("bisect", lambda p: index.complete(p, 200))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Read throughput of a concurrent repository by reader thread count.
+
+Lookups hold the reader-writer lock shared, so readers overlap wherever the
+interpreter lets them: on a GIL build pure-Python lookups are still
+serialized by the GIL, while work releasing it (simulated with a 1ms sleep
+under the lock) scales with the readers. An exclusive lock is the baseline.
+
+Run with: python -m benchmarks.bench_concurrency [notes]
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime as DateTime
+
+from models import Note
+from repositories import NotesInMemoryRepository
+from repositories.rwlock import ReadWriteLock
+
+
+class EmptyStorage:
+    def load(self) -> dict:
+        return {}
+
+
+class ExclusiveLock:
+    """Baseline serializing readers too"""
+    def __init__(self):
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def read(self):
+        with self.__lock:
+            yield
+
+
+def throughput(threads: int, seconds: float, read) -> float:
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def run(slot: int):
+        while not stop.is_set():
+            read()
+            counts[slot] += 1
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / seconds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    day = DateTime(2026, 1, 1)
+    repo = NotesInMemoryRepository(EmptyStorage(), concurrent=True)
+    repo.add_many(Note(i, f"Note {i}", "text", None, day) for i in range(1, count + 1))
+
+    print(f"{count} notes, reads/s")
+    for threads in (1, 2, 4, 8):
+        gets = throughput(threads, 0.5, lambda: repo.get(threads))
+        print(f"  {threads} threads, get      {gets:12.0f}")
+
+    for label, lock in (("rwlock", ReadWriteLock()), ("exclusive", ExclusiveLock())):
+        def slow_read():
+            with lock.read():
+                time.sleep(0.001)
+        for threads in (1, 2, 4, 8):
+            reads = throughput(threads, 0.5, slow_read)
+            print(f"  {threads} threads, 1ms {label:<10} {reads:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+CSV contact import: cleaning throughput per worker count, then a full import.
+
+Cleaning scales with the cores; merging into the repository and its indexes
+stays in the main process.
+
+Run with: python -m benchmarks.bench_csv_import [rows]
+"""
+import io
+import os
+import sys
+import time
+
+from repositories import ContactsInMemoryRepository
+from services.contacts_service import ContactsService
+from services.csv_import import clean_chunks, read_chunks
+
+
+class EmptyStorage:
+    def load(self) -> dict:
+        return {}
+
+
+def _letters(number: int) -> str:
+    """Spell a number with letters, names can't contain digits"""
+    return "".join("abcdefghij"[int(d)] for d in str(number))
+
+
+def _csv(count: int) -> str:
+    rows = ["name,phones,email,birthday,address"]
+    rows.extend(
+        f"Contact {_letters(i)},067 {i:07d};050{i:07d},Contact{i}@Mail.com,"
+        f"{1 + i % 28}/{1 + i % 12}/{1950 + i % 60},Kyiv  st. {1 + i % 200}"
+        for i in range(count)
+    )
+    return "\n".join(rows) + "\n"
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    text = _csv(count)
+    cores = os.cpu_count() or 1
+    print(f"{count} rows, {cores} cores")
+
+    for workers in sorted({1, 2, 4, cores}):
+        start = time.perf_counter()
+        rows = sum(
+            len(chunk.records)
+            for chunk in clean_chunks(
+                "contacts", read_chunks(io.StringIO(text), "contacts"), workers
+            )
+        )
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed
+        print(f"  clean, {workers} workers {elapsed:8.3f}s {rate:10.0f} rows/s")
+
+    service = ContactsService(ContactsInMemoryRepository(EmptyStorage()))
+    start = time.perf_counter()
+    for chunk in clean_chunks("contacts", read_chunks(io.StringIO(text), "contacts")):
+        service.import_records(chunk.records)
+    print(f"  full import      {time.perf_counter() - start:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
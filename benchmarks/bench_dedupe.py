@@ -0,0 +1,62 @@
+"""
+Duplicate contacts by blocking keys against scoring every pair.
+
+Run with: python -m benchmarks.bench_dedupe [contacts]
+"""
+import random
+import sys
+import time
+
+from models import Contact
+from models.values import Email, Phone
+from services.dedupe import DuplicateFinder, score
+
+
+def _letters(number: int) -> str:
+    """Spell a number with letters, names can't contain digits"""
+    return "".join("abcdefghij"[int(d)] for d in str(number))
+
+
+FIRST = [f"F{_letters(i)}" for i in range(2_000)]
+LAST = [f"L{_letters(i)}" for i in range(20_000)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(0)
+    contacts = {}
+    for i in range(count):
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)} M{_letters(i)}"
+        if contacts and rng.random() < 0.05:
+            # the same person imported again under another spelling
+            source = rng.choice(list(contacts.values())[-1_000:])
+            contacts[name] = Contact(name, source.email, list(source.phones))
+            continue
+        phone = f"+38067{rng.randrange(10**7):07d}"
+        email = f"user{rng.randrange(count * 10)}@mail.com"
+        contacts[name] = Contact(name, Email(email), [Phone(phone)])
+
+    finder = DuplicateFinder()
+    start = time.perf_counter()
+    for name, contact in contacts.items():
+        finder.upsert(name, contact)
+    print(f"block {count} contacts: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    matches = finder.find(contacts.__getitem__)
+    print(f"find: {len(matches)} pairs in {time.perf_counter() - start:.2f}s")
+
+    sample = list(contacts.values())[:2_000]
+    start = time.perf_counter()
+    for i, first in enumerate(sample):
+        for second in sample[i + 1:]:
+            score(first, second)
+    elapsed = time.perf_counter() - start
+    print(
+        f"all pairs of {len(sample)} contacts: {elapsed:.2f}s, "
+        f"~{elapsed * (count / len(sample)) ** 2 / 60:.0f}min for {count}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Flush throughput of FileStorage under each durability policy.
+
+Run with: python -m benchmarks.bench_flush
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from models import Note
+from repositories import NotesInMemoryRepository
+from services import NotesService, EditBodyReq, CreateNoteReq
+from storage import FileStorage, Durability, PickleSerializer
+
+NOTES = 1_000
+FLUSHES = 200
+
+
+def bench(durability: Durability, directory: str) -> float:
+    """Return flushes per second for one small edit between flushes."""
+    storage = FileStorage[int, Note](
+        str(Path(directory) / durability.value), PickleSerializer(),
+        use_home_dir=False, durability=durability,
+    )
+    repo = NotesInMemoryRepository(storage)
+    service = NotesService(repo, repo)
+    for i in range(NOTES):
+        service.add_note(CreateNoteReq(f"Note {i}", "body " * 20, ["bench"]))
+    repo.flush()
+
+    start = time.perf_counter()
+    for i in range(FLUSHES):
+        service.edit_body(EditBodyReq(i % NOTES + 1, f"edited {i}"))
+        repo.flush()
+    storage.sync()
+    return FLUSHES / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{NOTES} notes, {FLUSHES} flushes with one edited note each")
+    with tempfile.TemporaryDirectory() as directory:
+        for durability in Durability:
+            rate = bench(durability, directory)
+            print(f"  {durability.value:<8} {rate:10.1f} flushes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+"Did you mean" lookups in the deletion index against a full edit distance scan.
+
+Run with: python -m benchmarks.bench_fuzzy [names]
+"""
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+from models import Contact
+from services.fuzzy_index import edit_distance, FuzzyNameIndex
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    """Substitute one letter and swap two neighbours"""
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    chars[i] = rng.choice(string.ascii_lowercase)
+    j = rng.randrange(len(chars) - 1)
+    chars[j], chars[j + 1] = chars[j + 1], chars[j]
+    return "".join(chars)
+
+
+def build(names: list[str]) -> FuzzyNameIndex:
+    index = FuzzyNameIndex()
+    for name in names:
+        index.upsert(name, Contact(name))
+    return index
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(0)
+    names = list({
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))).title()
+        for _ in range(count)
+    })
+    queries = [_typo(rng.choice(names), rng) for _ in range(1_000)]
+
+    start = time.perf_counter()
+    index = build(names)
+    print(f"index {len(names)} names: {time.perf_counter() - start:8.3f}s")
+
+    tracemalloc.start()
+    measured = build(names)
+    print(f"index memory:    {tracemalloc.get_traced_memory()[0] / 2**20:8.0f}MiB")
+    tracemalloc.stop()
+    del measured
+
+    start = time.perf_counter()
+    for query in queries:
+        index.lookup(query)
+    elapsed = time.perf_counter() - start
+    print(f"indexed lookup:  {elapsed / len(queries) * 1e3:8.3f}ms per query")
+
+    keys = [name.casefold() for name in names]
+    start = time.perf_counter()
+    for query in queries[:10]:
+        query = query.casefold()
+        [k for k in keys if edit_distance(query, k, 2) <= 2]
+    elapsed = time.perf_counter() - start
+    print(f"full scan:       {elapsed / 10 * 1e3:8.3f}ms per query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Load cost of the indexed note format compared to pickle.
+
+Run with: python -m benchmarks.bench_indexed_notes [notes]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from models import Note
+from models.values import Tag
+from storage import FileStorage, IndexedNoteSerializer, PickleSerializer
+
+BODY = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40 + "\n") * 2
+
+
+def bench(name: str, serializer, notes: dict[int, Note], directory: str):
+    storage = FileStorage[int, Note](
+        str(Path(directory) / name), serializer, use_home_dir=False
+    )
+    storage.save(notes)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = storage.load()
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for note in loaded.values():
+        note.preview()
+    preview_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"  {name:<8} load {load_time:7.2f}s  preview all {preview_time:6.2f}s  "
+        f"peak python heap {peak / 2**20:8.1f} MiB"
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tags = {Tag("work"), Tag("bench")}
+    notes = {
+        i: Note(i, f"Note {i}", BODY, tags) for i in range(1, count + 1)
+    }
+    print(f"{count} notes with {len(BODY)} byte bodies")
+    with tempfile.TemporaryDirectory() as directory:
+        bench("pickle", PickleSerializer(), notes, directory)
+        bench("indexed", IndexedNoteSerializer(), notes, directory)
+
+
+if __name__ == "__main__":
+    main()
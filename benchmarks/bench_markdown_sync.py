@@ -0,0 +1,52 @@
+"""
+Markdown sync of a large directory: first export, no-op and one-file syncs.
+
+Run with: python -m benchmarks.bench_markdown_sync [notes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from repositories import NotesInMemoryRepository
+from services import CreateNoteReq, NotesService
+from services.markdown_sync import MarkdownSync
+
+
+class EmptyStorage:
+    def load(self) -> dict:
+        return {}
+
+
+def timed(label: str, run) -> None:
+    start = time.perf_counter()
+    report = run()
+    print(
+        f"  {label:<16} {time.perf_counter() - start:8.3f}s "
+        f"({len(report.written)} written, {len(report.updated)} updated)"
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repo = NotesInMemoryRepository(EmptyStorage())
+    service = NotesService(repo, repo)
+    service.add_many(
+        CreateNoteReq(f"Note {i}", f"body of note {i}\n" * 20, ["work", f"t{i % 50}"])
+        for i in range(count)
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        sync = MarkdownSync(service, directory)
+        print(f"{count} notes")
+        timed("first sync", sync.sync)
+        timed("no-op sync", sync.sync)
+
+        path = os.path.join(directory, "1-note-0.md")
+        with open(path, "a", encoding="utf-8") as file:
+            file.write("one more line\n")
+        timed("one file edited", sync.sync)
+
+
+if __name__ == "__main__":
+    main()
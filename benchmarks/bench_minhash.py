@@ -0,0 +1,73 @@
+"""
+Near-duplicate notes from LSH buckets against comparing every pair.
+
+Run with: python -m benchmarks.bench_minhash [notes]
+"""
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from services.minhash_index import MinHashIndex, shingles
+
+WORDS = [f"word{i}" for i in range(20_000)]
+
+
+def _note(title: str, body: str) -> SimpleNamespace:
+    """Stands in for a Note, the index only reads title and body values"""
+    return SimpleNamespace(
+        title=SimpleNamespace(value=title), body=SimpleNamespace(value=body)
+    )
+
+
+def naive_pairs(notes: list, threshold: float = 0.5) -> int:
+    """Exact Jaccard over every pair of notes"""
+    sets = [shingles(f"{n.title.value} {n.body.value}") for n in notes]
+    found = 0
+    for i, first in enumerate(sets):
+        for second in sets[i + 1:]:
+            if len(first & second) >= threshold * len(first | second):
+                found += 1
+    return found
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(0)
+    notes = []
+    for i in range(count):
+        if notes and rng.random() < 0.05:
+            # a pasted copy with one word changed
+            source = rng.choice(notes)
+            words = source.body.value.split()
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            notes.append(_note(source.title.value, " ".join(words)))
+        else:
+            notes.append(_note(f"Note {i}", " ".join(rng.choices(WORDS, k=30))))
+
+    index = MinHashIndex()
+    start = time.perf_counter()
+    for note_id, note in enumerate(notes):
+        index.upsert(note_id, note)
+    elapsed = time.perf_counter() - start
+    print(
+        f"signatures of {count} notes: {elapsed:.2f}s "
+        f"({elapsed / count * 1e6:.1f}us per add/edit)"
+    )
+
+    start = time.perf_counter()
+    clusters = index.clusters()
+    print(f"clusters: {len(clusters)} in {time.perf_counter() - start:.2f}s")
+
+    sample = notes[:2_000]
+    start = time.perf_counter()
+    naive_pairs(sample)
+    elapsed = time.perf_counter() - start
+    print(
+        f"naive pairs over {len(sample)} notes: {elapsed:.2f}s, "
+        f"~{elapsed * (count / len(sample)) ** 2 / 3600:.0f}h for {count}"
+    )
+
+
+if __name__ == "__main__":
+    main()
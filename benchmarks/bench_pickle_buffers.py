@@ -0,0 +1,56 @@
+"""
+Save and load of multi-MB note bodies with and without out-of-band buffers.
+
+Run with: python -m benchmarks.bench_pickle_buffers [notes] [body MiB]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from models import Note
+from storage import Durability, FileStorage, PickleSerializer
+
+
+def measure(action):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def bench(name: str, serializer: PickleSerializer, notes: dict, directory: str):
+    path = str(Path(directory) / name)
+    storage = FileStorage[int, Note](
+        path, serializer, use_home_dir=False, durability=Durability.NONE
+    )
+    _, save_time, save_peak = measure(lambda: storage.save(notes))
+    loader = FileStorage[int, Note](path, serializer, use_home_dir=False)
+    loaded, load_time, load_peak = measure(loader.load)
+    assert len(loaded) == len(notes)
+    print(
+        f"  {name:<12} save {save_time:6.3f}s peak {save_peak:8.1f} MiB   "
+        f"load {load_time:6.3f}s peak {load_peak:8.1f} MiB"
+    )
+    return loaded
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    body = "x" * (size * 2**20 - 1) + "\n"
+    notes = {i: Note(i, f"Note {i}", body + str(i)) for i in range(1, count + 1)}
+    print(f"{count} notes with {size} MiB bodies")
+    with tempfile.TemporaryDirectory() as directory:
+        bench("in-band", PickleSerializer(min_buffer_size=2**62), notes, directory)
+        loaded = bench("out-of-band", PickleSerializer(), notes, directory)
+        # bodies loaded from the mapped file are saved again without copies
+        bench("re-save", PickleSerializer(), loaded, directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Related notes from the TF-IDF inverted index against comparing every note.
+
+Run with: python -m benchmarks.bench_related [notes]
+"""
+import heapq
+import math
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+from models import Note
+from models.values import Tag
+from services.related_index import RelatedNotesIndex
+from services.text import tokenize
+
+WORDS = [f"word{i}" for i in range(20_000)]
+TAGS = [Tag(f"tag{i}") for i in range(200)]
+
+
+def naive_related(notes: list[Note], note: Note, limit: int = 5) -> list:
+    """Tokenize every note and compute its cosine with the open one"""
+    def vector(n: Note) -> Counter:
+        return Counter(tokenize(f"{n.title.value} {n.body.value}"))
+
+    query = vector(note)
+    query_norm = math.sqrt(sum(v * v for v in query.values()))
+    scores = []
+    for other in notes:
+        doc = vector(other)
+        dot = sum(tf * doc[t] for t, tf in query.items() if t in doc)
+        if dot and other is not note:
+            norm = math.sqrt(sum(v * v for v in doc.values()))
+            scores.append((other.note_id, dot / query_norm / norm))
+    return heapq.nlargest(limit, scores, key=lambda p: p[1])
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(0)
+    # zipf-like word distribution, so common terms have long postings
+    weights = [1 / (i + 1) for i in range(len(WORDS))]
+    notes = [
+        Note(
+            i,
+            " ".join(rng.choices(WORDS, weights, k=3)),
+            " ".join(rng.choices(WORDS, weights, k=40)),
+            set(rng.sample(TAGS, 2)),
+        )
+        for i in range(1, count + 1)
+    ]
+
+    index = RelatedNotesIndex()
+    start = time.perf_counter()
+    for note in notes:
+        index.upsert(note.note_id, note)
+    print(f"index {count} notes: {time.perf_counter() - start:.2f}s")
+
+    index.related(1)  # norms are computed once for the loaded corpus
+    timings = []
+    for note in rng.sample(notes, 200):
+        start = time.perf_counter()
+        index.related(note.note_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(
+        f"related: mean {statistics.mean(timings):.2f}ms, "
+        f"p95 {timings[int(len(timings) * 0.95)]:.2f}ms"
+    )
+
+    sample = notes[:20_000]
+    start = time.perf_counter()
+    naive_related(sample, sample[0])
+    print(f"naive over {len(sample)} notes: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+find and find-notes scans with cached search keys against the previous
+per-call normalization.
+
+Run with: python -m benchmarks.bench_search [records]
+"""
+import re
+import sys
+import time
+
+from models import Contact, Note
+from models.values import Email, Phone
+
+QUERIES = ["contact ecec", "*@example.com", "+380670004242", "nobody"]
+NOTE_QUERIES = ["note 4242", "lorem", "missing text"]
+BODY = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 150
+
+
+def _letters(number: int) -> str:
+    """Spell a number with letters, names can't contain digits"""
+    return "".join("abcdefghij"[int(d)] for d in str(number))
+
+
+def legacy_is_matching(contact: Contact, search: str) -> bool:
+    """Contact.is_matching before the search keys were cached"""
+    search_values = [contact.name.value]
+    search_values.extend(str(phone) for phone in contact.phones)
+
+    if contact.email:
+        search_values.append(contact.email.value)
+    if contact.address:
+        search_values.append(contact.address.value)
+    if contact.birthday:
+        search_values.append(contact.birthday.value)
+
+    search_lower = search.casefold()
+
+    # Perform regex search
+    if "*" in search:
+        regex_pattern = re.escape(search_lower).replace(r'\*', '.*')
+        regex_pattern = f"^{regex_pattern}$"
+        return any(
+            re.match(regex_pattern, val.casefold()) is not None
+            for val in search_values
+        )
+
+    # Perform exact search
+    return any(search_lower == val.casefold() for val in search_values)
+
+
+def legacy_contains(note: Note, substr: str) -> bool:
+    """Note.contains before the search keys were cached"""
+    substr = substr.strip().lower()
+    return substr in note.title.value.lower() or substr in note.body.value.lower()
+
+
+def timed(label: str, scan) -> None:
+    scan()  # warm up the caches
+    start = time.perf_counter()
+    scan()
+    print(f"  {label:<8} {time.perf_counter() - start:8.3f}s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    contacts = [
+        Contact(
+            f"Contact {_letters(i)}",
+            email=Email(f"user{i}@example.com"),
+            phones=[Phone(f"+38067{i:07d}")],
+        )
+        for i in range(count)
+    ]
+    notes = [Note(i, f"Note {i}", BODY) for i in range(count)]
+
+    print(f"find over {count} contacts, {len(QUERIES)} queries")
+    timed("before", lambda: [
+        [c for c in contacts if legacy_is_matching(c, q)] for q in QUERIES
+    ])
+    timed("after", lambda: [
+        [c for c in contacts if matches(c)]
+        for matches in map(Contact.search_matcher, QUERIES)
+    ])
+
+    print(f"find-notes over {count} notes, {len(NOTE_QUERIES)} queries")
+    timed("before", lambda: [
+        [n for n in notes if legacy_contains(n, q)] for q in NOTE_QUERIES
+    ])
+    timed("after", lambda: [
+        [n for n in notes if n.contains_needle(needle)]
+        for needle in map(Note.search_needle, NOTE_QUERIES)
+    ])
+
+
+if __name__ == "__main__":
+    main()
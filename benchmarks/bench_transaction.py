@@ -0,0 +1,51 @@
+"""
+Renaming a tag across many notes: a flush per edited note against one
+transaction with a single flush at commit.
+
+Run with: python -m benchmarks.bench_transaction [notes]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.unit_of_work import UnitOfWork
+from models import Note
+from models.values import Tag
+from repositories import NotesInMemoryRepository
+from services import EditTagsReq, NotesService, RenameTagReq
+from storage import Durability, FileStorage, PickleSerializer
+
+
+def setup(directory: str, name: str, count: int) -> tuple:
+    storage = FileStorage[int, Note](
+        str(Path(directory) / name), PickleSerializer(),
+        use_home_dir=False, durability=Durability.ALWAYS,
+    )
+    storage.save({
+        i: Note(i, f"Note {i}", "body " * 20, {Tag("work")})
+        for i in range(1, count + 1)
+    })
+    repo = NotesInMemoryRepository(storage)
+    return repo, NotesService(repo, repo)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    with tempfile.TemporaryDirectory() as directory:
+        repo, service = setup(directory, "per_note", count)
+        start = time.perf_counter()
+        for note in repo.all():
+            service.edit_tags(EditTagsReq(note.note_id, ["job"]))
+            repo.flush()
+        print(f"flush per note:   {time.perf_counter() - start:8.3f}s")
+
+        repo, service = setup(directory, "transaction", count)
+        start = time.perf_counter()
+        with UnitOfWork([repo]).transaction():
+            service.rename_tag(RenameTagReq("work", "job"))
+        print(f"one transaction:  {time.perf_counter() - start:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Field construction one by one against validate_batch, per field type, with
+the former inline re/strptime birthday parsing as a baseline.
+
+Run with: python -m benchmarks.bench_validation [values]
+"""
+import random
+import re
+import sys
+import time
+from datetime import date, datetime
+
+from models.values import Address, Birthday, Email, Phone, Tag, validate_batch
+
+
+def timed(label: str, count: int, run) -> None:
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<12} {elapsed:8.3f}s {elapsed / count * 1e6:8.2f}us/value")
+
+
+def _construct(cls, values) -> None:
+    for value in values:
+        try:
+            cls(value)
+        except ValueError:
+            pass
+
+
+def _inline_birthday(value: str) -> str:
+    value = re.sub(r"[/-]", ".", value.strip())
+    if not re.fullmatch(r"\d{1,2}\.\d{1,2}\.\d{4}", value):
+        raise ValueError("Birthday must be in format DD.MM.YYYY")
+    day, month, _ = value.split(".")
+    if not 1 <= int(day) <= 31 or not 1 <= int(month) <= 12:
+        raise ValueError("Out of range")
+    birthday = datetime.strptime(value, "%d.%m.%Y").date()
+    if birthday > date.today():
+        raise ValueError("Birthday cannot be in the future")
+    return datetime.strptime(value, "%d.%m.%Y").strftime("%d.%m.%Y")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rnd = random.Random(7)
+    samples = {
+        "phone": (Phone, [
+            f"0{rnd.randint(10, 99)} {rnd.randint(100, 999)} {rnd.randint(1000, 9999)}"
+            for _ in range(count)
+        ]),
+        "email": (Email, [f"User{i}@Example.com" for i in range(count)]),
+        "address": (Address, [
+            f"Kyiv,  Khreshchatyk  st. {rnd.randint(1, 200)}" for _ in range(count)
+        ]),
+        "birthday": (Birthday, [
+            f"{rnd.randint(1, 31)}/{rnd.randint(1, 12)}/{rnd.randint(1950, 2010)}"
+            for _ in range(count)
+        ]),
+        "tag": (Tag, [
+            rnd.choice(["Work", "Home Stuff", "to-do"]) for _ in range(count)
+        ]),
+    }
+
+    for kind, (cls, values) in samples.items():
+        print(f"{kind}, {count} values")
+        timed("constructor", count, lambda: _construct(cls, values))
+        timed("batch", count, lambda: validate_batch(kind, values))
+        if kind == "birthday":
+            def inline():
+                for value in values:
+                    try:
+                        _inline_birthday(value)
+                    except ValueError:
+                        pass
+            timed("inline re", count, inline)
+
+
+if __name__ == "__main__":
+    main()
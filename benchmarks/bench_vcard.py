@@ -0,0 +1,70 @@
+"""
+Streaming vCard import and export of a generated address book.
+
+Run with: python -m benchmarks.bench_vcard [cards]
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from repositories import ContactsInMemoryRepository
+from services.contacts_service import ContactsService
+from services.vcard import parse_vcards
+
+
+class EmptyStorage:
+    def load(self) -> dict:
+        return {}
+
+
+def _letters(number: int) -> str:
+    """Spell a number with letters, names can't contain digits"""
+    return "".join("abcdefghij"[int(d)] for d in str(number))
+
+
+def _card(i: int) -> str:
+    name = f"Contact {_letters(i).capitalize()}"
+    return (
+        "BEGIN:VCARD\r\nVERSION:3.0\r\n"
+        f"FN:{name}\r\nN:{name.split()[1]};Contact;;;\r\n"
+        f"TEL;TYPE=CELL:+38067{i:07d}\r\n"
+        f"EMAIL;TYPE=INTERNET:contact{i}@mail.com\r\n"
+        f"BDAY:{1950 + i % 60}-{1 + i % 12:02d}-{1 + i % 28:02d}\r\n"
+        f"ADR;TYPE=HOME:;;Khreshchatyk st. {1 + i % 200};Kyiv;;01001;Ukraine\r\n"
+        "END:VCARD\r\n"
+    )
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    service = ContactsService(ContactsInMemoryRepository(EmptyStorage()))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "contacts.vcf")
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            file.writelines(_card(i) for i in range(count))
+        size = os.path.getsize(path) / 2**20
+        print(f"{count} cards, {size:.1f}MB, peak RSS before {_peak_rss_mb():.0f}MB")
+
+        start = time.perf_counter()
+        with open(path, encoding="utf-8") as file:
+            result = service.import_vcards(parse_vcards(file))
+        print(
+            f"  import {time.perf_counter() - start:8.3f}s, "
+            f"{len(result.added)} added, {len(result.errors)} skipped, "
+            f"peak RSS {_peak_rss_mb():.0f}MB"
+        )
+
+        start = time.perf_counter()
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            file.writelines(service.export_vcards())
+        print(f"  export {time.perf_counter() - start:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
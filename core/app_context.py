@@ -1,3 +1,7 @@
+from contextlib import AbstractContextManager
+from typing import Optional
+
+from core.unit_of_work import UnitOfWork
 from services.contacts_service import ContactsService
 from services.notes_service import NotesService
 
@@ -10,6 +14,16 @@ class AppContext:
         contacts (ContactsService): Service for managing contacts.
         notes (NotesService): Service for managing notes.
     """
-    def __init__(self, contacts_service: ContactsService, notes_service: NotesService):
+    def __init__(
+        self,
+        contacts_service: ContactsService,
+        notes_service: NotesService,
+        unit_of_work: Optional[UnitOfWork] = None,
+    ):
         self.contacts = contacts_service
         self.notes = notes_service
+        self.__unit_of_work = unit_of_work or UnitOfWork([])
+
+    def transaction(self) -> AbstractContextManager[None]:
+        """Run a block atomically over the repositories, see UnitOfWork."""
+        return self.__unit_of_work.transaction()
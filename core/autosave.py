@@ -0,0 +1,200 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, Protocol
+
+from exceptions import ConflictError
+
+# cap of the delay between retries of a failing background save, seconds
+MAX_BACKOFF = 300.0
+
+
+class Persistable(Protocol):
+    """Repository that can be snapshotted and flushed to its storage"""
+    @property
+    def generation(self) -> int: ...
+    def snapshot(self) -> dict: ...
+    def flush(self, snapshot: Optional[dict] = None) -> None: ...
+    def refresh(self) -> bool: ...
+
+
+class AutosaveScheduler:
+    """
+    Background persistence of the repositories.
+
+    A save is triggered after ``max_mutations`` changes or after
+    ``idle_seconds`` without commands once something has changed.
+    Snapshots are taken while no command runs, serialization and the atomic
+    file replace happen on a worker thread, so the prompt stays responsive.
+    Save requests arriving while a save is in flight are coalesced into
+    a single follow-up save.
+
+    A failed save is retried ``idle_seconds`` later, the delay doubling
+    while the failures go on. A conflict with another session is not
+    retried, the rest was saved. The last error of a background save is
+    kept for ``take_error``, so it can be shown at the next command.
+    """
+    def __init__(
+        self,
+        targets: Iterable[Persistable],
+        max_mutations: int = 20,
+        idle_seconds: float = 10.0,
+    ):
+        self.__targets: list[Persistable] = list(targets)
+        self.__max_mutations: int = max_mutations
+        self.__idle_seconds: float = idle_seconds
+        # Held by commands, so snapshots never observe a half-applied change
+        self.__state_lock = threading.RLock()
+        self.__cond = threading.Condition()
+        self.__saved: list[int] = self.__generations()
+        self.__dirty: bool = False
+        self.__requested: bool = False
+        self.__in_flight: bool = False
+        self.__stopped: bool = False
+        self.__last_activity: float = time.monotonic()
+        self.__error: Optional[Exception] = None
+        self.__backoff: float = 0.0
+        self.__retry_at: float = 0.0
+        self.__worker = threading.Thread(
+            target=self.__run, name="autosave", daemon=True
+        )
+
+    @property
+    def in_flight(self) -> bool:
+        """Whether a background save is running right now"""
+        return self.__in_flight
+
+    def start(self) -> "AutosaveScheduler":
+        """Start the background worker"""
+        self.__worker.start()
+        return self
+
+    @contextmanager
+    def command(self) -> Iterator[None]:
+        """
+        Run a command with exclusive access to the repositories.
+
+        Changes made by other sessions are merged in before the command runs.
+        """
+        with self.__state_lock:
+            for target in self.__targets:
+                target.refresh()
+            yield
+            pending = self.__pending_mutations()
+
+        with self.__cond:
+            self.__last_activity = time.monotonic()
+            if pending:
+                self.__dirty = True
+            if pending >= self.__max_mutations:
+                self.__requested = True
+            self.__cond.notify_all()
+
+    def request_save(self) -> None:
+        """Ask for a background save; coalesced with a save in flight"""
+        with self.__cond:
+            self.__requested = True
+            self.__cond.notify_all()
+
+    def take_error(self) -> Optional[Exception]:
+        """Return and forget the last error of a background save"""
+        with self.__cond:
+            error, self.__error = self.__error, None
+            return error
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until no save is requested or running"""
+        with self.__cond:
+            return self.__cond.wait_for(
+                lambda: not (self.__requested or self.__in_flight),
+                timeout,
+            )
+
+    def close(self) -> None:
+        """Stop the worker, wait for the save in flight and flush the rest."""
+        if not self.__worker.is_alive():
+            return
+
+        with self.__cond:
+            self.__stopped = True
+            self.__cond.notify_all()
+        self.__worker.join()
+
+        with self.__state_lock:
+            if self.__pending_mutations() or self.__dirty:
+                self.__save()
+
+    def __run(self) -> None:
+        while True:
+            with self.__cond:
+                while not self.__due():
+                    if self.__stopped:
+                        return
+                    self.__cond.wait(self.__wait_timeout())
+                if self.__stopped:
+                    return
+                self.__requested = False
+                self.__in_flight = True
+            error, retry = None, False
+            try:
+                self.__save()
+            except ConflictError as e:
+                # everything else was saved, a retry would have nothing to write
+                error = e
+            except Exception as e:
+                error, retry = e, True
+            finally:
+                with self.__cond:
+                    self.__in_flight = False
+                    self.__failed(error, retry)
+                    self.__cond.notify_all()
+
+    def __failed(self, error: Optional[Exception], retry: bool) -> None:
+        # under the condition
+        if error is not None:
+            self.__error = error
+        if not retry:
+            self.__backoff, self.__retry_at = 0.0, 0.0
+            return
+        # keep the changes pending and back off, the final flush reports it
+        self.__dirty = True
+        self.__backoff = min(self.__backoff * 2 or self.__idle_seconds, MAX_BACKOFF)
+        self.__retry_at = time.monotonic() + self.__backoff
+
+    def __due(self) -> bool:
+        if self.__stopped:
+            return True
+        if time.monotonic() < self.__retry_at:
+            return False
+        return self.__requested or (self.__dirty and self.__wait_timeout() <= 0)
+
+    def __wait_timeout(self) -> Optional[float]:
+        now = time.monotonic()
+        if now < self.__retry_at and (self.__dirty or self.__requested):
+            return self.__retry_at - now
+        if not self.__dirty:
+            return None
+        return max(self.__idle_seconds - (now - self.__last_activity), 0.0)
+
+    def __save(self) -> None:
+        with self.__state_lock:
+            snapshots = [t.snapshot() for t in self.__targets]
+            generations = self.__generations()
+            with self.__cond:
+                self.__dirty = False
+
+        conflicts: list = []
+        for target, snapshot in zip(self.__targets, snapshots):
+            try:
+                target.flush(snapshot)
+            except ConflictError as e:
+                conflicts.extend(e.keys)
+        self.__saved = generations
+        if conflicts:
+            raise ConflictError(conflicts)
+
+    def __pending_mutations(self) -> int:
+        return sum(self.__generations()) - sum(self.__saved)
+
+    def __generations(self) -> list[int]:
+        return [t.generation for t in self.__targets]
@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, Protocol
+
+
+class Transactional(Protocol):
+    """Repository supporting savepoint transactions"""
+    def begin(self) -> None: ...
+    def commit(self) -> None: ...
+    def rollback(self) -> None: ...
+    def flush(self, snapshot: Optional[dict] = None) -> None: ...
+
+
+class UnitOfWork:
+    """
+    Transactions spanning several repositories.
+
+    Changes made inside ``transaction()`` are applied to the repositories as
+    usual, so reads see them, while the repositories remember which records
+    were touched. On success every repository is flushed once, one storage
+    write for the whole batch of edits. On an exception the touched records
+    of every repository are restored and the exception propagates.
+    Nested transactions join the outermost one.
+    """
+    def __init__(self, targets: Iterable[Transactional], flush: bool = True):
+        self.__targets: list[Transactional] = list(targets)
+        self.__flush: bool = flush
+        self.__depth: int = 0
+
+    @property
+    def active(self) -> bool:
+        """Whether a transaction is open"""
+        return self.__depth > 0
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run a block as one atomic unit of work"""
+        if self.__depth:
+            self.__depth += 1
+            try:
+                yield
+            finally:
+                self.__depth -= 1
+            return
+
+        for target in self.__targets:
+            target.begin()
+        self.__depth = 1
+        try:
+            yield
+        except BaseException:
+            for target in self.__targets:
+                target.rollback()
+            raise
+        else:
+            for target in self.__targets:
+                target.commit()
+            if self.__flush:
+                for target in self.__targets:
+                    target.flush()
+        finally:
+            self.__depth = 0
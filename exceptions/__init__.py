@@ -1,7 +1,9 @@
 from exceptions.already_exist_error import AlreadyExistError
+from exceptions.conflict_error import ConflictError
 from exceptions.not_found_error import NotFoundError
 
 __all__ = [
     'AlreadyExistError',
+    'ConflictError',
     'NotFoundError',
 ]
@@ -0,0 +1,13 @@
+from typing import Collection
+
+
+class ConflictError(Exception):
+    """Exception raised when records were changed by another session too."""
+    def __init__(self, keys: Collection = ()):
+        # keys whose version from the other session was kept
+        self.keys: tuple = tuple(keys)
+        self.message = (
+            "Changed by another session, their version was kept: "
+            + ", ".join(map(str, self.keys))
+        )
+        super().__init__(self.message)
@@ -1,5 +1,10 @@
+from typing import Sequence
+
+
 class NotFoundError(Exception):
     """Exception raised when an entity is not found."""
-    def __init__(self, entity="Contact"):
+    def __init__(self, entity="Contact", suggestions: Sequence[str] = ()):
         self.message = f"{entity} not found"
+        # close matches to offer instead, e.g. names within a typo or two
+        self.suggestions: tuple[str, ...] = tuple(suggestions)
         super().__init__(self.message)
@@ -1,7 +1,9 @@
 from .contact import Contact
 from .note import Note
+from .phones import Phones
 
 __all__ = [
     "Contact",
     "Note",
+    "Phones",
 ]
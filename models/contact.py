@@ -1,21 +1,49 @@
 import re
-from typing import Optional
+from typing import Callable, Iterable, Optional
 
 from exceptions import AlreadyExistError, NotFoundError
-from models.values import Name, Email, Phone, Address, Birthday
+from models.phones import Phones
+from models.values import Field, Name, Email, Phone, Address, Birthday
+
+
+class _SearchedField:
+    """Contact attribute the search keys are built from, assigning resets them"""
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.__name = name
+
+    def __get__(self, contact: Optional["Contact"], owner: type = None):
+        if contact is None:
+            return self
+        return contact.__dict__[self.__name]
+
+    def __set__(self, contact: "Contact", value) -> None:
+        # the value stays in the instance dict, as pickles and copies expect
+        contact.__dict__[self.__name] = value
+        contact.__dict__.pop("_Contact__search_keys", None)
 
 
 class Contact:
+    # casefolded field values, built on first search, reset by the mutators
+    # and by assigning a field; phones edited in place through the Phones
+    # object bypass the reset, use add_phone, edit_phone and del_phone
+    __search_keys: Optional[tuple[str, ...]] = None
+
+    name = _SearchedField()
+    email = _SearchedField()
+    phones = _SearchedField()
+    birthday = _SearchedField()
+    address = _SearchedField()
+
     def __init__(
-        self, name: str,
+        self, name: str | Name,
         email: Optional[Email] = None,
-        phones: list[Phone] = None,
+        phones: Iterable[Phone] = None,
         birthday: Optional[Birthday] = None,
         address: Optional[Address] = None,
     ):
-        self.name: Name = Name(name)
+        self.name: Name = name if isinstance(name, Name) else Name(name)
         self.email: Optional[Email] = email
-        self.phones: list[Phone] = phones or []
+        self.phones: Phones = Phones(phones or ())
         self.birthday: Optional[Birthday] = birthday
         self.address: Optional[Address] = address
 
@@ -25,25 +53,17 @@ class Contact:
 
     def add_phone(self, phone: Phone):
         """Add a phone"""
-        if self.__phone_exists(phone):
+        if not self.phones.add(phone):
             raise AlreadyExistError("Phone")
-
-        self.phones.append(phone)
+        self.__search_keys = None
 
     def edit_phone(self, prev_phone: Phone, new_phone: Phone):
         """Edit a phone"""
-        if not self.__phone_exists(prev_phone):
+        if prev_phone not in self.phones:
             raise NotFoundError(f"Phone {prev_phone}")
-        if self.__phone_exists(new_phone):
+        if not self.phones.replace(prev_phone, new_phone):
             raise AlreadyExistError("Phone")
-
-        for i, p in enumerate(self.phones):
-            if p == prev_phone:
-                self.phones[i] = new_phone
-                break
-
-    def __phone_exists(self, phone: Phone) -> bool:
-        return any(p == phone for p in self.phones)
+        self.__search_keys = None
 
     def add_phones(self, phones: list[Phone]):
         """Add multiple phones"""
@@ -58,39 +78,68 @@ class Contact:
         """Set the address"""
         self.address = address
 
-    def is_matching(self, search: str) -> bool:
-        """Check if the contact matches the search"""
-        search_values = [self.name.value]
-        search_values.extend(str(phone) for phone in self.phones)
-
-        if self.email:
-            search_values.append(self.email.value)
-        if self.address:
-            search_values.append(self.address.value)
-        if self.birthday:
-            search_values.append(self.birthday.value)
-
+    @property
+    def search_keys(self) -> tuple[str, ...]:
+        """Casefolded values of all fields, cached until the next change"""
+        if self.__search_keys is None:
+            search_values = [self.name.value]
+            search_values.extend(str(phone) for phone in self.phones)
+
+            if self.email:
+                search_values.append(self.email.value)
+            if self.address:
+                search_values.append(self.address.value)
+            if self.birthday:
+                search_values.append(self.birthday.value)
+
+            self.__search_keys = tuple(v.casefold() for v in search_values)
+        return self.__search_keys
+
+    @staticmethod
+    def search_matcher(search: str) -> Callable[["Contact"], bool]:
+        """Build the predicate for a search once, to apply it to many contacts"""
         search_lower = search.casefold()
 
         # Perform regex search
         if "*" in search:
             regex_pattern = re.escape(search_lower).replace(r'\*', '.*')
-            regex_pattern = f"^{regex_pattern}$"
-            return any(
-                re.match(regex_pattern, val.casefold()) is not None
-                for val in search_values
+            match = re.compile(f"^{regex_pattern}$").match
+            return lambda contact: any(
+                match(val) is not None for val in contact.search_keys
             )
 
         # Perform exact search
-        return any(search_lower == val.casefold() for val in search_values)
+        return lambda contact: search_lower in contact.search_keys
+
+    def is_matching(self, search: str) -> bool:
+        """Check if the contact matches the search"""
+        return Contact.search_matcher(search)(self)
 
     def del_phone(self, phone: Phone):
         """Deletes phone from contact"""
-        for i, phone_number in enumerate(self.phones):
-            if phone_number == phone:
-                del self.phones[i]
-                return True
-        return False
+        if not self.phones.discard(phone):
+            return False
+        self.__search_keys = None
+        return True
+
+    def __getstate__(self) -> dict:
+        # the search cache is rebuilt on demand, it is never persisted
+        state = self.__dict__.copy()
+        state.pop("_Contact__search_keys", None)
+        # phones are stored as a list, the format older files were saved in
+        state["phones"] = list(self.phones)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.phones = Phones(state["phones"])
+
+    def __copy__(self) -> "Contact":
+        """Return a detached copy sharing the immutable field values"""
+        clone = Contact.__new__(Contact)
+        clone.__dict__.update(self.__dict__)
+        clone.phones = Phones(self.phones)
+        return clone
 
     def __str__(self) -> str:
         """Return a human-readable string representation of the contact."""
@@ -117,12 +166,22 @@ class Contact:
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Contact":
-        """Convert the dictionary to a contact"""
+    def from_dict(cls, data: dict, validated: bool = False) -> "Contact":
+        """
+        Convert the dictionary to a contact.
+
+        With validated the values are trusted to be clean already, e.g.
+        produced by the validation rules in another process.
+        """
+        def field(kind: type[Field], value: Optional[str]):
+            if not value:
+                return None
+            return kind.trusted(value) if validated else kind(value)
+
         return cls(
-            name=data["name"],
-            email=Email(data["email"]) if data["email"] else None,
-            phones=[Phone(p) for p in data["phones"]],
-            birthday=Birthday(data["birthday"]) if data["birthday"] else None,
-            address=Address(data["address"]) if data["address"] else None,
+            name=field(Name, data["name"]) if validated else data["name"],
+            email=field(Email, data["email"]),
+            phones=[field(Phone, p) for p in data["phones"]],
+            birthday=field(Birthday, data["birthday"]),
+            address=field(Address, data["address"]),
         )
@@ -1,22 +1,27 @@
 from typing import Collection
 from datetime import datetime as DateTime
-from models.values import Field, Tag, Title
+from models.values import Field, LazyField, Tag, Title
 
 
 class Note:
     short_text_len = 30
+    # lowercased title and body, built on first search, reset on edit
+    __search_key: tuple[str, str | None] | None = None
 
     def __init__(
         self,
         note_id: int,
-        title: str,
-        body: str = "",
+        title: str | Title,
+        body: str | Field = "",
         tags: set[Tag] | None = None,
         created_at: DateTime | None = DateTime.now(),
         updated_at: DateTime | None = None,
     ):
-        self.__title: Title = Title(title.strip())
-        self.__body: Field = Field(body.strip())
+        self.__title: Title = (
+            title if isinstance(title, Title) else Title(title.strip())
+        )
+        # a ready Field (e.g. a LazyField from storage) is kept as is
+        self.__body: Field = body if isinstance(body, Field) else Field(body.strip())
         self.__tags: set[Tag] = tags if tags is not None else set()
         self.__note_id: int = note_id
         self.__created_at: DateTime = created_at
@@ -33,6 +38,25 @@ class Note:
             f"Updated at: {self.__updated_at:%d.%m.%Y}"
         )
 
+    def __getstate__(self) -> dict:
+        # the search cache is rebuilt on demand, it is never persisted
+        state = self.__dict__.copy()
+        state.pop("_Note__search_key", None)
+        return state
+
+    def __copy__(self) -> "Note":
+        """Return a detached copy sharing the immutable field values"""
+        clone = Note.__new__(Note)
+        clone.__dict__.update(self.__dict__)
+        clone.__tags = set(self.__tags)
+        return clone
+
+    def with_id(self, note_id: int) -> "Note":
+        """Return a copy of the note under another id"""
+        clone = self.__copy__()
+        clone.__note_id = note_id
+        return clone
+
     # flake8: noqa: E501 Line too long
     def preview(self) -> str:
         """Get a preview of the note"""
@@ -72,15 +96,34 @@ class Note:
         """Get the body"""
         return self.__body
 
+    @staticmethod
+    def search_needle(substr: str) -> str:
+        """Normalize a search substring once for many notes"""
+        return substr.strip().lower()
+
     def contains(self, substr: str) -> bool:
         """Check if the note contains a substring"""
-        substr = substr.strip().lower()
-        return substr in self.__title.value.lower() \
-            or substr in self.__body.value.lower()
+        return self.contains_needle(Note.search_needle(substr))
+
+    def contains_needle(self, needle: str) -> bool:
+        """Check if the note contains an already normalized substring"""
+        if self.__search_key is None:
+            self.__search_key = (
+                _lowered(self.__title.value),
+                # lazy bodies are not cached to keep them out of memory
+                None if isinstance(self.__body, LazyField)
+                else _lowered(self.__body.value),
+            )
+        title, body = self.__search_key
+        if needle in title:
+            return True
+        if body is None:
+            return needle in self.__body.value.lower()
+        return needle in body
 
     def count_matching_tags(self, tags: Collection[Tag]) -> int:
         """Count the number of matching tags"""
-        return len(self.__tags & set(tags))
+        return len(self.__tags.intersection(tags))
 
     def edit_note(
         self,
@@ -98,6 +141,7 @@ class Note:
         if new_tags is not None:
             self.__tags = new_tags
 
+        self.__search_key = None
         self.__updated_at = DateTime.now()
 
         return self
@@ -118,12 +162,16 @@ class Note:
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Note":
-        """Convert the dictionary to a note"""
-        tags = {Tag(t) for t in data["tags"]}
+    def from_dict(cls, data: dict, validated: bool = False) -> "Note":
+        """Convert the dictionary to a note, with validated the values are trusted"""
+        if validated:
+            title = Title.trusted(data["title"])
+            tags = {Tag.trusted(t) for t in data["tags"]}
+        else:
+            title, tags = data["title"], {Tag(t) for t in data["tags"]}
         return cls(
             note_id=data["note_id"],
-            title=data["title"],
+            title=title,
             body=data["body"],
             tags=tags,
             created_at=DateTime.fromisoformat(data["created_at"]),
@@ -133,7 +181,13 @@ class Note:
     @classmethod
     def field_preview(cls, field: Field) -> str:
         """Get a preview of the field"""
-        preview = field.value.split("\n", 1)[0]
+        preview = field.first_line(cls.short_text_len + 1)
         if len(preview) > cls.short_text_len:
             return preview[:cls.short_text_len] + "..."
         return preview
+
+
+def _lowered(value: str) -> str:
+    """Lowercase a value, reusing it when it is lowercase already"""
+    lowered = value.lower()
+    return value if lowered == value else lowered
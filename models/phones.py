@@ -0,0 +1,71 @@
+from typing import Iterable, Iterator
+
+from models.values import Phone
+
+
+class Phones:
+    """
+    Insertion-ordered set of phones.
+
+    Every phone owns a slot; the slots keep the insertion order and a phone
+    edited in place keeps its slot, so membership, add, edit and delete are
+    O(1) while iteration, indexing and ``len`` behave like the list they
+    replace.
+    """
+    __hash__ = None  # mutable
+
+    def __init__(self, phones: Iterable[Phone] = ()):
+        self.__slots: dict[int, Phone] = {}
+        self.__positions: dict[Phone, int] = {}
+        self.__next_slot: int = 0
+        for phone in phones:
+            self.add(phone)
+
+    def __contains__(self, phone: object) -> bool:
+        return phone in self.__positions
+
+    def __len__(self) -> int:
+        return len(self.__slots)
+
+    def __iter__(self) -> Iterator[Phone]:
+        return iter(self.__slots.values())
+
+    def __getitem__(self, index: int) -> Phone:
+        return list(self.__slots.values())[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Phones, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Phones({[phone.value for phone in self]})"
+
+    def __copy__(self) -> "Phones":
+        return Phones(self)
+
+    def add(self, phone: Phone) -> bool:
+        """Append a phone, False if it is already there"""
+        if phone in self.__positions:
+            return False
+        self.__slots[self.__next_slot] = phone
+        self.__positions[phone] = self.__next_slot
+        self.__next_slot += 1
+        return True
+
+    def replace(self, old: Phone, new: Phone) -> bool:
+        """Put new in the place of old, False if old is missing or new exists"""
+        if old not in self.__positions or new in self.__positions:
+            return False
+        slot = self.__positions.pop(old)
+        self.__slots[slot] = new
+        self.__positions[new] = slot
+        return True
+
+    def discard(self, phone: Phone) -> bool:
+        """Remove a phone, False if it was not there"""
+        slot = self.__positions.pop(phone, None)
+        if slot is None:
+            return False
+        del self.__slots[slot]
+        return True
@@ -6,6 +6,8 @@ from models.values.birthday import Birthday
 from models.values.address import Address
 from models.values.tag import Tag
 from models.values.title import Title
+from models.values.lazy_field import LazyField
+from models.values.batch import InvalidValue, ValidationResult, validate_batch
 
 __all__ = [
     "Field",
@@ -16,4 +18,8 @@ __all__ = [
     "Address",
     "Tag",
     "Title",
+    "LazyField",
+    "InvalidValue",
+    "ValidationResult",
+    "validate_batch",
 ]
@@ -1,6 +1,4 @@
-import re
-
-from models.values import Field
+from models.values import Field, validation
 
 
 class Address(Field):
@@ -11,9 +9,7 @@ class Address(Field):
         Args:
             value (str): The raw address string to normalize and validate.
         """
-        normalized = Address.normalize(value)
-        Address.validate(normalized)
-        super().__init__(normalized)
+        super().__init__(validation.clean_address(value))
 
     @staticmethod
     def normalize(value: str) -> str:
@@ -21,14 +17,7 @@ class Address(Field):
         Clean and standardize an address string
         (trim spaces, fix punctuation, remove invalid characters).
         """
-        value = value.strip()
-        value = re.sub(r"\s+", " ", value)
-        value = re.sub(r"[^a-zA-Zа-яА-ЯіІїЇєЄ0-9\s\.,\-/]", "", value)
-        value = re.sub(r"\.+", ".", value)
-        value = re.sub(r",+", ",", value)
-        value = re.sub(r"\s+\.", ".", value)
-        value = re.sub(r"\s+,", ",", value)
-        return value
+        return validation.normalize_address(value)
 
     @staticmethod
     def validate(value: str):
@@ -36,17 +25,4 @@ class Address(Field):
         Validate that the address is non-empty,
         has a reasonable length, and contains letters and numbers.
         """
-        if not value:
-            raise ValueError("Address should not be empty")
-
-        if len(value) < 5:
-            raise ValueError("Address is too short")
-
-        if len(value) > 200:
-            raise ValueError("Address is too long")
-
-        if not re.search(r"[a-zA-Zа-яА-ЯіІїЇєЄ]", value):
-            raise ValueError("Address must contain letters")
-
-        if not re.search(r"\d", value):
-            raise ValueError("Address must contain a building number")
+        validation.validate_address(value)
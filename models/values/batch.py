@@ -0,0 +1,69 @@
+from dataclasses import dataclass, field
+from datetime import date
+from functools import partial
+from typing import Generic, Iterable, Optional, TypeVar
+
+from models.values import (
+    Address, Birthday, Email, Field, Name, Phone, Tag, Title, validation,
+)
+
+F = TypeVar("F", bound=Field)
+
+FIELDS: dict[str, type[Field]] = {
+    "phone": Phone,
+    "email": Email,
+    "address": Address,
+    "birthday": Birthday,
+    "tag": Tag,
+    "name": Name,
+    "title": Title,
+}
+
+
+@dataclass(frozen=True)
+class InvalidValue:
+    """A raw value of a batch that failed validation"""
+    index: int
+    value: str
+    message: str
+
+
+@dataclass
+class ValidationResult(Generic[F]):
+    """Fields of a batch aligned with its input, None where invalid"""
+    fields: list[Optional[F]] = field(default_factory=list)
+    errors: list[InvalidValue] = field(default_factory=list)
+
+    @property
+    def valid(self) -> list[F]:
+        """The fields that passed, in input order"""
+        return [f for f in self.fields if f is not None]
+
+
+def validate_batch(kind: str, values: Iterable[str]) -> ValidationResult:
+    """
+    Normalize and validate many raw values of one field kind.
+
+    Fields are built from the cleaned values without validating them again,
+    and a failing value is reported with its index instead of stopping the
+    batch. Kinds: phone, email, address, birthday, tag, name, title.
+    """
+    cls = FIELDS.get(kind)
+    if cls is None:
+        raise ValueError(f"Unknown field kind '{kind}', expected: {', '.join(FIELDS)}")
+    clean = validation.CLEANERS[kind]
+    if kind == "birthday":
+        clean = partial(clean, today=date.today())
+
+    fields: list[Optional[Field]] = []
+    errors: list[InvalidValue] = []
+    append, trusted = fields.append, cls.trusted
+    for i, value in enumerate(values):
+        try:
+            cleaned = clean(value)
+        except ValueError as e:
+            append(None)
+            errors.append(InvalidValue(i, value, str(e)))
+            continue
+        append(trusted(cleaned))
+    return ValidationResult(fields, errors)
@@ -1,6 +1,4 @@
-import re
-
-from models.values import Field
+from models.values import Field, validation
 
 
 class Email(Field):
@@ -11,9 +9,7 @@ class Email(Field):
         Args:
             value (str): The raw email string.
         """
-        normalized_value = Email.normalize(value)
-        Email.validate(normalized_value)
-        super().__init__(normalized_value)
+        super().__init__(validation.clean_email(value))
 
     @staticmethod
     def normalize(value: str) -> str:
@@ -26,8 +22,7 @@ class Email(Field):
         Returns:
             str: Normalized email string.
         """
-        value = value.strip()
-        return value.lower()
+        return validation.normalize_email(value)
 
     @staticmethod
     def validate(value: str):
@@ -40,10 +35,4 @@ class Email(Field):
         Raises:
             ValueError: If the email is empty or has an invalid format.
         """
-        if not value:
-            raise ValueError("Email should not be empty")
-
-        pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-
-        if not re.match(pattern, value):
-            raise ValueError("Invalid email format")
+        validation.validate_email(value)
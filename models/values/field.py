@@ -3,8 +3,24 @@ class Field:
     def __init__(self, value: str):
         self.value = value
 
+    @classmethod
+    def trusted(cls, value: str):
+        """Build a field from a value already normalized and validated"""
+        field = cls.__new__(cls)
+        field.value = value
+        return field
+
     def __str__(self) -> str:
         return self.value
 
+    def first_line(self, max_chars: int | None = None) -> str:
+        """Return the first line, cut to max_chars if given"""
+        line = self.value.partition("\n")[0]
+        return line if max_chars is None else line[:max_chars]
+
     def __eq__(self, other) -> bool:
         return isinstance(other, Field) and self.value == other.value
+
+    def __hash__(self) -> int:
+        # values never change after construction, equal fields hash alike
+        return hash(self.value)
@@ -0,0 +1,43 @@
+from models.values import Field
+
+
+class LazyField(Field):
+    """
+    Field decoded on demand from a UTF-8 buffer.
+
+    The buffer is usually a slice of a memory-mapped file, so the text is
+    only paged in and decoded when it is actually read. The decoded value
+    is not cached to keep resident memory bounded.
+    """
+    def __init__(self, buffer: memoryview):
+        """
+        Initialize the field over a buffer without copying it.
+
+        Args:
+            buffer (memoryview): UTF-8 encoded text.
+        """
+        self.__buffer: memoryview = buffer
+
+    @property
+    def buffer(self) -> memoryview:
+        """Get the encoded text without decoding it"""
+        return self.__buffer
+
+    @property
+    def value(self) -> str:
+        """Decode the whole text"""
+        return str(self.__buffer, "utf-8")
+
+    def first_line(self, max_chars: int | None = None) -> str:
+        """Decode the first line only, reading at most what is needed"""
+        buffer = self.__buffer
+        if max_chars is not None:
+            # a UTF-8 character takes up to 4 bytes
+            buffer = buffer[:max_chars * 4]
+        head = bytes(buffer).split(b"\n", 1)[0]
+        line = str(head, "utf-8", errors="ignore")
+        return line if max_chars is None else line[:max_chars]
+
+    def __reduce__(self):
+        # buffers can't be pickled, a copy materializes to a plain Field
+        return Field, (self.value,)
@@ -1,4 +1,4 @@
-from models.values import Field
+from models.values import Field, validation
 
 
 class Name(Field):
@@ -24,11 +24,4 @@ class Name(Field):
         Raises:
             ValueError: If the name is empty or contains invalid characters/spaces.
         """
-        if not value:
-            raise ValueError("Name should not be empty")
-
-        if not all(char.isalpha() or char == ' ' for char in value):
-            raise ValueError("Name can contain only letters and spaces")
-
-        if "  " in value or value.startswith(" ") or value.endswith(" "):
-            raise ValueError("Incorrect usage of spaces in name")
+        validation.validate_name(value)
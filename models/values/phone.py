@@ -1,6 +1,4 @@
-import re
-
-from models.values import Field
+from models.values import Field, validation
 
 
 class Phone(Field):
@@ -11,9 +9,7 @@ class Phone(Field):
         Args:
             value (str): The raw phone number string.
         """
-        normalized_value = Phone.normalize(value)
-        Phone.validate(normalized_value)
-        super().__init__(normalized_value)
+        super().__init__(validation.clean_phone(value))
 
     @staticmethod
     def normalize(value: str) -> str:
@@ -27,12 +23,7 @@ class Phone(Field):
         Returns:
             str: Normalized phone number in format +380XXXXXXXXX.
         """
-        value = re.sub(r"[^\d]", "", value)
-        if value.startswith("380"):
-            value = "+" + value
-        elif value.startswith("0"):
-            value = "+38" + value
-        return value
+        return validation.normalize_phone(value)
 
     @staticmethod
     def validate(value: str):
@@ -46,14 +37,4 @@ class Phone(Field):
         Raises:
             ValueError: If the phone number is empty, invalid, or incorrectly formatted.
         """
-        if not value:
-            raise ValueError("Phone should not be empty")
-
-        if not value[1:].isdigit():
-            raise ValueError("Phone number can contain only digits")
-
-        if not value.startswith("+380"):
-            raise ValueError("Phone should start with +380")
-
-        if len(value) != 13:
-            raise ValueError("Phone must be 13 characters long in format +380XXXXXXXXX")
+        validation.validate_phone(value)
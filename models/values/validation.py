@@ -0,0 +1,187 @@
+"""
+Normalization and validation rules of the value fields.
+
+Patterns are compiled once at import. Every ``clean_*`` function turns a raw
+string into the stored value or raises ValueError with the same messages
+the fields always raised; the fields and ``validate_batch`` share them.
+"""
+import re
+from datetime import date
+from typing import Callable, Optional
+
+_NON_DIGITS = re.compile(r"[^\d]")
+_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+_SPACES = re.compile(r"\s+")
+_ADDRESS_INVALID = re.compile(r"[^a-zA-Zа-яА-ЯіІїЇєЄ0-9\s\.,\-/]")
+_DOTS = re.compile(r"\.+")
+_COMMAS = re.compile(r",+")
+_SPACE_BEFORE_DOT = re.compile(r"\s+\.")
+_SPACE_BEFORE_COMMA = re.compile(r"\s+,")
+_LETTER = re.compile(r"[a-zA-Zа-яА-ЯіІїЇєЄ]")
+_DIGIT = re.compile(r"\d")
+_DATE_SEPARATORS = re.compile(r"[/-]")
+_BIRTHDAY = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})")
+_TAG_INVALID = re.compile(r"[^a-z0-9\-]")
+
+
+def normalize_phone(value: str) -> str:
+    """Keep the digits, with the +380 prefix for local and country formats"""
+    value = _NON_DIGITS.sub("", value)
+    if value.startswith("380"):
+        value = "+" + value
+    elif value.startswith("0"):
+        value = "+38" + value
+    return value
+
+
+def validate_phone(value: str) -> None:
+    """Check a normalized phone is +380 followed by nine digits"""
+    if not value:
+        raise ValueError("Phone should not be empty")
+    if not value[1:].isdigit():
+        raise ValueError("Phone number can contain only digits")
+    if not value.startswith("+380"):
+        raise ValueError("Phone should start with +380")
+    if len(value) != 13:
+        raise ValueError("Phone must be 13 characters long in format +380XXXXXXXXX")
+
+
+def clean_phone(value: str) -> str:
+    """Normalized and validated phone"""
+    value = normalize_phone(value)
+    validate_phone(value)
+    return value
+
+
+def normalize_email(value: str) -> str:
+    """Strip spaces and lowercase"""
+    return value.strip().lower()
+
+
+def validate_email(value: str) -> None:
+    """Check a normalized email is not empty and looks like an address"""
+    if not value:
+        raise ValueError("Email should not be empty")
+    if not _EMAIL.fullmatch(value):
+        raise ValueError("Invalid email format")
+
+
+def clean_email(value: str) -> str:
+    """Normalized and validated email"""
+    value = normalize_email(value)
+    validate_email(value)
+    return value
+
+
+def normalize_address(value: str) -> str:
+    """Collapse spaces, drop unexpected characters and repeated punctuation"""
+    value = _SPACES.sub(" ", value.strip())
+    value = _ADDRESS_INVALID.sub("", value)
+    value = _DOTS.sub(".", value)
+    value = _COMMAS.sub(",", value)
+    value = _SPACE_BEFORE_DOT.sub(".", value)
+    return _SPACE_BEFORE_COMMA.sub(",", value)
+
+
+def validate_address(value: str) -> None:
+    """Check a normalized address has a sane length, letters and a number"""
+    if not value:
+        raise ValueError("Address should not be empty")
+    if len(value) < 5:
+        raise ValueError("Address is too short")
+    if len(value) > 200:
+        raise ValueError("Address is too long")
+    if not _LETTER.search(value):
+        raise ValueError("Address must contain letters")
+    if not _DIGIT.search(value):
+        raise ValueError("Address must contain a building number")
+
+
+def clean_address(value: str) -> str:
+    """Normalized and validated address"""
+    value = normalize_address(value)
+    validate_address(value)
+    return value
+
+
+def normalize_birthday(value: str) -> str:
+    """Strip spaces and use dots as separators"""
+    return _DATE_SEPARATORS.sub(".", value.strip())
+
+
+def parse_birthday(value: str, today: Optional[date] = None) -> date:
+    """Validate a normalized DD.MM.YYYY birthday and return its date"""
+    if not value:
+        raise ValueError("Birthday should not be empty")
+    match = _BIRTHDAY.fullmatch(value)
+    if match is None:
+        raise ValueError("Birthday must be in format DD.MM.YYYY")
+
+    day, month, year = (int(part) for part in match.groups())
+    if not 1 <= day <= 31:
+        raise ValueError("Day must be between 01 and 31")
+    if not 1 <= month <= 12:
+        raise ValueError("Month must be between 01 and 12")
+    try:
+        birthday = date(year, month, day)
+    except ValueError:
+        raise ValueError("Invalid calendar date")
+
+    if birthday > (today or date.today()):
+        raise ValueError("Birthday cannot be in the future")
+    return birthday
+
+
+def clean_birthday(value: str, today: Optional[date] = None) -> str:
+    """Normalized and validated birthday, zero-padded DD.MM.YYYY"""
+    birthday = parse_birthday(normalize_birthday(value), today)
+    return f"{birthday.day:02d}.{birthday.month:02d}.{birthday.year:04d}"
+
+
+def normalize_tag(value: str) -> str:
+    """Lowercase, spaces to dashes, only letters, digits and dashes kept"""
+    value = _SPACES.sub("-", value.strip().lower())
+    return _TAG_INVALID.sub("", value)
+
+
+def clean_tag(value: str) -> str:
+    """Normalized tag, which must not end up empty"""
+    value = normalize_tag(value)
+    if not value:
+        raise ValueError("Tag couldn't be empty")
+    return value
+
+
+def validate_name(value: str) -> None:
+    """Check a name is letters separated by single spaces"""
+    if not value:
+        raise ValueError("Name should not be empty")
+    if not all(char.isalpha() or char == " " for char in value):
+        raise ValueError("Name can contain only letters and spaces")
+    if "  " in value or value.startswith(" ") or value.endswith(" "):
+        raise ValueError("Incorrect usage of spaces in name")
+
+
+def clean_name(value: str) -> str:
+    """Validated name, names are stored as given"""
+    validate_name(value)
+    return value
+
+
+def clean_title(value: str) -> str:
+    """Validated title, which must not be empty"""
+    if not value:
+        raise ValueError("Text couldn't be empty")
+    return value
+
+
+# kind -> function turning a raw string into the stored value
+CLEANERS: dict[str, Callable[[str], str]] = {
+    "phone": clean_phone,
+    "email": clean_email,
+    "address": clean_address,
+    "birthday": clean_birthday,
+    "tag": clean_tag,
+    "name": clean_name,
+    "title": clean_title,
+}
@@ -2,10 +2,12 @@ from repositories.notes_in_memory import NotesInMemoryRepository
 from repositories.contacts_in_memory import ContactsInMemoryRepository
 from repositories.notes_repo import NotesRepository
 from repositories.contacts_repo import ContactsRepository
+from repositories.index import RecordIndex
 
 __all__ = [
     "NotesInMemoryRepository",
     "ContactsInMemoryRepository",
     "NotesRepository",
     "ContactsRepository",
+    "RecordIndex",
 ]
@@ -1,29 +1,129 @@
-from typing import Iterable
+import threading
+from contextlib import AbstractContextManager, ExitStack
+from copy import copy
+from datetime import date
+from typing import Collection, Iterable, Iterator, Optional
 
 from models.contact import Contact
-from exceptions import AlreadyExistError, NotFoundError
+from exceptions import AlreadyExistError, ConflictError, NotFoundError
+from repositories.columns import MISSING, Columns, ColumnStore, day_of_year
+from repositories.index import RecordIndex
 from repositories.storage import Storage
 from repositories.contacts_repo import ContactsRepository
+from repositories.rwlock import NoLock, ReadWriteLock
 
 _sentinel = object()
 
 
 class ContactsInMemoryRepository(ContactsRepository):
-    """Inmemory repository for the contacts"""
-    def __init__(self, storage: Storage[str, Contact]) -> None:
+    """
+    Inmemory repository for the contacts.
+
+    With ``concurrent`` the repository may be shared by threads: reads hold
+    a reader-writer lock shared, mutations hold it exclusively, together
+    with the attached indexes they update, and a transaction holds it from
+    begin to commit or rollback. Readers of attached indexes hold it shared
+    through ``reading``.
+    """
+    def __init__(
+        self, storage: Storage[str, Contact], concurrent: bool = False
+    ) -> None:
+        self.__lock = ReadWriteLock() if concurrent else NoLock()
         self.__storage: Storage[str, Contact] = storage
-        self.__contacts: dict[str, Contact] = storage.load() or {}
+        # Loaded records become the first snapshot, the live dict works on copies
+        self.__snapshot: dict[str, Contact] = storage.load() or {}
+        self.__contacts: dict[str, Contact] = {
+            k: copy(v) for k, v in self.__snapshot.items()
+        }
+        # keys changed since the last snapshot, and not saved to the storage yet
+        self.__dirty: set[str] = set()
+        self.__unsaved: set[str] = set()
+        # keys whose save was a conflict, kept local by the next refresh
+        self.__conflicts: set[str] = set()
+        self.__pending_lock = threading.Lock()
+        self.__generation: int = 0
+        self.__indexes: list[RecordIndex[str, Contact]] = []
+        # state at the start of the open transaction and the keys it touched
+        self.__savepoint: Optional[dict[str, Contact]] = None
+        self.__touched: set[str] = set()
+        # write lock held by the thread owning the open transaction
+        self.__transaction: Optional[ExitStack] = None
+        self.__owner: Optional[int] = None
+        self.__columns: ColumnStore[str, Contact] = ColumnStore({
+            "birthday_day": _birthday_day,
+            "birthday_year": _birthday_year,
+        })
+        self.attach(self.__columns)
+
+    @property
+    def generation(self) -> int:
+        """Counter of the mutations applied to the repository"""
+        return self.__generation
+
+    def attach(self, index: RecordIndex[str, Contact]) -> None:
+        """Attach a secondary index, kept in sync from now on"""
+        with self.__lock.write():
+            load = getattr(index, "load", None)
+            if load is not None:
+                load(self.__contacts.items())
+            else:
+                for key, record in self.__contacts.items():
+                    index.upsert(key, record)
+            self.__indexes.append(index)
+
+    def reading(self) -> AbstractContextManager[None]:
+        """
+        Hold the read lock: the contacts and the attached indexes stay as they
+        are until the block ends. Services take it around index lookups.
+        """
+        return self.__lock.read()
+
+    def columns(self) -> Columns[str]:
+        """Birthday day of the leap year 2000 and year of every contact"""
+        with self.__lock.read():
+            return self.__columns.columns()
 
     def add(self, contact: Contact) -> None:
         """Add a contact to the repository"""
-        if self.__contacts.get(contact.name.value) is not None:
-            raise AlreadyExistError(f"Contact {contact.name.value}")
+        with self.__lock.write():
+            if self.__contacts.get(contact.name.value) is not None:
+                raise AlreadyExistError(f"Contact {contact.name.value}")
+
+            self.__contacts[contact.name.value] = contact
+            self.__touch(contact.name.value)
+
+    def add_many(self, contacts: Iterable[Contact]) -> None:
+        """Add contacts in one batch, none is added if any name is taken"""
+        batch = {}
+        with self.__lock.write():
+            for contact in contacts:
+                name = contact.name.value
+                if name in batch or self.__contacts.get(name) is not None:
+                    raise AlreadyExistError(f"Contact {name}")
+                batch[name] = contact
+
+            self.__contacts.update(batch)
+            self.__touch_many(batch)
 
-        self.__contacts[contact.name.value] = contact
+    def upsert_many(self, contacts: Iterable[Contact]) -> None:
+        """Add or replace contacts in one batch"""
+        batch = {contact.name.value: contact for contact in contacts}
+        with self.__lock.write():
+            self.__contacts.update(batch)
+            self.__touch_many(batch)
+
+    def delete_many(self, names: Iterable[str]) -> list[str]:
+        """Delete contacts in one batch, returns the names that existed"""
+        names = dict.fromkeys(names)
+        with self.__lock.write():
+            deleted = [n for n in names if self.__contacts.pop(n, None) is not None]
+            self.__touch_many(deleted)
+        return deleted
 
     def get(self, name: str, default=_sentinel) -> Contact:
         """Get a contact from the repository"""
-        contact = self.__contacts.get(name)
+        with self.__lock.read():
+            contact = self.__contacts.get(name)
 
         if contact is not None:
             return contact
@@ -33,21 +133,203 @@ class ContactsInMemoryRepository(ContactsRepository):
 
     def delete(self, name: str):
         """Delete a contact from the repository"""
-        self.__contacts.pop(name)
+        with self.__lock.write():
+            self.__contacts.pop(name)
+            self.__touch(name)
 
     def find(self, query: str) -> Iterable[Contact]:
         """Search for contact by all fields"""
-        return [c for c in self.__contacts.values() if c.is_matching(query)]
+        matches = Contact.search_matcher(query)
+        with self.__lock.read():
+            return [c for c in self.__contacts.values() if matches(c)]
 
     def all(self) -> Iterable[Contact]:
         """Get all contacts from the repository"""
-        return list(self.__contacts.values())
+        with self.__lock.read():
+            return list(self.__contacts.values())
+
+    def __iter__(self) -> Iterator[Contact]:
+        """Iterate the contacts present when the iteration starts"""
+        with self.__lock.read():
+            return iter(list(self.__contacts.values()))
 
     def save(self, contact: Contact) -> None:
-        # is not relevant for inmemory storage,
-        # relevant for DBMS (Mongo, Postgresql, etc) adapter
-        ...
+        """Mark a changed contact for the next snapshot"""
+        # relevant for DBMS (Mongo, Postgresql, etc) adapter as a write,
+        # for inmemory storage it only tracks what has to be persisted
+        with self.__lock.write():
+            self.__touch(contact.name.value)
+
+    def snapshot(self) -> dict[str, Contact]:
+        """
+        Return a consistent point-in-time copy of the contacts.
+
+        Only contacts changed since the previous snapshot are copied, the rest
+        are shared with it. The returned dict must be treated as read-only.
+        """
+        with self.__lock.write():
+            if self.__dirty:
+                snapshot = self.__snapshot.copy()
+                for name in self.__dirty:
+                    contact = self.__contacts.get(name)
+                    if contact is None:
+                        snapshot.pop(name, None)
+                    else:
+                        snapshot[name] = copy(contact)
+                with self.__pending_lock:
+                    self.__snapshot = snapshot
+                    self.__dirty.clear()
+
+            return self.__snapshot
+
+    def refresh(self) -> bool:
+        """
+        Merge contacts changed by other sessions since the last sync.
+
+        Only the changed records are replaced. Records changed locally keep
+        the local version until their save returned, snapshots taken for a
+        save in flight included, and saving them is a conflict. After the
+        conflict was raised by the save, the local version stays in memory
+        and is saved over theirs once changed again.
+        """
+        if not self.__storage.changed():
+            return False
+
+        with self.__pending_lock:
+            conflicts, self.__conflicts = self.__conflicts, set()
+            unsaved = self.__unsaved | self.__dirty
+        # their version of unsaved records is not taken, saving ours conflicts
+        upserts, deletes = self.__storage.load_changes(unsaved - conflicts)
+        if not upserts and not deletes:
+            return False
+
+        with self.__lock.write():
+            unsaved |= conflicts
+            snapshot = self.__snapshot.copy()
+            for name, contact in upserts.items():
+                if name not in unsaved:
+                    snapshot[name] = contact
+                    self.__contacts[name] = copy(contact)
+                    self.__reindex(name)
+            for name in deletes:
+                if name not in unsaved:
+                    snapshot.pop(name, None)
+                    self.__contacts.pop(name, None)
+                    self.__reindex(name)
+            self.__snapshot = snapshot
+            self.__generation += 1
+        return True
+
+    def begin(self) -> None:
+        """
+        Start a transaction, later changes can be rolled back as a whole.
+
+        The calling thread holds the write lock until commit or rollback,
+        other threads wait for the transaction to end.
+        """
+        transaction = ExitStack()
+        transaction.enter_context(self.__lock.write())
+        if self.__savepoint is not None:
+            transaction.close()
+            raise RuntimeError("A transaction is already open")
+        self.__transaction = transaction
+        self.__owner = threading.get_ident()
+        self.__savepoint = self.snapshot()
+
+    def commit(self) -> None:
+        """Keep the changes of the open transaction"""
+        self.__check_owner()
+        with self.__lock.write():
+            self.__end()
+
+    def rollback(self) -> None:
+        """Restore the records touched since begin, indexes included"""
+        self.__check_owner()
+        with self.__lock.write():
+            savepoint, touched = self.__savepoint, self.__touched
+            if savepoint is not None and touched:
+                # rebuilt in savepoint order, so restored deletes keep their place
+                self.__contacts = {
+                    k: copy(v) if k in touched else self.__contacts.get(k, v)
+                    for k, v in savepoint.items()
+                }
+                self.__touch_many(touched)
+            self.__end()
+
+    def flush(self, snapshot: Optional[dict[str, Contact]] = None) -> None:
+        """Flush the repository (or a snapshot taken from it) to the storage"""
+        if snapshot is None:
+            snapshot = self.snapshot()
+        try:
+            self.__storage.save(snapshot)
+        except ConflictError as e:
+            self.__saved(snapshot, set(e.keys))
+            raise
+        self.__saved(snapshot)
+
+    def __end(self) -> None:
+        # called last: releasing the transaction lock ends exclusive access
+        transaction = self.__transaction
+        self.__savepoint, self.__touched = None, set()
+        self.__transaction, self.__owner = None, None
+        if transaction is not None:
+            transaction.close()
+
+    def __check_owner(self) -> None:
+        if self.__owner not in (None, threading.get_ident()):
+            raise RuntimeError("The open transaction belongs to another thread")
+
+    def __saved(
+        self, snapshot: dict[str, Contact], conflicts: Collection[str] = ()
+    ) -> None:
+        # keys changed again after the snapshot stay unsaved
+        with self.__pending_lock:
+            self.__unsaved = {
+                k for k in self.__unsaved
+                if k in self.__dirty or snapshot.get(k) is not self.__snapshot.get(k)
+            }
+            self.__conflicts.update(conflicts)
+
+    def __touch_many(self, names: Iterable[str]) -> None:
+        # one generation step for the whole batch, each record indexed once
+        names = list(names)
+        if not names:
+            return
+        with self.__pending_lock:
+            self.__dirty.update(names)
+            self.__unsaved.update(names)
+        if self.__savepoint is not None:
+            self.__touched.update(names)
+        self.__generation += 1
+        for name in names:
+            self.__reindex(name)
+
+    def __touch(self, name: str) -> None:
+        with self.__pending_lock:
+            self.__dirty.add(name)
+            self.__unsaved.add(name)
+        if self.__savepoint is not None:
+            self.__touched.add(name)
+        self.__generation += 1
+        self.__reindex(name)
+
+    def __reindex(self, name: str) -> None:
+        record = self.__contacts.get(name)
+        for index in self.__indexes:
+            if record is None:
+                index.remove(name)
+            else:
+                index.upsert(name, record)
+
+
+def _birthday_day(contact: Contact) -> int:
+    if contact.birthday is None:
+        return MISSING
+    day, month, _ = contact.birthday.value.split(".")
+    return day_of_year(date(2000, int(month), int(day)))
+
 
-    def flush(self) -> None:
-        """Flush the repository to the storage"""
-        self.__storage.save(self.__contacts)
+def _birthday_year(contact: Contact) -> int:
+    if contact.birthday is None:
+        return MISSING
+    return int(contact.birthday.value.rpartition(".")[2])
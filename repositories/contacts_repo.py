@@ -1,13 +1,25 @@
-from typing import Iterable, Protocol
+from contextlib import AbstractContextManager
+from typing import Iterable, Iterator, Protocol
 
 from models.contact import Contact
+from repositories.columns import Columns
+from repositories.index import RecordIndex
 
 
 class ContactsRepository(Protocol):
     """Repository for the notes"""
+    @property
+    def generation(self) -> int: ...
+    def attach(self, index: RecordIndex[str, Contact]) -> None: ...
+    def reading(self) -> AbstractContextManager[None]: ...
+    def columns(self) -> Columns[str]: ...
     def add(self, contact: Contact) -> None: ...
+    def add_many(self, contacts: Iterable[Contact]) -> None: ...
+    def upsert_many(self, contacts: Iterable[Contact]) -> None: ...
+    def delete_many(self, names: Iterable[str]) -> list[str]: ...
     def get(self, name: str, default) -> Contact: ...
     def delete(self, name: str) -> None: ...
     def find(self, query: str) -> Iterable[Contact]: ...
     def all(self) -> Iterable[Contact]: ...
+    def __iter__(self) -> Iterator[Contact]: ...
     def save(self, contact: Contact) -> None: ...
@@ -0,0 +1,21 @@
+from typing import Protocol, TypeVar
+
+K = TypeVar("K", contravariant=True)
+T = TypeVar("T", contravariant=True)
+
+
+class RecordIndex(Protocol[K, T]):
+    """
+    Secondary index kept in sync with a repository.
+
+    The repository calls ``upsert`` for every added or changed record and
+    ``remove`` for every deleted one, including changes merged in from
+    other sessions. Indexes keep their own per-key state, so a changed
+    record can be re-indexed without knowing its previous value.
+
+    An index may also define ``load(records)``, taking (key, record) pairs:
+    ``attach`` then hands it the records already stored in one call instead
+    of one ``upsert`` each, so it can build its initial state in bulk.
+    """
+    def upsert(self, key: K, record: T) -> None: ...
+    def remove(self, key: K) -> None: ...
@@ -1,28 +1,129 @@
-from typing import Optional, Iterable, Collection
+import threading
+from contextlib import AbstractContextManager, ExitStack
+from copy import copy
+from typing import Optional, Iterable, Iterator, Collection
 
 from models.note import Note, Tag
-from exceptions import NotFoundError
-from repositories.storage import Storage
+from exceptions import ConflictError, NotFoundError
+from repositories.columns import Columns, ColumnStore, epoch_seconds
+from repositories.index import RecordIndex
+from repositories.storage import KeyReserving, Storage
 from repositories.notes_repo import NotesRepository
+from repositories.rwlock import NoLock, ReadWriteLock
 from services.id_gen import IDGenerator
 
 _sentinel = object()
 
 
 class NotesInMemoryRepository(NotesRepository, IDGenerator):
-    """Inmemory repository for the notes"""
-    def __init__(self, storage: Storage[int, Note]) -> None:
+    """
+    Inmemory repository for the notes.
+
+    With ``concurrent`` the repository may be shared by threads: reads hold
+    a reader-writer lock shared, mutations hold it exclusively, together
+    with the attached indexes they update, and a transaction holds it from
+    begin to commit or rollback. Readers of attached indexes hold it shared
+    through ``reading``. Note ids are always handed out atomically,
+    by ``ids`` when given, so every session sharing it gets distinct ones.
+    """
+    def __init__(
+        self,
+        storage: Storage[int, Note],
+        concurrent: bool = False,
+        ids: Optional[KeyReserving] = None,
+    ) -> None:
+        self.__lock = ReadWriteLock() if concurrent else NoLock()
+        self.__id_lock = threading.Lock()
         self.__storage: Storage[int, Note] = storage
-        self.__notes: dict[int, Note] = storage.load() or {}
+        self.__ids: Optional[KeyReserving] = ids
+        # Loaded records become the first snapshot, the live dict works on copies
+        self.__snapshot: dict[int, Note] = storage.load() or {}
+        self.__notes: dict[int, Note] = {
+            k: copy(v) for k, v in self.__snapshot.items()
+        }
+        # keys changed since the last snapshot, and not saved to the storage yet
+        self.__dirty: set[int] = set()
+        self.__unsaved: set[int] = set()
+        # keys whose save was a conflict, kept local by the next refresh
+        self.__conflicts: set[int] = set()
+        self.__pending_lock = threading.Lock()
+        self.__generation: int = 0
+        self.__indexes: list[RecordIndex[int, Note]] = []
+        # state at the start of the open transaction and the keys it touched
+        self.__savepoint: Optional[dict[int, Note]] = None
+        self.__touched: set[int] = set()
+        self.__savepoint_last_id: int = 0
+        # write lock held by the thread owning the open transaction
+        self.__transaction: Optional[ExitStack] = None
+        self.__owner: Optional[int] = None
+        # highest id handed to other threads while the transaction is open
+        self.__given_last_id: int = 0
         self.last_id = max(self.__notes, default=0)
+        self.__columns: ColumnStore[int, Note] = ColumnStore({
+            "created": lambda note: epoch_seconds(note.created_at),
+            "updated": lambda note: epoch_seconds(note.updated_at),
+        })
+        self.attach(self.__columns)
+
+    @property
+    def generation(self) -> int:
+        """Counter of the mutations applied to the repository"""
+        return self.__generation
+
+    def attach(self, index: RecordIndex[int, Note]) -> None:
+        """Attach a secondary index, kept in sync from now on"""
+        with self.__lock.write():
+            load = getattr(index, "load", None)
+            if load is not None:
+                load(self.__notes.items())
+            else:
+                for key, record in self.__notes.items():
+                    index.upsert(key, record)
+            self.__indexes.append(index)
+
+    def reading(self) -> AbstractContextManager[None]:
+        """
+        Hold the read lock: the notes and the attached indexes stay as they
+        are until the block ends. Services take it around index lookups.
+        """
+        return self.__lock.read()
+
+    def columns(self) -> Columns[int]:
+        """Creation and last update of every note, in epoch seconds"""
+        with self.__lock.read():
+            return self.__columns.columns()
 
     def add(self, note: Note) -> None:
         """Add a note to the repository"""
-        self.__notes[note.note_id] = note
+        with self.__lock.write():
+            self.__notes[note.note_id] = note
+            self.__touch(note.note_id)
+
+    def add_many(self, notes: Iterable[Note]) -> None:
+        """Add or replace notes in one batch"""
+        self.upsert_many(notes)
+
+    def upsert_many(self, notes: Iterable[Note]) -> None:
+        """Add or replace notes in one batch"""
+        batch = {note.note_id: note for note in notes}
+        with self.__lock.write():
+            self.__notes.update(batch)
+            with self.__id_lock:
+                self.last_id = max(self.last_id, max(batch, default=0))
+            self.__touch_many(batch)
+
+    def delete_many(self, note_ids: Iterable[int]) -> list[int]:
+        """Delete notes in one batch, returns the ids that existed"""
+        note_ids = dict.fromkeys(note_ids)
+        with self.__lock.write():
+            deleted = [i for i in note_ids if self.__notes.pop(i, None) is not None]
+            self.__touch_many(deleted)
+        return deleted
 
     def get(self, note_id: int, default=_sentinel) -> Optional[Note]:
         """Get a note from the repository"""
-        note = self.__notes.get(note_id)
+        with self.__lock.read():
+            note = self.__notes.get(note_id)
 
         if note is not None:
             return note
@@ -32,37 +133,229 @@ class NotesInMemoryRepository(NotesRepository, IDGenerator):
 
     def all(self) -> Iterable[Note]:
         """Get all notes from the repository"""
-        return list(self.__notes.values())
+        with self.__lock.read():
+            return list(self.__notes.values())
+
+    def __iter__(self) -> Iterator[Note]:
+        """Iterate the notes present when the iteration starts"""
+        with self.__lock.read():
+            return iter(list(self.__notes.values()))
 
     def find(self, query: str) -> Iterable[Note]:
         """Search for notes by title"""
-        return [n for n in self.__notes.values() if n.contains(query)]
+        needle = Note.search_needle(query)
+        with self.__lock.read():
+            return [n for n in self.__notes.values() if n.contains_needle(needle)]
 
     def find_by_tags(self, tags: Collection[Tag]) -> Iterable[Note]:
         """Search for notes by tags"""
-        return [
-            n for n in self.__notes.values()
-            if n.count_matching_tags(tags) > 0
-        ]
+        with self.__lock.read():
+            return [
+                n for n in self.__notes.values()
+                if n.count_matching_tags(tags) > 0
+            ]
 
     def delete(self, note_id: int) -> None:
         """Delete a note from the repository"""
-        self.__notes.pop(note_id, None)
+        with self.__lock.write():
+            if self.__notes.pop(note_id, None) is not None:
+                self.__touch(note_id)
 
     def save(self, note: Note) -> None:
-        """Update a note in the repository"""
-        # is not relevant for inmemory storage,
-        # relevant for DBMS (Mongo, Postgresql, etc) adapter
-        ...
+        """Mark a changed note for the next snapshot"""
+        # relevant for DBMS (Mongo, Postgresql, etc) adapter as a write,
+        # for inmemory storage it only tracks what has to be persisted
+        with self.__lock.write():
+            self.__touch(note.note_id)
 
     def generate(self) -> int:
         """
-        Generate a new note id. In this case we use  counter, but in real cases
-        it could be value returned from DB.
+        Generate a new note id, reserved by ``ids`` for every session sharing
+        it when given, from a counter otherwise.
+        """
+        return self.reserve(1).start
+
+    def reserve(self, count: int) -> range:
+        """Reserve a block of count consecutive note ids"""
+        with self.__id_lock:
+            if self.__ids is not None and count > 0:
+                ids = self.__ids.reserve_ids(count, self.last_id)
+            else:
+                ids = range(self.last_id + 1, self.last_id + count + 1)
+            self.last_id = max(self.last_id, ids.stop - 1)
+            self.__give(self.last_id)
+        return ids
+
+    def snapshot(self) -> dict[int, Note]:
+        """
+        Return a consistent point-in-time copy of the notes.
+
+        Only notes changed since the previous snapshot are copied, the rest
+        are shared with it. The returned dict must be treated as read-only.
+        """
+        with self.__lock.write():
+            if self.__dirty:
+                snapshot = self.__snapshot.copy()
+                for note_id in self.__dirty:
+                    note = self.__notes.get(note_id)
+                    if note is None:
+                        snapshot.pop(note_id, None)
+                    else:
+                        snapshot[note_id] = copy(note)
+                with self.__pending_lock:
+                    self.__snapshot = snapshot
+                    self.__dirty.clear()
+
+            return self.__snapshot
+
+    def refresh(self) -> bool:
+        """
+        Merge notes changed by other sessions since the last sync.
+
+        Only the changed records are replaced. Records changed locally keep
+        the local version until their save returned, snapshots taken for a
+        save in flight included, and saving them is a conflict. After the
+        conflict was raised by the save, the local version stays in memory
+        and is saved over theirs once changed again.
+        """
+        if not self.__storage.changed():
+            return False
+
+        with self.__pending_lock:
+            conflicts, self.__conflicts = self.__conflicts, set()
+            unsaved = self.__unsaved | self.__dirty
+        # their version of unsaved records is not taken, saving ours conflicts
+        upserts, deletes = self.__storage.load_changes(unsaved - conflicts)
+        if not upserts and not deletes:
+            return False
+
+        with self.__lock.write():
+            unsaved |= conflicts
+            snapshot = self.__snapshot.copy()
+            for note_id, note in upserts.items():
+                if note_id not in unsaved:
+                    snapshot[note_id] = note
+                    self.__notes[note_id] = copy(note)
+                    self.__reindex(note_id)
+            for note_id in deletes:
+                if note_id not in unsaved:
+                    snapshot.pop(note_id, None)
+                    self.__notes.pop(note_id, None)
+                    self.__reindex(note_id)
+            with self.__id_lock:
+                self.last_id = max(self.last_id, max(upserts, default=0))
+            self.__snapshot = snapshot
+            self.__generation += 1
+        return True
+
+    def begin(self) -> None:
+        """
+        Start a transaction, later changes can be rolled back as a whole.
+
+        The calling thread holds the write lock until commit or rollback,
+        other threads wait for the transaction to end.
         """
-        self.last_id += 1
-        return self.last_id
+        transaction = ExitStack()
+        transaction.enter_context(self.__lock.write())
+        if self.__savepoint is not None:
+            transaction.close()
+            raise RuntimeError("A transaction is already open")
+        self.__transaction = transaction
+        self.__owner = threading.get_ident()
+        self.__savepoint = self.snapshot()
+        with self.__id_lock:
+            self.__savepoint_last_id = self.last_id
+            self.__given_last_id = 0
+
+    def commit(self) -> None:
+        """Keep the changes of the open transaction"""
+        self.__check_owner()
+        with self.__lock.write():
+            self.__end()
+
+    def rollback(self) -> None:
+        """Restore the records touched since begin, indexes included"""
+        self.__check_owner()
+        with self.__lock.write():
+            savepoint, touched = self.__savepoint, self.__touched
+            if savepoint is not None and touched:
+                # rebuilt in savepoint order, so restored deletes keep their place
+                self.__notes = {
+                    k: copy(v) if k in touched else self.__notes.get(k, v)
+                    for k, v in savepoint.items()
+                }
+                # ids given to other threads meanwhile are never handed out again
+                with self.__id_lock:
+                    self.last_id = max(self.__savepoint_last_id, self.__given_last_id)
+                self.__touch_many(touched)
+            self.__end()
+
+    def flush(self, snapshot: Optional[dict[int, Note]] = None) -> None:
+        """Flush the repository (or a snapshot taken from it) to the storage"""
+        if snapshot is None:
+            snapshot = self.snapshot()
+        try:
+            self.__storage.save(snapshot)
+        except ConflictError as e:
+            self.__saved(snapshot, set(e.keys))
+            raise
+        self.__saved(snapshot)
+
+    def __end(self) -> None:
+        # called last: releasing the transaction lock ends exclusive access
+        transaction = self.__transaction
+        self.__savepoint, self.__touched = None, set()
+        self.__transaction, self.__owner = None, None
+        if transaction is not None:
+            transaction.close()
+
+    def __check_owner(self) -> None:
+        if self.__owner not in (None, threading.get_ident()):
+            raise RuntimeError("The open transaction belongs to another thread")
+
+    def __give(self, last_id: int) -> None:
+        # under the id lock
+        if self.__owner not in (None, threading.get_ident()):
+            self.__given_last_id = max(self.__given_last_id, last_id)
+
+    def __saved(
+        self, snapshot: dict[int, Note], conflicts: Collection[int] = ()
+    ) -> None:
+        # keys changed again after the snapshot stay unsaved
+        with self.__pending_lock:
+            self.__unsaved = {
+                k for k in self.__unsaved
+                if k in self.__dirty or snapshot.get(k) is not self.__snapshot.get(k)
+            }
+            self.__conflicts.update(conflicts)
+
+    def __touch_many(self, note_ids: Iterable[int]) -> None:
+        # one generation step for the whole batch, each record indexed once
+        note_ids = list(note_ids)
+        if not note_ids:
+            return
+        with self.__pending_lock:
+            self.__dirty.update(note_ids)
+            self.__unsaved.update(note_ids)
+        if self.__savepoint is not None:
+            self.__touched.update(note_ids)
+        self.__generation += 1
+        for note_id in note_ids:
+            self.__reindex(note_id)
+
+    def __touch(self, note_id: int) -> None:
+        with self.__pending_lock:
+            self.__dirty.add(note_id)
+            self.__unsaved.add(note_id)
+        if self.__savepoint is not None:
+            self.__touched.add(note_id)
+        self.__generation += 1
+        self.__reindex(note_id)
 
-    def flush(self) -> None:
-        """Flush the repository to the storage"""
-        self.__storage.save(self.__notes)
+    def __reindex(self, note_id: int) -> None:
+        record = self.__notes.get(note_id)
+        for index in self.__indexes:
+            if record is None:
+                index.remove(note_id)
+            else:
+                index.upsert(note_id, record)
@@ -1,13 +1,25 @@
-from typing import Optional, Iterable, Protocol, Collection
+from contextlib import AbstractContextManager
+from typing import Optional, Iterable, Iterator, Protocol, Collection
 
 from models.note import Note, Tag
+from repositories.columns import Columns
+from repositories.index import RecordIndex
 
 
 class NotesRepository(Protocol):
     """Repository for the notes"""
+    @property
+    def generation(self) -> int: ...
+    def attach(self, index: RecordIndex[int, Note]) -> None: ...
+    def reading(self) -> AbstractContextManager[None]: ...
+    def columns(self) -> Columns[int]: ...
     def add(self, note: Note) -> None: ...
+    def add_many(self, notes: Iterable[Note]) -> None: ...
+    def upsert_many(self, notes: Iterable[Note]) -> None: ...
+    def delete_many(self, note_ids: Iterable[int]) -> list[int]: ...
     def get(self, note_id: int) -> Optional[Note]: ...
     def all(self) -> Iterable[Note]: ...
+    def __iter__(self) -> Iterator[Note]: ...
     def find(self, query: str) -> Iterable[Note]: ...
     def find_by_tags(self, tags: Collection[Tag]) -> Iterable[Note]: ...
     def delete(self, note_id: int) -> None: ...
@@ -0,0 +1,85 @@
+import threading
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from typing import Iterator, Optional
+
+
+class ReadWriteLock:
+    """
+    Many readers or one writer, writers preferred.
+
+    A waiting writer holds back new readers, so a stream of lookups cannot
+    starve edits. Locked methods may call each other: the writing thread
+    may take the lock again for reading or writing and a reading thread may
+    read again. Upgrading a read to a write would deadlock and raises.
+    """
+    def __init__(self):
+        self.__cond = threading.Condition(threading.Lock())
+        self.__readers: int = 0
+        self.__writer: Optional[int] = None
+        self.__waiting_writers: int = 0
+        # reads held by the current thread, nested reads skip the queue
+        self.__local = threading.local()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the lock shared with other readers"""
+        if self.__writer == threading.get_ident():
+            yield
+            return
+
+        held = getattr(self.__local, "reads", 0)
+        if not held:
+            with self.__cond:
+                while self.__writer is not None or self.__waiting_writers:
+                    self.__cond.wait()
+                self.__readers += 1
+        self.__local.reads = held + 1
+        try:
+            yield
+        finally:
+            self.__local.reads = held
+            if not held:
+                with self.__cond:
+                    self.__readers -= 1
+                    if not self.__readers:
+                        self.__cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the lock exclusively"""
+        me = threading.get_ident()
+        if self.__writer == me:
+            yield
+            return
+        if getattr(self.__local, "reads", 0):
+            raise RuntimeError("A read lock can't be upgraded to a write lock")
+
+        with self.__cond:
+            self.__waiting_writers += 1
+            try:
+                while self.__writer is not None or self.__readers:
+                    self.__cond.wait()
+            except BaseException:
+                # readers held back by this writer may go on
+                self.__waiting_writers -= 1
+                self.__cond.notify_all()
+                raise
+            self.__waiting_writers -= 1
+            self.__writer = me
+        try:
+            yield
+        finally:
+            with self.__cond:
+                self.__writer = None
+                self.__cond.notify_all()
+
+
+class NoLock:
+    """ReadWriteLock stand-in for repositories used by a single thread"""
+    __held = nullcontext()
+
+    def read(self) -> AbstractContextManager[None]:
+        return self.__held
+
+    def write(self) -> AbstractContextManager[None]:
+        return self.__held
@@ -1,4 +1,4 @@
-from typing import Protocol, TypeVar
+from typing import Collection, Protocol, TypeVar
 
 K = TypeVar("K")
 T = TypeVar("T")
@@ -7,3 +7,10 @@ T = TypeVar("T")
 class Storage(Protocol[K, T]):
     def load(self) -> dict[K, T]: ...
     def save(self, notes: dict[K, T]) -> None: ...
+    def changed(self) -> bool: ...
+    def load_changes(self, keep: Collection[K] = ()) -> tuple[dict[K, T], set[K]]: ...
+
+
+class KeyReserving(Protocol):
+    """Storage handing out integer keys unique across all its sessions"""
+    def reserve_ids(self, count: int, floor: int = 0) -> range: ...
@@ -6,7 +6,12 @@ from services.notes_request import (
     EditTitleReq,
     EditBodyReq,
     EditTagsReq,
+    RenameTagReq,
     FindReq,
+    RankedFindReq,
+    RelatedReq,
+    DuplicatesReq,
+    QueryReq,
     FindByTagsReq,
     SortByTagsReq,
     DeleteReq,
@@ -20,7 +25,12 @@ __all__ = [
     "EditTitleReq",
     "EditBodyReq",
     "EditTagsReq",
+    "RenameTagReq",
     "FindReq",
+    "RankedFindReq",
+    "RelatedReq",
+    "DuplicatesReq",
+    "QueryReq",
     "FindByTagsReq",
     "SortByTagsReq",
     "DeleteReq",
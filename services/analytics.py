@@ -0,0 +1,70 @@
+from bisect import bisect_right
+from collections import Counter
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Hashable
+
+from repositories.columns import Columns, MISSING
+
+EPOCH = date(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+# first day of every month as a day of the (leap) reference year 2000
+MONTH_STARTS = list(accumulate(
+    [1, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30], initial=0
+))[1:]
+FEB_29 = 60
+
+try:
+    import numpy
+except ImportError:  # optional, the Python fallbacks below are used
+    numpy = None
+
+
+def birthdays_per_month(columns: Columns) -> list[int]:
+    """Count birthdays in each month, January first"""
+    days = columns.values["birthday_day"]
+    if columns.vectorized:
+        days = days[days != MISSING]
+        months = numpy.searchsorted(MONTH_STARTS, days, side="right")
+        return numpy.bincount(months, minlength=13)[1:].tolist()
+
+    counts = Counter(bisect_right(MONTH_STARTS, d) for d in days if d != MISSING)
+    return [counts[month] for month in range(1, 13)]
+
+
+def weekend_birthdays(columns: Columns, year: int) -> list[Hashable]:
+    """Keys of the records whose birthday is on a Saturday or Sunday in year"""
+    days = columns.values["birthday_day"]
+    first = date(year, 1, 1).toordinal()
+    leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+    # outside leap years 29 February is celebrated on the 28th
+    if columns.vectorized:
+        in_year = days - (days >= FEB_29) if not leap else days
+        weekday = (first + in_year - 2) % 7
+        return columns.keys(numpy.flatnonzero((days != MISSING) & (weekday >= 5)))
+
+    positions = []
+    for i, day in enumerate(days):
+        if day == MISSING:
+            continue
+        in_year = day - 1 if not leap and day >= FEB_29 else day
+        if (first + in_year - 2) % 7 >= 5:
+            positions.append(i)
+    return columns.keys(positions)
+
+
+def per_week(columns: Columns, name: str) -> list[tuple[date, int]]:
+    """Count records per Monday-based week of an epoch seconds column"""
+    seconds = columns.values[name]
+    if columns.vectorized:
+        days = seconds // SECONDS_PER_DAY
+        # 1970-01-01 was a Thursday, three days after a Monday
+        mondays, counts = numpy.unique(days - (days + 3) % 7, return_counts=True)
+        pairs = zip(mondays.tolist(), counts.tolist())
+    else:
+        pairs = sorted(Counter(
+            days - (days + 3) % 7 for days in
+            (s // SECONDS_PER_DAY for s in seconds)
+        ).items())
+    return [(EPOCH + timedelta(days=monday), count) for monday, count in pairs]
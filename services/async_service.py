@@ -0,0 +1,318 @@
+"""
+Asyncio facades of the contacts and notes services.
+
+The services and their indexes are not thread-safe, so every call runs on
+one service thread owned by the facade: scans leave the event loop free
+while calls stay serialized. At most ``max_pending`` calls are queued for
+that thread, later ones wait on the loop. Flushes snapshot the repository
+on the service thread and serialize and write it on a separate storage
+thread, so disk I/O never holds up queries.
+
+Identical reads issued while one is running share its execution
+(single-flight); the key includes the repository generation, so a read
+issued after a write never joins one started before it. Cancelling a call
+drops it if it has not started; a shared read is cancelled only when all
+its callers are. A call already running on a thread finishes, its result
+is discarded.
+
+All access to the services must go through the facade once it is in use.
+"""
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import date
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Optional,
+    Protocol,
+    TypeVar,
+)
+
+from models import Contact, Note
+from services.batch import BatchResult
+from services.contacts_service import ContactsService
+from services.dedupe import DuplicateMatch
+from services.notes_request import (
+    CreateNoteReq,
+    GetNoteReq,
+    EditTitleReq,
+    EditBodyReq,
+    EditTagsReq,
+    RenameTagReq,
+    FindReq,
+    RankedFindReq,
+    RelatedReq,
+    DuplicatesReq,
+    QueryReq,
+    FindByTagsReq,
+    DeleteReq,
+)
+from services.notes_service import NotesService
+
+T = TypeVar("T")
+
+MAX_PENDING = 64
+
+
+class Flushable(Protocol):
+    """Repository that can be snapshotted and flushed to its storage"""
+    @property
+    def generation(self) -> int: ...
+    def snapshot(self) -> dict: ...
+    def flush(self, snapshot: Optional[dict] = None) -> None: ...
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution.
+
+    Every caller awaits the shared task through a shield, so a cancelled
+    caller leaves the others waiting; the task itself is cancelled when its
+    last caller is. Unhashable keys are never shared.
+    """
+    def __init__(self):
+        self.__flights: dict[Hashable, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self.__flights)
+
+    async def do(self, key: Hashable, start: Callable[[], Awaitable[T]]) -> T:
+        """Await the execution running for the key or start one"""
+        try:
+            flight = self.__flights.get(key)
+        except TypeError:
+            return await start()
+
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(start()))
+            self.__flights[key] = flight
+            flight.task.add_done_callback(lambda _: self.__forget(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                self.__forget(key, flight)
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def __forget(self, key: Hashable, flight: "_Flight") -> None:
+        if self.__flights.get(key) is flight:
+            del self.__flights[key]
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task: asyncio.Future = task
+        self.waiters: int = 0
+
+
+class _AsyncFacade:
+    """Service thread, storage thread and single-flight shared by the facades"""
+    def __init__(self, repo: Flushable, max_pending: int):
+        self.__repo: Flushable = repo
+        self.__service_thread: Executor = ThreadPoolExecutor(
+            1, thread_name_prefix="service"
+        )
+        self.__storage_thread: Executor = ThreadPoolExecutor(
+            1, thread_name_prefix="storage"
+        )
+        self.__pending = asyncio.Semaphore(max_pending)
+        self.__flights = SingleFlight()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def flush(self) -> None:
+        """Write the repository to its storage without blocking the loop"""
+        await self.__flights.do(("flush", self.__repo.generation), self.__flush)
+
+    async def close(self) -> None:
+        """Wait for the running calls and stop the threads"""
+        for executor in (self.__service_thread, self.__storage_thread):
+            await asyncio.to_thread(executor.shutdown)
+
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        # mutations and other calls that must run once per caller
+        async with self.__pending:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.__service_thread, fn, *args
+            )
+
+    async def _read(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # lists are copied per caller, shared results are never aliased
+        result = await self.__flights.do(
+            (fn.__name__, args, self.__repo.generation),
+            lambda: self._call(fn, *args),
+        )
+        return list(result) if isinstance(result, list) else result
+
+    async def __flush(self) -> None:
+        snapshot = await self._call(self.__repo.snapshot)
+        await asyncio.get_running_loop().run_in_executor(
+            self.__storage_thread, self.__repo.flush, snapshot
+        )
+
+
+class AsyncContactsService(_AsyncFacade):
+    """Non-blocking access to a ContactsService from asyncio code"""
+    def __init__(self, service: ContactsService, max_pending: int = MAX_PENDING):
+        super().__init__(service.repo, max_pending)
+        self.__service: ContactsService = service
+
+    async def get(self, name: str) -> Contact:
+        """Get a contact by name"""
+        return await self._read(self.__service.get, name)
+
+    async def suggest(self, name: str, limit: int = 3) -> list[str]:
+        """Names of existing contacts within two typos of name"""
+        return await self._read(self.__service.suggest, name, limit)
+
+    async def find(self, search: str) -> list[Contact]:
+        """Contacts matching the search"""
+        return await self._read(_listed(self.__service.find), search)
+
+    async def query(self, query: str) -> list[Contact]:
+        """Contacts matching a structured query"""
+        return await self._read(self.__service.query, query)
+
+    async def all(self) -> list[Contact]:
+        """Every contact"""
+        return await self._read(_listed(self.__service.all))
+
+    async def upcoming_birthdays(self, num_days: int) -> list[tuple[Contact, date]]:
+        """Contacts with birthdays in the next num_days, with the dates"""
+        return await self._read(
+            _listed(self.__service.upcoming_birthdays), num_days
+        )
+
+    async def duplicates(self, threshold: float = 0.6) -> list[DuplicateMatch]:
+        """Pairs of contacts that are likely the same person"""
+        return await self._read(self.__service.duplicates, threshold)
+
+    async def add_contact(self, name: str, phone: str) -> Contact:
+        """Add a new contact with one phone"""
+        return await self._call(self.__service.add_contact, name, phone)
+
+    async def add_phone(self, name: str, phone: str) -> None:
+        """Add a phone to an existing contact"""
+        await self._call(self.__service.add_phone, name, phone)
+
+    async def set_email(self, name: str, raw_email: Optional[str]) -> None:
+        """Set or clear the email of a contact"""
+        await self._call(self.__service.set_email, name, raw_email)
+
+    async def set_birthday(self, name: str, raw_birthday: Optional[str]) -> None:
+        """Set or clear the birthday of a contact"""
+        await self._call(self.__service.set_birthday, name, raw_birthday)
+
+    async def set_address(self, name: str, raw_address: Optional[str]) -> None:
+        """Set or clear the address of a contact"""
+        await self._call(self.__service.set_address, name, raw_address)
+
+    async def del_contact(self, name: str) -> None:
+        """Delete a contact"""
+        await self._call(self.__service.del_contact, name)
+
+    async def upsert_many(self, contacts: Iterable[Contact]) -> BatchResult[Contact]:
+        """Add or replace contacts in one batch"""
+        return await self._call(self.__service.upsert_many, list(contacts))
+
+    async def delete_many(self, names: Iterable[str]) -> BatchResult[Contact]:
+        """Delete contacts in one batch"""
+        return await self._call(self.__service.delete_many, list(names))
+
+
+class AsyncNotesService(_AsyncFacade):
+    """Non-blocking access to a NotesService from asyncio code"""
+    def __init__(
+        self,
+        service: NotesService,
+        repo: Flushable,
+        max_pending: int = MAX_PENDING,
+    ):
+        super().__init__(repo, max_pending)
+        self.__service: NotesService = service
+
+    async def get_note(self, req: GetNoteReq) -> Optional[Note]:
+        """Get a note by id"""
+        return await self._read(self.__service.get_note, req)
+
+    async def find(self, req: FindReq) -> list[Note]:
+        """Notes whose title matches"""
+        return await self._read(_listed(self.__service.find), req)
+
+    async def find_ranked(self, req: RankedFindReq) -> list[tuple[Note, float]]:
+        """The most relevant notes for a query with their scores"""
+        return await self._read(self.__service.find_ranked, req)
+
+    async def related(self, req: RelatedReq) -> list[tuple[Note, float]]:
+        """The notes most similar to a note"""
+        return await self._read(self.__service.related, req)
+
+    async def duplicates(self, req: DuplicatesReq) -> list[list[tuple[Note, float]]]:
+        """Groups of nearly identical notes"""
+        return await self._read(self.__service.duplicates, req)
+
+    async def query(self, req: QueryReq) -> list[Note]:
+        """Notes matching a structured query"""
+        return await self._read(self.__service.query, req)
+
+    async def find_by_tags(self, req: FindByTagsReq) -> list[Note]:
+        """Notes having the tags"""
+        return await self._read(_listed(self.__service.find_by_tags), req)
+
+    async def all(self) -> list[Note]:
+        """Every note"""
+        return await self._read(_listed(self.__service.all))
+
+    async def add_note(self, req: CreateNoteReq) -> Note:
+        """Create a note"""
+        return await self._call(self.__service.add_note, req)
+
+    async def add_many(self, reqs: Iterable[CreateNoteReq]) -> BatchResult[Note]:
+        """Create notes in one batch"""
+        return await self._call(self.__service.add_many, list(reqs))
+
+    async def edit_title(self, req: EditTitleReq) -> Note:
+        """Change the title of a note"""
+        return await self._call(self.__service.edit_title, req)
+
+    async def edit_body(self, req: EditBodyReq) -> Note:
+        """Change the body of a note"""
+        return await self._call(self.__service.edit_body, req)
+
+    async def edit_tags(self, req: EditTagsReq) -> Note:
+        """Replace the tags of a note"""
+        return await self._call(self.__service.edit_tags, req)
+
+    async def rename_tag(self, req: RenameTagReq) -> list[Note]:
+        """Rename a tag on every note"""
+        return await self._call(self.__service.rename_tag, req)
+
+    async def delete_note(self, req: DeleteReq) -> None:
+        """Delete a note"""
+        await self._call(self.__service.delete_note, req)
+
+    async def delete_many(self, note_ids: Iterable[int]) -> BatchResult[Note]:
+        """Delete notes in one batch"""
+        return await self._call(self.__service.delete_many, list(note_ids))
+
+
+def _listed(fn: Callable[..., Iterable[T]]) -> Callable[..., list[T]]:
+    # lazy results are consumed on the service thread, never on the loop
+    def listed(*args):
+        return list(fn(*args))
+    listed.__name__ = fn.__name__
+    return listed
@@ -0,0 +1,31 @@
+from dataclasses import dataclass, field
+from typing import Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ItemError:
+    """Failure of one item of a batch, by its position in the input"""
+    index: int
+    key: Hashable
+    error: Exception
+
+    @property
+    def message(self) -> str:
+        """Message of the error, as input_error would show it"""
+        return getattr(self.error, "message", str(self.error))
+
+
+@dataclass
+class BatchResult(Generic[T]):
+    """Outcome of a bulk operation, errors are reported instead of raised"""
+    added: list[T] = field(default_factory=list)
+    updated: list[T] = field(default_factory=list)
+    deleted: list[Hashable] = field(default_factory=list)
+    errors: list[ItemError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether every item was applied"""
+        return not self.errors
@@ -0,0 +1,101 @@
+import heapq
+import math
+from collections import Counter
+from operator import itemgetter
+
+from models import Note
+from services.text import tokenize
+
+
+class BM25Index:
+    """
+    Incrementally maintained BM25 ranking over note titles and bodies.
+
+    Postings keep the title-weighted term frequency of every note, and
+    document frequencies, note lengths and the total length are updated on
+    every add, edit and delete, so a query only walks the postings of its
+    own terms.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_weight: float = 3.0):
+        self.__k1: float = k1
+        self.__b: float = b
+        self.__title_weight: float = title_weight
+        self.__postings: dict[str, dict[int, float]] = {}
+        self.__terms: dict[int, tuple[str, ...]] = {}
+        self.__lengths: dict[int, float] = {}
+        self.__total_length: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.__lengths)
+
+    def upsert(self, note_id: int, note: Note) -> None:
+        """Index a new note or re-index a changed one"""
+        self.remove(note_id)
+
+        title_terms = tokenize(note.title.value)
+        body_terms = tokenize(note.body.value)
+        frequencies = Counter(body_terms)
+        for term in title_terms:
+            frequencies[term] += self.__title_weight
+
+        for term, frequency in frequencies.items():
+            self.__postings.setdefault(term, {})[note_id] = frequency
+        length = self.__title_weight * len(title_terms) + len(body_terms)
+        self.__terms[note_id] = tuple(frequencies)
+        self.__lengths[note_id] = length
+        self.__total_length += length
+
+    def remove(self, note_id: int) -> None:
+        """Drop a note from the index"""
+        terms = self.__terms.pop(note_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            posting = self.__postings[term]
+            del posting[note_id]
+            if not posting:
+                del self.__postings[term]
+        self.__total_length -= self.__lengths.pop(note_id)
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[int, float]]:
+        """Return up to limit (note_id, score) pairs, best first"""
+        count = len(self.__lengths)
+        terms = set(tokenize(query)) & self.__postings.keys()
+        if not count or not terms or limit <= 0:
+            return []
+
+        k1, b = self.__k1, self.__b
+        average = self.__total_length / count or 1.0
+        lengths = self.__lengths
+        scores: dict[int, float] = {}
+
+        # rare terms first. A term adds less than idf * (k1 + 1) to a score,
+        # so once the terms left can't lift a note scoring nothing yet past
+        # the current k-th score, they only rescore notes already found
+        # instead of walking their long postings (MaxScore)
+        ordered = sorted(terms, key=lambda t: len(self.__postings[t]))
+        idfs = [self.__idf(len(self.__postings[t]), count) for t in ordered]
+        remaining = sum(idfs) * (k1 + 1)
+        for term, idf in zip(ordered, idfs):
+            posting = self.__postings[term]
+            if len(scores) >= limit and remaining < _kth(scores, limit):
+                pairs = [(i, posting[i]) for i in scores if i in posting]
+            else:
+                pairs = posting.items()
+            remaining -= idf * (k1 + 1)
+            for note_id, tf in pairs:
+                norm = k1 * (1 - b + b * lengths[note_id] / average)
+                scores[note_id] = (
+                    scores.get(note_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+                )
+
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+    @staticmethod
+    def __idf(df: int, count: int) -> float:
+        return math.log(1 + (count - df + 0.5) / (df + 0.5))
+
+
+def _kth(scores: dict[int, float], k: int) -> float:
+    return heapq.nlargest(k, scores.values())[-1]
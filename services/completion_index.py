@@ -0,0 +1,128 @@
+from bisect import bisect_left, insort
+from typing import Hashable, Iterable
+
+from models import Note
+
+
+class PrefixIndex:
+    """
+    Case-insensitive prefix completion over a sorted array of strings.
+
+    Values are kept sorted by their casefolded form, so the completions of
+    a prefix are a contiguous run found with one bisect. Values are reference
+    counted: one added several times stays until discarded as often.
+    ``update`` adds many values with a single sort, for the initial build;
+    ``add`` inserts one in place.
+    """
+    def __init__(self):
+        self.__entries: list[tuple[str, str]] = []
+        self.__counts: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def add(self, value: str) -> None:
+        """Add a value, or another reference to it"""
+        count = self.__counts.get(value, 0)
+        self.__counts[value] = count + 1
+        if not count:
+            insort(self.__entries, (value.casefold(), value))
+
+    def update(self, values: Iterable[str]) -> None:
+        """Add many values, or more references to them, with one sort"""
+        counts = self.__counts
+        added = []
+        for value in values:
+            count = counts.get(value, 0)
+            counts[value] = count + 1
+            if not count:
+                added.append((value.casefold(), value))
+        self.__entries.extend(added)
+        self.__entries.sort()
+
+    def discard(self, value: str) -> None:
+        """Drop one reference to a value, the value goes with the last one"""
+        count = self.__counts.get(value)
+        if count is None:
+            return
+        if count > 1:
+            self.__counts[value] = count - 1
+            return
+
+        del self.__counts[value]
+        entry = (value.casefold(), value)
+        del self.__entries[bisect_left(self.__entries, entry)]
+
+    def complete(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Return values starting with prefix, in order, at most limit"""
+        folded = prefix.casefold()
+        entries = self.__entries
+        position = bisect_left(entries, (folded,))
+        end = len(entries) if limit is None else min(len(entries), position + limit)
+
+        result = []
+        while position < end and entries[position][0].startswith(folded):
+            result.append(entries[position][1])
+            position += 1
+        return result
+
+
+class KeyCompletion:
+    """Repository keys (contact names, note ids) completed by prefix"""
+    def __init__(self):
+        self.__prefixes = PrefixIndex()
+        self.__keys: set[Hashable] = set()
+
+    def upsert(self, key: Hashable, record: object) -> None:
+        if key not in self.__keys:
+            self.__keys.add(key)
+            self.__prefixes.add(str(key))
+
+    def load(self, records: Iterable[tuple[Hashable, object]]) -> None:
+        keys = [key for key, _ in records if key not in self.__keys]
+        self.__keys.update(keys)
+        self.__prefixes.update(str(key) for key in keys)
+
+    def remove(self, key: Hashable) -> None:
+        if key in self.__keys:
+            self.__keys.remove(key)
+            self.__prefixes.discard(str(key))
+
+    def complete(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Return keys starting with prefix, sorted case-insensitively"""
+        return self.__prefixes.complete(prefix, limit)
+
+
+class TagCompletion:
+    """Tags used by the notes completed by prefix"""
+    def __init__(self):
+        self.__prefixes = PrefixIndex()
+        self.__tags: dict[int, frozenset[str]] = {}
+
+    def upsert(self, note_id: int, note: Note) -> None:
+        tags = frozenset(tag.value for tag in note.tags)
+        previous = self.__tags.get(note_id, frozenset())
+        for tag in tags - previous:
+            self.__prefixes.add(tag)
+        for tag in previous - tags:
+            self.__prefixes.discard(tag)
+        self.__tags[note_id] = tags
+
+    def load(self, records: Iterable[tuple[int, Note]]) -> None:
+        added = []
+        for note_id, note in records:
+            if note_id in self.__tags:
+                self.upsert(note_id, note)
+                continue
+            tags = frozenset(tag.value for tag in note.tags)
+            self.__tags[note_id] = tags
+            added.extend(tags)
+        self.__prefixes.update(added)
+
+    def remove(self, note_id: int) -> None:
+        for tag in self.__tags.pop(note_id, ()):
+            self.__prefixes.discard(tag)
+
+    def complete(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Return tags starting with prefix, sorted case-insensitively"""
+        return self.__prefixes.complete(prefix, limit)
@@ -1,17 +1,35 @@
-from typing import Optional, Iterable
+from copy import copy
+from typing import Callable, Hashable, Iterator, Optional, Iterable
 from datetime import datetime, date, timedelta
 
-from exceptions import AlreadyExistError
+from exceptions import AlreadyExistError, NotFoundError
 from repositories.contacts_repo import ContactsRepository
 from models import Contact
-from models.values import Email, Phone, Address, Birthday
+from models.values import Email, Field, Phone, Address, Birthday, validate_batch
+from services import analytics
+from services.batch import BatchResult, ItemError
+from services.completion_index import KeyCompletion
+from services.dedupe import DuplicateFinder, DuplicateMatch
+from services.field_index import DateRangeIndex, HashIndex
+from services.fuzzy_index import FuzzyNameIndex
+from services.query import FieldKind, QueryField, QueryPlanner, parse_query
+from services.query_cache import QueryCache, CacheStats
+from services.vcard import VCard, format_vcard
 
 
 class ContactsService:
     """Service layer for managing contacts."""
-    def __init__(self, repo: ContactsRepository):
+    def __init__(self, repo: ContactsRepository, cache_size: int = 128):
         """Initialize the ContactsService with a repository."""
         self.repo = repo
+        self.__cache = QueryCache(cache_size)
+        self.__names = FuzzyNameIndex()
+        repo.attach(self.__names)
+        self.__completions = KeyCompletion()
+        repo.attach(self.__completions)
+        self.__duplicates = DuplicateFinder()
+        repo.attach(self.__duplicates)
+        self.__planner = self.__create_planner()
 
     def add_contact(self, name: str, phone: str) -> Contact:
         """Add a new contact with one phone."""
@@ -23,26 +41,158 @@ class ContactsService:
 
     def get(self, name: str) -> Contact | None:
         """Get a contact by name."""
-        return self.repo.get(name)
+        return self.__get(name)
+
+    def suggest(self, name: str, limit: int = 3) -> list[str]:
+        """Return names of existing contacts within two typos of name."""
+        with self.repo.reading():
+            return [n for n, _ in self.__names.lookup(name, limit)]
+
+    def complete_names(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Return contact names starting with prefix, for argument completion."""
+        with self.repo.reading():
+            return self.__completions.complete(prefix, limit)
 
     def add_phone(self, name: str, phone: str) -> bool:
         """Add a phone to an existing contact."""
-        contact = self.repo.get(name)
+        contact = self.__get(name)
         contact.add_phone(Phone(phone))
         self.repo.save(contact)
 
     def add_contact_or_phone(self, name: str, phone: str) -> str:
         """Add contact or phone if contact exists. Returns 'contact' or 'phone'."""
-        try:
-            self.add_contact(name, phone)
+        result = self.upsert_many([Contact(name, phones=[Phone(phone)])])
+        if result.added:
             return 'contact'
-        except AlreadyExistError:
-            self.add_phone(name, phone)
+        if result.updated:
             return 'phone'
+        raise AlreadyExistError("Phone")
+
+    def add_many(self, contacts: Iterable[Contact]) -> BatchResult[Contact]:
+        """Add new contacts in one batch, taken names are reported per item."""
+        result = BatchResult()
+        batch: dict[str, Contact] = {}
+        for i, contact in enumerate(contacts):
+            name = contact.name.value
+            if name in batch or self.repo.get(name, None) is not None:
+                error = AlreadyExistError(f"Contact {name}")
+                result.errors.append(ItemError(i, name, error))
+            else:
+                batch[name] = contact
+
+        self.repo.add_many(batch.values())
+        result.added.extend(batch.values())
+        return result
+
+    def upsert_many(self, contacts: Iterable[Contact]) -> BatchResult[Contact]:
+        """
+        Add new contacts and merge the others into the existing ones.
+
+        New phones are appended, email, birthday and address are replaced
+        when given. Merges happen on copies that replace the stored contacts
+        in one batch. Items changing nothing are neither added nor updated.
+        """
+        result = BatchResult()
+        batch: dict[str, Contact] = {}
+        added: set[str] = set()
+        for contact in contacts:
+            name = contact.name.value
+            current = batch.get(name) or self.repo.get(name, None)
+            if current is None:
+                batch[name] = contact
+                added.add(name)
+            elif (merged := _merge(current, contact)) is not None:
+                batch[name] = merged
+
+        self.repo.upsert_many(batch.values())
+        for name, contact in batch.items():
+            (result.added if name in added else result.updated).append(contact)
+        return result
+
+    def delete_many(self, names: Iterable[str]) -> BatchResult[Contact]:
+        """Delete contacts in one batch, unknown names are reported per item."""
+        names = list(names)
+        result = BatchResult(deleted=self.repo.delete_many(names))
+        deleted = set(result.deleted)
+        for i, name in enumerate(names):
+            if name not in deleted:
+                error = NotFoundError(f"Contact: {name}")
+                result.errors.append(ItemError(i, name, error))
+        return result
+
+    def import_vcards(
+        self, cards: Iterable[VCard], chunk_size: int = 1000
+    ) -> BatchResult[Contact]:
+        """
+        Add or merge contacts read from vCards, chunk by chunk.
+
+        Every chunk is validated per field kind with validate_batch and
+        merged with upsert_many, so a stream of cards is never held whole.
+        A card with an invalid value is skipped and reported by its position
+        with the first error.
+        """
+        result = BatchResult()
+        chunk: list[tuple[int, VCard]] = []
+        for i, card in enumerate(cards):
+            chunk.append((i, card))
+            if len(chunk) == chunk_size:
+                self.__import_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self.__import_chunk(chunk, result)
+        return result
+
+    def import_records(self, records: Iterable[dict]) -> BatchResult[Contact]:
+        """Add or merge contacts from validated to_dict records, e.g. a CSV chunk"""
+        return self.upsert_many(
+            Contact.from_dict(record, validated=True) for record in records
+        )
+
+    def export_vcards(self) -> Iterator[str]:
+        """Yield every contact as a vCard, straight from the repository"""
+        return map(format_vcard, self.repo)
+
+    def duplicates(self, threshold: float = 0.6) -> list[DuplicateMatch]:
+        """Return pairs of contacts likely to be the same person, best first."""
+        if not 0 < threshold <= 1:
+            raise ValueError("Threshold must be greater than 0 and at most 1")
+
+        return self.__cached(
+            ("duplicates", threshold),
+            lambda: self.__duplicates.find(self.repo.get, threshold),
+        )
+
+    def merge_contacts(self, target: str, sources: Iterable[str]) -> Contact:
+        """
+        Merge contacts into the target one and delete them.
+
+        Phones the target lacks are appended, email, birthday and address
+        fill only the fields the target has not set. Run it in a transaction
+        to keep the sources if the merge fails halfway.
+        """
+        merged = copy(self.__get(target))
+        names = [name for name in dict.fromkeys(sources) if name != target]
+        if not names:
+            raise ValueError("Nothing to merge, give contacts other than the target")
+
+        for name in names:
+            source = self.__get(name)
+            merged.add_phones([p for p in source.phones if p not in merged.phones])
+            for setter, value, current in (
+                (Contact.set_email, source.email, merged.email),
+                (Contact.set_birthday, source.birthday, merged.birthday),
+                (Contact.set_address, source.address, merged.address),
+            ):
+                if current is None and value is not None:
+                    setter(merged, value)
+
+        self.repo.upsert_many([merged])
+        self.repo.delete_many(names)
+        return merged
 
     def set_email(self, name: str, raw_email: Optional[str]):
         """Set or remove email for a contact."""
-        contact = self.repo.get(name)
+        contact = self.__get(name)
         email = None
 
         if raw_email is not None:
@@ -53,7 +203,7 @@ class ContactsService:
 
     def set_birthday(self, name: str, raw_birthday: Optional[str]):
         """Set or remove birthday for a contact."""
-        contact = self.repo.get(name)
+        contact = self.__get(name)
         birthday = None
 
         if raw_birthday is not None:
@@ -64,7 +214,7 @@ class ContactsService:
 
     def set_address(self, name: str, raw_address: Optional[str]):
         """Set or remove address for a contact."""
-        contact = self.repo.get(name)
+        contact = self.__get(name)
         address = None
         if raw_address is not None:
             address = Address(raw_address)
@@ -74,25 +224,37 @@ class ContactsService:
 
     def edit_phone(self, name: str, prev_phone: str, new_phone: str) -> None:
         """Replace an existing phone with a new one."""
-        contact = self.repo.get(name)
+        contact = self.__get(name)
         contact.edit_phone(Phone(prev_phone), Phone(new_phone))
         self.repo.save(contact)
 
     def del_phone(self, name: str, phone: str) -> bool:
         """Delete a phone from a contact. Returns True if deleted."""
-        existing_contact = self.repo.get(name)
+        existing_contact = self.__get(name)
         if not existing_contact:
             raise KeyError(f"User with name {name} does not exist")
 
         phone_to_delete = Phone(phone)
         if existing_contact.del_phone(phone_to_delete):
+            self.repo.save(existing_contact)
             return True
         else:
             return False
 
+    def move_phone(self, source: str, target: str, phone: str) -> None:
+        """
+        Move a phone between contacts.
+
+        Not atomic by itself: run it in a transaction to keep the phone on
+        the source contact when the target already has it.
+        """
+        if not self.del_phone(source, phone):
+            raise NotFoundError(f"Phone {phone}")
+        self.add_phone(target, phone)
+
     def del_contact(self, name: str):
         """Delete a contact by name."""
-        existing_contact = self.repo.get(name)
+        existing_contact = self.__get(name)
         if not existing_contact:
             raise KeyError(f"User with name {name} does not exist")
 
@@ -100,17 +262,131 @@ class ContactsService:
 
     def find(self, search: str) -> Iterable[Contact]:
         """Search contacts by string."""
-        return self.repo.find(search)
+        return self.__cached(
+            ("find", search),
+            lambda: self.repo.find(search),
+        )
+
+    def query(self, query: str) -> list[Contact]:
+        """Find contacts matching all terms of a structured query."""
+        return self.__cached(
+            ("query", query),
+            lambda: self.__planner.run(self.__planner.plan(parse_query(query))),
+        )
+
+    def explain(self, query: str) -> list[str]:
+        """Describe how a structured query would be executed."""
+        with self.repo.reading():
+            return self.__planner.plan(parse_query(query)).describe()
 
     def all(self) -> Iterable[Contact]:
         """Return all contacts."""
         return self.repo.all()
 
+    def cache_stats(self) -> CacheStats:
+        """Return hit/miss counters of the query cache."""
+        return self.__cache.stats()
+
     def upcoming_birthdays(
             self, num_days: int) -> Iterable[tuple[Contact, date]]:
         """Return contacts with birthdays in the next num_days."""
-        contacts = self.all()
         today = date.today()
+        return self.__cached(
+            ("birthdays", num_days, today),
+            lambda: self.__upcoming_birthdays(num_days, today),
+        )
+
+    def birthdays_per_month(self) -> list[int]:
+        """Return the number of birthdays in each month, January first."""
+        return self.__cached(
+            ("birthdays_per_month",),
+            lambda: analytics.birthdays_per_month(self.repo.columns()),
+        )
+
+    def weekend_birthdays(self, year: int) -> list[Contact]:
+        """Return contacts whose birthday falls on a weekend in the year."""
+        def compute():
+            names = analytics.weekend_birthdays(self.repo.columns(), year)
+            return sorted(
+                (self.repo.get(name) for name in names),
+                key=lambda c: _birthday_date(c).replace(year=2000),
+            )
+
+        return self.__cached(("weekend_birthdays", year), compute)
+
+    def __cached(self, key: Hashable, compute: Callable[[], Iterable]) -> list:
+        # the read lock keeps the generation, indexes and records consistent
+        with self.repo.reading():
+            return self.__cache.get_or_compute(key, self.repo.generation, compute)
+
+    def __import_chunk(
+        self, chunk: list[tuple[int, VCard]], result: BatchResult[Contact]
+    ) -> None:
+        cards = [card for _, card in chunk]
+        errors: dict[int, str] = {}
+        names = _validate_cards("name", cards, lambda c: [c.name or ""], errors)
+        phones = _validate_cards("phone", cards, lambda c: c.phones, errors)
+        emails = _validate_cards("email", cards, lambda c: _given(c.email), errors)
+        birthdays = _validate_cards(
+            "birthday", cards, lambda c: _given(c.birthday), errors
+        )
+        addresses = _validate_cards(
+            "address", cards, lambda c: _given(c.address), errors
+        )
+
+        contacts = []
+        for pos, (i, card) in enumerate(chunk):
+            if pos in errors:
+                result.errors.append(ItemError(i, card.name, ValueError(errors[pos])))
+                continue
+            contacts.append(Contact(
+                names[pos][0].value,
+                email=next(iter(emails[pos]), None),
+                phones=phones[pos],
+                birthday=next(iter(birthdays[pos]), None),
+                address=next(iter(addresses[pos]), None),
+            ))
+
+        merged = self.upsert_many(contacts)
+        result.added.extend(merged.added)
+        result.updated.extend(merged.updated)
+
+    def __create_planner(self) -> QueryPlanner[str, Contact]:
+        fields = {
+            "name": QueryField(_names, index=HashIndex(_names)),
+            "phone": QueryField(
+                _phones, normalize=Phone.normalize, index=HashIndex(_phones)
+            ),
+            "email": QueryField(_emails, index=HashIndex(_emails)),
+            "birthday": QueryField(
+                _birthdays,
+                kind=FieldKind.DATE,
+                date=_birthday_date,
+                index=DateRangeIndex(_birthday_date),
+            ),
+            "address": QueryField(_addresses, kind=FieldKind.TEXT),
+        }
+        for field in fields.values():
+            if field.index is not None:
+                self.repo.attach(field.index)
+
+        return QueryPlanner(
+            fields,
+            Contact.search_matcher,
+            self.repo.get,
+            self.repo.all,
+            sort_key=lambda c: c.name.value.casefold(),
+        )
+
+    def __get(self, name: str) -> Contact:
+        try:
+            return self.repo.get(name)
+        except NotFoundError as e:
+            raise NotFoundError(f"Contact: {name}", self.suggest(name)) from e
+
+    def __upcoming_birthdays(
+            self, num_days: int, today: date) -> list[tuple[Contact, date]]:
+        contacts = self.all()
         limit_day = today + timedelta(days=num_days)
 
         result = []
@@ -148,3 +424,82 @@ class ContactsService:
         result.sort(key=lambda item: item[1])
 
         return result
+
+
+def _merge(current: Contact, incoming: Contact) -> Optional[Contact]:
+    """Merge incoming fields into a copy of current, None if nothing changes"""
+    phones = [p for p in incoming.phones if p not in current.phones]
+    fields = [
+        (setter, value) for setter, value, old in (
+            (Contact.set_email, incoming.email, current.email),
+            (Contact.set_birthday, incoming.birthday, current.birthday),
+            (Contact.set_address, incoming.address, current.address),
+        ) if value is not None and value != old
+    ]
+    if not phones and not fields:
+        return None
+
+    merged = copy(current)
+    merged.add_phones(phones)
+    for setter, value in fields:
+        setter(merged, value)
+    return merged
+
+
+def _given(value: Optional[str]) -> list[str]:
+    return [] if value is None else [value]
+
+
+def _validate_cards(
+    kind: str,
+    cards: list[VCard],
+    values: Callable[[VCard], list[str]],
+    errors: dict[int, str],
+) -> list[list[Field]]:
+    """
+    Validate one field kind of all cards at once, fields grouped per card.
+
+    The first message of every failing card is recorded in errors.
+    """
+    owners, raw = [], []
+    for pos, card in enumerate(cards):
+        for value in values(card):
+            owners.append(pos)
+            raw.append(value)
+
+    validated = validate_batch(kind, raw)
+    fields: list[list[Field]] = [[] for _ in cards]
+    for owner, value in zip(owners, validated.fields):
+        if value is not None:
+            fields[owner].append(value)
+    for error in validated.errors:
+        errors.setdefault(owners[error.index], error.message)
+    return fields
+
+
+def _names(contact: Contact) -> tuple[str, ...]:
+    return (contact.name.value.casefold(),)
+
+
+def _phones(contact: Contact) -> list[str]:
+    return [phone.value for phone in contact.phones]
+
+
+def _emails(contact: Contact) -> tuple[str, ...]:
+    return (contact.email.value.casefold(),) if contact.email else ()
+
+
+def _birthdays(contact: Contact) -> tuple[str, ...]:
+    return (contact.birthday.value,) if contact.birthday else ()
+
+
+def _birthday_date(contact: Contact) -> Optional[date]:
+    if contact.birthday is None:
+        return None
+    # stored birthdays are valid DD.MM.YYYY, split faster than strptime
+    day, month, year = contact.birthday.value.split(".")
+    return date(int(year), int(month), int(day))
+
+
+def _addresses(contact: Contact) -> tuple[str, ...]:
+    return (contact.address.value.casefold(),) if contact.address else ()
@@ -0,0 +1,200 @@
+"""
+Chunked CSV import of contacts and notes.
+
+Rows are read with the csv module in chunks. Each chunk is normalized and
+validated into plain dicts (the ``to_dict`` shape of the models) by
+a process pool, so the CPU-bound rules run on every core while the main
+process builds the models with ``from_dict(validated=True)`` and stores
+them in bulk.
+"""
+import csv
+import os
+import re
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime as DateTime
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from models.values import validation
+
+CHUNK_SIZE = 2000
+# chunks submitted ahead of the one being merged, per worker
+PREFETCH = 2
+
+CONTACT_COLUMNS = ("name", "phones", "email", "birthday", "address")
+NOTE_COLUMNS = ("title", "body", "tags", "created_at", "updated_at")
+REQUIRED = {"contacts": "name", "notes": "title"}
+
+_PHONE_SEPARATORS = re.compile(r"[;,|]")
+
+
+@dataclass(frozen=True)
+class RejectedRow:
+    """A row that failed validation, by its line in the file"""
+    line: int
+    row: dict[str, str]
+    message: str
+
+
+@dataclass
+class CleanedChunk:
+    """Records of a chunk ready for from_dict and the rows rejected"""
+    records: list[dict] = field(default_factory=list)
+    rejected: list[RejectedRow] = field(default_factory=list)
+
+
+def read_chunks(
+    file: TextIO, kind: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[list[tuple[int, dict[str, str]]]]:
+    """
+    Read (line, row) chunks of a CSV file with a header.
+
+    Column names are matched case-insensitively, unknown columns are
+    ignored; the column required by the kind must be present.
+    """
+    required = REQUIRED.get(kind)
+    if required is None:
+        raise ValueError(f"Unknown import kind '{kind}', expected: contacts, notes")
+
+    reader = csv.reader(file)
+    header = [name.strip().lower() for name in next(reader, [])]
+    if required not in header:
+        raise ValueError(f"CSV header must have a '{required}' column")
+
+    chunk = []
+    for values in reader:
+        if not any(values):
+            continue
+        chunk.append((reader.line_num, dict(zip(header, values))))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def clean_contacts(rows: list[tuple[int, dict[str, str]]]) -> CleanedChunk:
+    """Normalize and validate contact rows, run in a worker process"""
+    today = date.today()
+    return _clean(rows, lambda row: {
+        "name": validation.clean_name(row.get("name", "").strip()),
+        "phones": list(dict.fromkeys(
+            validation.clean_phone(phone)
+            for phone in _PHONE_SEPARATORS.split(row.get("phones", ""))
+            if phone.strip()
+        )),
+        "email": _optional(validation.clean_email, row.get("email")),
+        "birthday": _optional(
+            lambda value: validation.clean_birthday(value, today),
+            row.get("birthday"),
+        ),
+        "address": _optional(validation.clean_address, row.get("address")),
+    })
+
+
+def clean_notes(rows: list[tuple[int, dict[str, str]]]) -> CleanedChunk:
+    """Normalize and validate note rows, run in a worker process"""
+    now = DateTime.now()
+
+    def clean(row: dict[str, str]) -> dict:
+        created = _timestamp(row.get("created_at"), "created_at") or now
+        updated = _timestamp(row.get("updated_at"), "updated_at") or created
+        if updated < created:
+            raise ValueError("updated_at can't be before created_at")
+        return {
+            "title": validation.clean_title(row.get("title", "").strip()),
+            "body": row.get("body", "").strip(),
+            "tags": sorted({
+                validation.clean_tag(tag)
+                for tag in row.get("tags", "").split(",") if tag.strip()
+            }),
+            "created_at": created.isoformat(),
+            "updated_at": updated.isoformat(),
+        }
+    return _clean(rows, clean)
+
+
+CLEANERS: dict[str, Callable[[list[tuple[int, dict[str, str]]]], CleanedChunk]] = {
+    "contacts": clean_contacts,
+    "notes": clean_notes,
+}
+
+
+def clean_chunks(
+    kind: str,
+    chunks: Iterable[list[tuple[int, dict[str, str]]]],
+    workers: Optional[int] = None,
+) -> Iterator[CleanedChunk]:
+    """
+    Clean chunks in a process pool, yielding them in input order.
+
+    Only ``workers * PREFETCH`` chunks are in flight, so memory stays
+    bounded however large the file is. One worker cleans in this process.
+    """
+    clean = CLEANERS[kind]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(clean, chunks)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        yield from _ordered(pool, clean, chunks, workers * PREFETCH)
+
+
+def write_report(file: TextIO, rejected: Iterable[RejectedRow], kind: str) -> int:
+    """Write rejected rows with their line and error as CSV, return the count"""
+    columns = CONTACT_COLUMNS if kind == "contacts" else NOTE_COLUMNS
+    writer = csv.writer(file)
+    writer.writerow(("line", "error") + columns)
+    count = 0
+    for item in rejected:
+        writer.writerow(
+            [item.line, item.message] + [item.row.get(c, "") for c in columns]
+        )
+        count += 1
+    return count
+
+
+def _ordered(
+    pool: Executor,
+    clean: Callable[[list], CleanedChunk],
+    chunks: Iterable[list],
+    in_flight: int,
+) -> Iterator[CleanedChunk]:
+    pending: deque[Future] = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(clean, chunk))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _clean(
+    rows: list[tuple[int, dict[str, str]]], clean: Callable[[dict[str, str]], dict]
+) -> CleanedChunk:
+    result = CleanedChunk()
+    for line, row in rows:
+        try:
+            result.records.append(clean(row))
+        except ValueError as e:
+            result.rejected.append(RejectedRow(line, row, str(e)))
+    return result
+
+
+def _optional(clean: Callable[[str], str], value: Optional[str]) -> Optional[str]:
+    return clean(value) if value and value.strip() else None
+
+
+def _timestamp(value: Optional[str], column: str) -> Optional[DateTime]:
+    if not value or not value.strip():
+        return None
+    try:
+        timestamp = DateTime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError(f"Invalid {column}, expected an ISO date like 2026-01-31")
+    # notes keep naive local times, an offset is converted to local time
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from models import Contact
+from services.field_index import HashIndex
+from services.text import tokenize
+
+# evidence weights, a pair at or above the threshold is a duplicate
+PHONE_WEIGHT = 0.6
+EMAIL_WEIGHT = 0.6
+BIRTHDAY_WEIGHT = 0.2
+NAME_WEIGHT = 0.4
+# blocks larger than this (a common first name) are not paired up
+MAX_BLOCK = 20
+
+
+def blocking_keys(contact: Contact) -> list[str]:
+    """Keys shared by contacts that may be the same person"""
+    keys = [f"phone:{phone.value}" for phone in contact.phones]
+    if contact.email:
+        keys.append(f"email:{contact.email.value.casefold()}")
+    if contact.birthday:
+        keys.append(f"birthday:{contact.birthday.value}")
+    keys.extend(f"name:{token}" for token in _name_tokens(contact) if len(token) > 1)
+    return keys
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    """Two contacts likely to be the same person and why"""
+    first: Contact
+    second: Contact
+    score: float
+    reasons: tuple[str, ...]
+
+
+def score(first: Contact, second: Contact) -> tuple[float, tuple[str, ...]]:
+    """Score the evidence that two contacts are the same person, 0 to 1"""
+    return _score(_features(first), _features(second))
+
+
+class DuplicateFinder:
+    """
+    Duplicate contacts found by blocking instead of comparing every pair.
+
+    Contacts are kept in blocks sharing a normalized phone, email, birthday
+    or name token, updated on every change. Only pairs inside a block are
+    scored, each pair once, so the work grows with the block sizes rather
+    than with the square of the contacts.
+    """
+    def __init__(self, max_block: int = MAX_BLOCK):
+        self.__blocks: HashIndex[str, Contact] = HashIndex(blocking_keys)
+        self.__features: dict[str, _Features] = {}
+        self.__max_block: int = max_block
+
+    def upsert(self, key: str, record: Contact) -> None:
+        self.__blocks.upsert(key, record)
+        self.__features[key] = _features(record)
+
+    def remove(self, key: str) -> None:
+        self.__blocks.remove(key)
+        self.__features.pop(key, None)
+
+    def find(
+        self, get: Callable[[str], Contact], threshold: float = 0.6
+    ) -> list[DuplicateMatch]:
+        """Return pairs scoring at least threshold, best first"""
+        features = self.__features
+        seen: set[tuple[str, str]] = set()
+        matches = []
+        for _, names in self.__blocks.postings():
+            if len(names) < 2 or len(names) > self.__max_block:
+                continue
+            for pair in _pairs(sorted(names)):
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                value, reasons = _score(features[pair[0]], features[pair[1]])
+                if value >= threshold:
+                    first, second = get(pair[0]), get(pair[1])
+                    matches.append(DuplicateMatch(first, second, value, reasons))
+
+        matches.sort(key=lambda m: (-m.score, m.first.name.value, m.second.name.value))
+        return matches
+
+
+def _name_tokens(contact: Contact) -> list[str]:
+    return tokenize(contact.name.value.casefold())
+
+
+# phones, casefolded email, birthday and name tokens of a contact
+_Features = tuple[frozenset[str], Optional[str], Optional[str], frozenset[str]]
+
+
+def _features(contact: Contact) -> _Features:
+    return (
+        frozenset(phone.value for phone in contact.phones),
+        contact.email.value.casefold() if contact.email else None,
+        contact.birthday.value if contact.birthday else None,
+        frozenset(_name_tokens(contact)),
+    )
+
+
+def _score(first: _Features, second: _Features) -> tuple[float, tuple[str, ...]]:
+    phones, email, birthday, tokens = first
+    other_phones, other_email, other_birthday, other_tokens = second
+    total, reasons = 0.0, []
+    if not phones.isdisjoint(other_phones):
+        total += PHONE_WEIGHT
+        reasons.append("phone")
+    if email is not None and email == other_email:
+        total += EMAIL_WEIGHT
+        reasons.append("email")
+    if birthday is not None and birthday == other_birthday:
+        total += BIRTHDAY_WEIGHT
+        reasons.append("birthday")
+    if not tokens.isdisjoint(other_tokens):
+        total += NAME_WEIGHT * len(tokens & other_tokens) / len(tokens | other_tokens)
+        reasons.append("name")
+    return min(total, 1.0), tuple(reasons)
+
+
+def _pairs(names: list[str]) -> Iterable[tuple[str, str]]:
+    for i, first in enumerate(names):
+        for second in names[i + 1:]:
+            yield first, second
@@ -0,0 +1,114 @@
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from typing import Callable, Generic, Hashable, Iterable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class HashIndex(Generic[K, T]):
+    """
+    Exact-match index: every value of a record points to the record key.
+
+    Multi-valued fields (phones, tags) store one posting per value, so
+    a lookup returns the posting set without touching the records.
+    """
+    def __init__(self, values: Callable[[T], Iterable[str]]):
+        self.__values = values
+        self.__postings: dict[str, set[K]] = {}
+        self.__indexed: dict[K, frozenset[str]] = {}
+
+    def upsert(self, key: K, record: T) -> None:
+        values = frozenset(self.__values(record))
+        previous = self.__indexed.get(key)
+        if previous is None:  # a new record, nothing to diff against
+            postings = self.__postings
+            for value in values:
+                postings.setdefault(value, set()).add(key)
+            self.__indexed[key] = values
+            return
+        for value in previous - values:
+            self.__discard(value, key)
+        for value in values - previous:
+            self.__postings.setdefault(value, set()).add(key)
+        self.__indexed[key] = values
+
+    def remove(self, key: K) -> None:
+        for value in self.__indexed.pop(key, ()):
+            self.__discard(value, key)
+
+    def lookup(self, value: str) -> set[K]:
+        """Keys of the records having the value, must not be modified"""
+        return self.__postings.get(value, set())
+
+    def count(self, value: str) -> int:
+        """Number of records having the value"""
+        return len(self.__postings.get(value, ()))
+
+    def postings(self) -> Iterable[tuple[str, set[K]]]:
+        """Every value with the keys having it, must not be modified"""
+        return self.__postings.items()
+
+    def __discard(self, value: str, key: K) -> None:
+        posting = self.__postings[value]
+        posting.discard(key)
+        if not posting:
+            del self.__postings[value]
+
+
+class DateRangeIndex(Generic[K, T]):
+    """
+    Records ordered by a date, ranges are found with two bisects.
+
+    Records loaded in bulk are sorted once; later edits insert in place.
+    """
+    def __init__(self, value: Callable[[T], Optional[date]]):
+        self.__value = value
+        self.__entries: list[tuple[date, K]] = []
+        self.__indexed: dict[K, date] = {}
+
+    def upsert(self, key: K, record: T) -> None:
+        value = self.__value(record)
+        if self.__indexed.get(key) == value:
+            return
+        self.remove(key)
+        if value is not None:
+            insort(self.__entries, (value, key))
+            self.__indexed[key] = value
+
+    def load(self, records: Iterable[tuple[K, T]]) -> None:
+        added = []
+        for key, record in records:
+            if key in self.__indexed:
+                self.upsert(key, record)
+                continue
+            value = self.__value(record)
+            if value is not None:
+                added.append((value, key))
+                self.__indexed[key] = value
+        self.__entries.extend(added)
+        self.__entries.sort()
+
+    def remove(self, key: K) -> None:
+        value = self.__indexed.pop(key, None)
+        if value is not None:
+            del self.__entries[bisect_left(self.__entries, (value, key))]
+
+    def range(self, low: Optional[date], high: Optional[date]) -> list[K]:
+        """Keys of the records dated within [low, high], bounds are optional"""
+        start, end = self.__bounds(low, high)
+        return [key for _, key in self.__entries[start:end]]
+
+    def count(self, low: Optional[date], high: Optional[date]) -> int:
+        """Number of records dated within [low, high]"""
+        start, end = self.__bounds(low, high)
+        return max(end - start, 0)
+
+    def __bounds(self, low: Optional[date], high: Optional[date]) -> tuple[int, int]:
+        # a bare (day,) sorts before every (day, key) entry of that day
+        start = 0 if low is None else bisect_left(self.__entries, (low,))
+        end = (
+            len(self.__entries) if high is None or high == date.max
+            else bisect_left(self.__entries, (high + timedelta(days=1),))
+        )
+        return start, end
@@ -0,0 +1,121 @@
+from models import Contact
+
+
+class FuzzyNameIndex:
+    """
+    Typo-tolerant lookup of contact names (SymSpell-style deletion index).
+
+    Every casefolded name is indexed under the strings obtained by deleting
+    up to ``max_distance`` characters from its first ``prefix_length``
+    characters. A query generates the same deletes for itself, so candidates
+    are found with a few dict lookups and only they are verified with
+    an exact edit distance. Limiting deletes to a prefix keeps the index
+    small; typos past the prefix are still found through the exact prefix.
+    """
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+        self.__max_distance: int = max_distance
+        self.__prefix_length: int = prefix_length
+        # most deletes belong to a single name, kept unwrapped to save memory
+        self.__deletes: dict[str, str | list[str]] = {}
+        # casefolded name -> names of the contacts spelled that way
+        self.__names: dict[str, set[str]] = {}
+        self.__keys: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def upsert(self, name: str, contact: Contact) -> None:
+        """Index a contact name, the name is the repository key"""
+        if name in self.__keys:
+            return
+
+        key = name.casefold()
+        self.__keys[name] = key
+        spellings = self.__names.setdefault(key, set())
+        spellings.add(name)
+        if len(spellings) > 1:
+            return
+        for variant in self.__variants(key):
+            keys = self.__deletes.setdefault(variant, key)
+            if keys is key:
+                continue
+            if isinstance(keys, str):
+                self.__deletes[variant] = [keys, key]
+            else:
+                keys.append(key)
+
+    def remove(self, name: str) -> None:
+        """Drop a contact name from the index"""
+        key = self.__keys.pop(name, None)
+        if key is None:
+            return
+
+        spellings = self.__names[key]
+        spellings.discard(name)
+        if spellings:
+            return
+        del self.__names[key]
+        for variant in self.__variants(key):
+            keys = self.__deletes[variant]
+            if isinstance(keys, str):
+                del self.__deletes[variant]
+                continue
+            keys.remove(key)
+            if len(keys) == 1:
+                self.__deletes[variant] = keys[0]
+
+    def lookup(self, query: str, limit: int = 3) -> list[tuple[str, int]]:
+        """Return up to limit (name, distance) pairs, closest first"""
+        query = query.casefold()
+        found: dict[str, int] = {}
+        for variant in self.__variants(query):
+            keys = self.__deletes.get(variant, ())
+            for key in (keys,) if isinstance(keys, str) else keys:
+                if key not in found:
+                    found[key] = edit_distance(query, key, self.__max_distance)
+
+        matches = sorted(
+            (distance, name)
+            for key, distance in found.items() if distance <= self.__max_distance
+            for name in self.__names[key]
+        )
+        return [(name, distance) for distance, name in matches[:limit]]
+
+    def __variants(self, key: str) -> set[str]:
+        # deletes of the previous distance, one character deleted at a time
+        edge = {key[:self.__prefix_length]}
+        variants = set(edge)
+        for _ in range(self.__max_distance):
+            edge = {v[:i] + v[i + 1:] for v in edge for i in range(len(v))}
+            variants |= edge
+        return variants
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> int:
+    """
+    Damerau-Levenshtein distance (optimal string alignment) of two strings.
+
+    Returns max_distance + 1 as soon as the distance is known to exceed it.
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    previous2: list[int] = []
+    previous = list(range(len(target) + 1))
+    for i, char in enumerate(source, start=1):
+        current = [i] + [0] * len(target)
+        for j, other in enumerate(target, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char != other),
+            )
+            if (
+                i > 1 and j > 1
+                and char == target[j - 2] and source[i - 2] == other
+            ):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
@@ -4,3 +4,4 @@ from typing import Protocol
 class IDGenerator(Protocol):
     """Generator for the id"""
     def generate(self) -> int: ...
+    def reserve(self, count: int) -> range: ...
@@ -0,0 +1,36 @@
+import threading
+from typing import Any, Callable, Generic, Optional, Protocol, TypeVar
+
+T = TypeVar("T")
+
+
+class Attaching(Protocol):
+    """Repository keeping attached secondary indexes in sync"""
+    def attach(self, index: Any) -> None: ...
+
+
+class LazyIndex(Generic[T]):
+    """
+    Secondary index built and attached to a repository on first use.
+
+    Building an index walks every record, so indexes serving a single
+    command stay out of startup. ``get`` must be called outside the
+    repository read lock: attaching takes the write lock.
+    """
+    def __init__(self, repo: Attaching, factory: Callable[[], T]):
+        self.__repo: Attaching = repo
+        self.__factory: Callable[[], T] = factory
+        self.__index: Optional[T] = None
+        self.__lock = threading.Lock()
+
+    def get(self) -> T:
+        """Return the index, built and attached by the first caller"""
+        index = self.__index
+        if index is None:
+            with self.__lock:
+                if self.__index is None:
+                    index = self.__factory()
+                    self.__repo.attach(index)
+                    self.__index = index
+                index = self.__index
+        return index
@@ -0,0 +1,309 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from copy import copy
+from dataclasses import dataclass, field
+
+from models import Note
+from models.values import Tag
+from services.notes_request import CreateNoteReq
+from services.notes_service import NotesService
+
+MANIFEST = ".notes-sync.json"
+MANIFEST_VERSION = 1
+
+_SLUG = re.compile(r"[^\w]+")
+
+
+@dataclass(frozen=True)
+class MarkdownNote:
+    """Title, body and tags read from a Markdown file"""
+    title: str
+    body: str
+    tags: list[str]
+
+
+@dataclass
+class SyncReport:
+    """What a sync changed on either side, by file path"""
+    imported: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    written: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    conflicts: list[str] = field(default_factory=list)
+    errors: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        """Whether the notes or the files were changed"""
+        return any((
+            self.imported, self.updated, self.deleted, self.written, self.removed,
+        ))
+
+
+def render_markdown(note: Note) -> str:
+    """The note as Markdown with title and tags in the front matter"""
+    tags = ", ".join(sorted(tag.value for tag in note.tags))
+    body = note.body.value
+    return f"---\ntitle: {note.title.value}\ntags: [{tags}]\n---\n" + (
+        f"{body}\n" if body else ""
+    )
+
+
+def parse_markdown(text: str) -> MarkdownNote:
+    """
+    Read a Markdown note, front matter optional.
+
+    Without a title in the front matter the first line of the text is the
+    title, with its heading marks removed.
+    """
+    meta: dict[str, str] = {}
+    lines = text.replace("\r\n", "\n").split("\n")
+    if lines[0].strip() == "---":
+        end = next((i for i in range(1, len(lines)) if lines[i].strip() == "---"), None)
+        if end is not None:
+            for line in lines[1:end]:
+                key, sep, value = line.partition(":")
+                if sep:
+                    meta[key.strip().lower()] = value.strip()
+            lines = lines[end + 1:]
+
+    title = meta.get("title", "")
+    if not title:
+        while lines and not lines[0].strip():
+            lines = lines[1:]
+        if lines:
+            title, lines = lines[0].lstrip("#").strip(), lines[1:]
+    if not title:
+        raise ValueError("Note file needs a title")
+
+    tags = meta.get("tags", "").strip("[]")
+    return MarkdownNote(
+        title=title,
+        body="\n".join(lines).strip(),
+        tags=[t.strip().strip("'\"") for t in tags.split(",") if t.strip()],
+    )
+
+
+class MarkdownSync:
+    """
+    Two-way sync of the notes with a directory of Markdown files.
+
+    A manifest in the directory maps every file to its note with the file
+    mtime, size and content hash and the note ``updated_at`` seen at the
+    last sync. A file whose mtime and size match is not read; otherwise its
+    hash tells whether the content changed. A note changed when its
+    ``updated_at`` moved. Changed files are parsed and pushed to the notes
+    service in batches, changed notes are written out, and a pair changed
+    on both sides is a conflict left untouched unless both now hold the same
+    content.
+    """
+    def __init__(self, notes: NotesService, directory: str):
+        self.__notes: NotesService = notes
+        self.__directory: str = directory
+        self.__manifest_path: str = os.path.join(directory, MANIFEST)
+
+    def sync(self) -> SyncReport:
+        """Bring the files and the notes up to date with each other"""
+        manifest = self.__load()
+        notes = {note.note_id: note for note in self.__notes.all()}
+        files = self.__scan()
+        report = SyncReport()
+        # files read keep the stat taken before the read, so a save racing
+        # the sync changes the mtime or size and is picked up next time
+        edits: list[tuple[str, bytes, os.stat_result, Note]] = []
+        new_files: list[tuple[str, bytes, os.stat_result]] = []
+        deletes: list[str] = []
+        refreshed = False  # entries changed without changing any side
+
+        for path, stat in files.items():
+            entry = manifest.get(path)
+            data = None
+            if entry is None or (entry["mtime_ns"], entry["size"]) != (
+                stat.st_mtime_ns, stat.st_size
+            ):
+                data = self.__read(path)
+                if entry is not None and _digest(data) == entry["hash"]:
+                    entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+                    data, refreshed = None, True  # touched, same content
+            if entry is None:
+                new_files.append((path, data, stat))
+                continue
+
+            note = notes.get(entry["note_id"])
+            note_changed = note is None or _stamp(note) != entry["updated"]
+            if data is None and not note_changed:
+                continue
+            if data is None:
+                if note is None:
+                    os.remove(self.__full(path))
+                    del manifest[path]
+                    report.removed.append(path)
+                else:
+                    manifest[path] = self.__write(path, note)
+                    report.written.append(path)
+            elif not note_changed:
+                edits.append((path, data, stat, note))
+            elif note is not None and _digest(data) == _digest(_encode(note)):
+                manifest[path] = _entry(data, stat, note)
+                refreshed = True
+            else:
+                report.conflicts.append(path)
+
+        for path in [p for p in manifest if p not in files]:
+            note = notes.get(manifest[path]["note_id"])
+            if note is None:
+                del manifest[path]
+                refreshed = True
+            elif _stamp(note) == manifest[path]["updated"]:
+                deletes.append(path)
+            else:
+                report.conflicts.append(path)
+
+        self.__apply_edits(edits, manifest, report)
+        self.__import(new_files, manifest, report)
+        if deletes:
+            self.__notes.delete_many(manifest[p]["note_id"] for p in deletes)
+            for path in deletes:
+                del manifest[path]
+            report.deleted.extend(deletes)
+
+        tracked = {entry["note_id"] for entry in manifest.values()}
+        for note in self.__notes.all():
+            if note.note_id not in tracked:
+                path = self.__new_path(note, files)
+                manifest[path] = self.__write(path, note)
+                report.written.append(path)
+
+        if report.changed or refreshed:
+            self.__save(manifest)
+        return report
+
+    def __apply_edits(
+        self,
+        edits: list[tuple[str, bytes, os.stat_result, Note]],
+        manifest: dict,
+        report: SyncReport,
+    ) -> None:
+        edited = []
+        for path, data, stat, note in edits:
+            try:
+                parsed = parse_markdown(data.decode("utf-8"))
+                note = copy(note)
+                note.edit_note(parsed.title, parsed.body, {Tag(t) for t in parsed.tags})
+            except (UnicodeDecodeError, ValueError) as e:
+                report.errors.append((path, str(e)))
+                continue
+            edited.append((path, data, stat, note))
+
+        self.__notes.upsert_many(note for *_, note in edited)
+        for path, data, stat, note in edited:
+            manifest[path] = _entry(data, stat, note)
+            report.updated.append(path)
+
+    def __import(
+        self,
+        new_files: list[tuple[str, bytes, os.stat_result]],
+        manifest: dict,
+        report: SyncReport,
+    ) -> None:
+        parsed = []
+        for path, data, stat in new_files:
+            try:
+                note = parse_markdown(data.decode("utf-8"))
+            except (UnicodeDecodeError, ValueError) as e:
+                report.errors.append((path, str(e)))
+                continue
+            parsed.append(
+                (path, data, stat, CreateNoteReq(note.title, note.body, note.tags))
+            )
+
+        result = self.__notes.add_many(req for *_, req in parsed)
+        failed = {error.index: error.message for error in result.errors}
+        added = iter(result.added)
+        for i, (path, data, stat, _) in enumerate(parsed):
+            if i in failed:
+                report.errors.append((path, failed[i]))
+                continue
+            manifest[path] = _entry(data, stat, next(added))
+            report.imported.append(path)
+
+    def __scan(self) -> dict[str, os.stat_result]:
+        # relative posix path -> stat of every .md file, hidden entries skipped
+        files: dict[str, os.stat_result] = {}
+        stack = [""]
+        while stack:
+            relative = stack.pop()
+            with os.scandir(os.path.join(self.__directory, relative)) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    path = f"{relative}/{entry.name}" if relative else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(path)
+                    elif entry.name.endswith(".md") and entry.is_file():
+                        files[path] = entry.stat()
+        return files
+
+    def __new_path(self, note: Note, files: dict) -> str:
+        slug = _SLUG.sub("-", note.title.value.lower()).strip("-")[:40] or "note"
+        path, n = f"{note.note_id}-{slug}.md", 1
+        while path in files or os.path.exists(self.__full(path)):
+            n += 1
+            path = f"{note.note_id}-{slug}-{n}.md"
+        return path
+
+    def __write(self, path: str, note: Note) -> dict:
+        data = _encode(note)
+        with open(self.__full(path), "wb") as file:
+            file.write(data)
+        return _entry(data, os.stat(self.__full(path)), note)
+
+    def __read(self, path: str) -> bytes:
+        with open(self.__full(path), "rb") as file:
+            return file.read()
+
+    def __full(self, path: str) -> str:
+        return os.path.join(self.__directory, *path.split("/"))
+
+    def __load(self) -> dict[str, dict]:
+        try:
+            with open(self.__manifest_path, encoding="utf-8") as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported sync manifest {self.__manifest_path}")
+        return manifest["files"]
+
+    def __save(self, manifest: dict[str, dict]) -> None:
+        # written aside and renamed, a crash never leaves half a manifest
+        fd, tmp = tempfile.mkstemp(dir=self.__directory, prefix=MANIFEST)
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump({"version": MANIFEST_VERSION, "files": manifest}, file)
+        os.replace(tmp, self.__manifest_path)
+
+
+def _entry(data: bytes, stat: os.stat_result, note: Note) -> dict:
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": _digest(data),
+        "note_id": note.note_id,
+        "updated": _stamp(note),
+    }
+
+
+def _encode(note: Note) -> bytes:
+    return render_markdown(note).encode("utf-8")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _stamp(note: Note) -> str:
+    return note.updated_at.isoformat()
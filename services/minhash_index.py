@@ -0,0 +1,173 @@
+import zlib
+from array import array
+from operator import eq
+
+from models import Note
+from services.text import tokenize
+
+SHINGLE_SIZE = 3  # words per shingle
+_BIN_BITS = 6
+BINS = 1 << _BIN_BITS  # signature length
+_VALUE_BITS = 32 - _BIN_BITS
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+_EMPTY = 1 << 32  # larger than any value, also after densification offsets
+_MIX = 0x9E3779B1  # spreads crc32 bits before the top ones pick the bin
+
+
+def shingles(text: str) -> set[str]:
+    """Overlapping word n-grams of the text, the words for short texts"""
+    words = tokenize(text)
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i:i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(features: set[str]) -> bytes:
+    """
+    One-permutation MinHash signature of a non-empty feature set.
+
+    Each feature is hashed once: the top bits pick one of the bins, the rest
+    competes for the bin minimum. Empty bins borrow the value of the next
+    filled bin, offset by the distance, so sparse sets still compare well.
+    The bins are packed as 32-bit values.
+    """
+    bins = [_EMPTY] * BINS
+    for feature in features:
+        hashed = (zlib.crc32(feature.encode()) * _MIX) & 0xFFFFFFFF
+        position, value = hashed >> _VALUE_BITS, hashed & _VALUE_MASK
+        if value < bins[position]:
+            bins[position] = value
+
+    for position, value in enumerate(bins):
+        if value != _EMPTY:
+            continue
+        for distance in range(1, BINS):
+            borrowed = bins[(position + distance) % BINS]
+            if borrowed <= _VALUE_MASK:  # filled, not borrowed itself
+                bins[position] = borrowed + (distance << _VALUE_BITS)
+                break
+    return array("I", bins).tobytes()
+
+
+def similarity(first: bytes, second: bytes) -> float:
+    """Jaccard similarity estimated from two signatures"""
+    first, second = memoryview(first).cast("I"), memoryview(second).cast("I")
+    return sum(map(eq, first, second)) / BINS
+
+
+class MinHashIndex:
+    """
+    Locality-sensitive hashing of note MinHash signatures.
+
+    A signature is cut into ``bands`` of rows; notes whose rows agree in any
+    band share a bucket. Signatures and buckets are updated on every add,
+    edit and delete, and the buckets holding more than one note are tracked,
+    so finding duplicates only visits collisions instead of all pairs. With
+    the default 16 bands of 4 rows, pairs above ~0.5 Jaccard are likely to
+    collide.
+    """
+    def __init__(self, bands: int = 16):
+        if BINS % bands:
+            raise ValueError(f"Bands must divide the signature length {BINS}")
+        self.__bands: int = bands
+        self.__band_size: int = BINS // bands * array("I").itemsize
+        self.__signatures: dict[int, bytes] = {}
+        # a bucket holds a single note id, or a list once notes collide
+        self.__buckets: dict[int, int | list[int]] = {}
+        self.__collisions: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.__signatures)
+
+    def upsert(self, note_id: int, note: Note) -> None:
+        """Index a new note or re-index a changed one"""
+        features = shingles(f"{note.title.value} {note.body.value}")
+        new = signature(features) if features else None
+        if new == self.__signatures.get(note_id):
+            return
+
+        self.remove(note_id)
+        if new is None:
+            return
+        self.__signatures[note_id] = new
+        buckets = self.__buckets
+        for key in self.__keys(new):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = note_id
+            elif isinstance(bucket, list):
+                bucket.append(note_id)
+            else:
+                buckets[key] = [bucket, note_id]
+                self.__collisions.add(key)
+
+    def remove(self, note_id: int) -> None:
+        """Drop a note from the index"""
+        old = self.__signatures.pop(note_id, None)
+        if old is None:
+            return
+
+        buckets = self.__buckets
+        for key in self.__keys(old):
+            bucket = buckets[key]
+            if not isinstance(bucket, list):
+                del buckets[key]
+                continue
+            bucket.remove(note_id)
+            if len(bucket) == 1:
+                buckets[key] = bucket[0]
+                self.__collisions.discard(key)
+
+    def clusters(self, threshold: float = 0.5) -> list[list[tuple[int, float]]]:
+        """
+        Group notes whose estimated Jaccard similarity reaches threshold.
+
+        Every note of a colliding bucket is compared with the first one only
+        and similar pairs are joined, so the work grows with the collisions
+        rather than with their pairs. A cluster lists its smallest id first,
+        each with the similarity to that note.
+        """
+        signatures = self.__signatures
+        parents: dict[int, int] = {}
+
+        def root(note_id: int) -> int:
+            parents.setdefault(note_id, note_id)
+            while parents[note_id] != note_id:
+                parents[note_id] = parents[parents[note_id]]  # path halving
+                note_id = parents[note_id]
+            return note_id
+
+        for key in self.__collisions:
+            first, *others = self.__buckets[key]
+            anchor = signatures[first]
+            for other in others:
+                # pairs already joined through another band are not compared
+                a, b = root(first), root(other)
+                if a != b and similarity(anchor, signatures[other]) >= threshold:
+                    parents[max(a, b)] = min(a, b)
+
+        groups: dict[int, list[int]] = {}
+        for note_id in parents:
+            groups.setdefault(root(note_id), []).append(note_id)
+
+        clusters = []
+        for head, members in sorted(groups.items()):
+            if len(members) < 2:
+                continue
+            members.sort()
+            clusters.append([
+                (note_id, similarity(signatures[head], signatures[note_id]))
+                for note_id in members
+            ])
+        return clusters
+
+    def __keys(self, sig: bytes) -> list[int]:
+        # bands are hashed to ints, a stray collision only costs a comparison
+        size = self.__band_size
+        return [
+            hash((band, sig[band * size:(band + 1) * size]))
+            for band in range(self.__bands)
+        ]
@@ -42,6 +42,39 @@ class FindReq:
     query: str
 
 
+@dataclass(frozen=True)
+class RenameTagReq:
+    """Request to rename a tag on every note"""
+    old: str
+    new: str
+
+
+@dataclass(frozen=True)
+class QueryReq:
+    """Request to find notes with the structured query language"""
+    query: str
+
+
+@dataclass(frozen=True)
+class RankedFindReq:
+    """Request to find the most relevant notes for a query"""
+    query: str
+    limit: int = 10
+
+
+@dataclass(frozen=True)
+class RelatedReq:
+    """Request to find the notes most similar to a note"""
+    note_id: int
+    limit: int = 5
+
+
+@dataclass(frozen=True)
+class DuplicatesReq:
+    """Request to group notes with nearly the same title and body"""
+    threshold: float = 0.5
+
+
 @dataclass(frozen=True)
 class FindByTagsReq:
     """Request to find notes by tags"""
@@ -50,8 +83,10 @@ class FindByTagsReq:
 
 @dataclass(frozen=True)
 class SortByTagsReq:
-    """Request to sort notes by tags"""
+    """Request to sort notes by tags, optionally one page of the result"""
     tags: list[str]
+    limit: int | None = None
+    offset: int = 0
 
 
 @dataclass(frozen=True)
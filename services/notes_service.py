@@ -1,16 +1,34 @@
-from typing import Iterable, Optional
+import heapq
+from datetime import date, datetime as DateTime
+from typing import Callable, Hashable, Iterable, Optional
 
 from models.note import Note
-from models.values import Tag
+from exceptions import NotFoundError
+from models.values import Tag, validate_batch
 from repositories.notes_repo import NotesRepository
+from services import analytics
+from services.batch import BatchResult, ItemError
+from services.bm25_index import BM25Index
+from services.completion_index import KeyCompletion, TagCompletion
+from services.field_index import DateRangeIndex, HashIndex
 from services.id_gen import IDGenerator
+from services.lazy_index import LazyIndex
+from services.minhash_index import MinHashIndex
+from services.query import FieldKind, QueryField, QueryPlanner, parse_query
+from services.query_cache import QueryCache, CacheStats
+from services.related_index import RelatedNotesIndex
 from services.notes_request import (
     CreateNoteReq,
     GetNoteReq,
     EditTitleReq,
     EditBodyReq,
     EditTagsReq,
+    RenameTagReq,
     FindReq,
+    RankedFindReq,
+    RelatedReq,
+    DuplicatesReq,
+    QueryReq,
     FindByTagsReq,
     SortByTagsReq,
     DeleteReq,
@@ -19,10 +37,26 @@ from services.notes_request import (
 
 class NotesService:
     """Service for the notes"""
-    def __init__(self, repo: NotesRepository, id_gen: IDGenerator):
+    def __init__(
+        self,
+        repo: NotesRepository,
+        id_gen: IDGenerator,
+        cache_size: int = 128,
+    ):
         """Initialize with a repository and ID generator."""
         self.__repo: NotesRepository = repo
         self.__id_gen: IDGenerator = id_gen
+        self.__cache = QueryCache(cache_size)
+        # built on the first search-notes, note <id> and duplicate-notes,
+        # walking every body is costly
+        self.__ranking = LazyIndex(repo, BM25Index)
+        self.__related = LazyIndex(repo, RelatedNotesIndex)
+        self.__duplicates = LazyIndex(repo, MinHashIndex)
+        self.__ids = KeyCompletion()
+        self.__tags = TagCompletion()
+        repo.attach(self.__ids)
+        repo.attach(self.__tags)
+        self.__planner = self.__create_planner()
 
     def add_note(self, req: CreateNoteReq) -> Note:
         """Add a note to the repository"""
@@ -33,6 +67,88 @@ class NotesService:
 
         return note
 
+    def add_many(self, reqs: Iterable[CreateNoteReq]) -> BatchResult[Note]:
+        """
+        Add notes in one batch, invalid requests are reported per item.
+
+        Titles and tags of all requests are validated in two batches, then
+        ids for the valid ones are reserved as one block and the notes are
+        stored and indexed at once.
+        """
+        reqs = list(reqs)
+        owners = [i for i, req in enumerate(reqs) for _ in req.tags]
+        checked = validate_batch("tag", [t for req in reqs for t in req.tags])
+        titles = validate_batch("title", [req.title.strip() for req in reqs])
+
+        problems = {e.index: e.message for e in titles.errors}
+        for error in checked.errors:
+            problems.setdefault(owners[error.index], error.message)
+        tags: list[set[Tag]] = [set() for _ in reqs]
+        for owner, tag in zip(owners, checked.fields):
+            if tag is not None:
+                tags[owner].add(tag)
+
+        result = BatchResult()
+        valid = []
+        for i, req in enumerate(reqs):
+            if i in problems:
+                error = ValueError(problems[i])
+                result.errors.append(ItemError(i, req.title, error))
+            else:
+                valid.append((req, tags[i]))
+
+        now = DateTime.now()
+        ids = self.__id_gen.reserve(len(valid))
+        notes = [
+            Note(note_id, req.title, req.body, tags, now)
+            for note_id, (req, tags) in zip(ids, valid)
+        ]
+        self.__repo.add_many(notes)
+        result.added.extend(notes)
+        return result
+
+    def import_records(self, records: Iterable[dict]) -> BatchResult[Note]:
+        """
+        Add notes from validated to_dict records without ids, e.g. a CSV chunk.
+
+        Ids are reserved as one block and the notes stored in one batch.
+        """
+        records = list(records)
+        notes = [
+            Note.from_dict({**record, "note_id": note_id}, validated=True)
+            for note_id, record in zip(self.__id_gen.reserve(len(records)), records)
+        ]
+        self.__repo.add_many(notes)
+        return BatchResult(added=notes)
+
+    def upsert_many(self, notes: Iterable[Note]) -> BatchResult[Note]:
+        """Add or replace whole notes by id in one batch, e.g. from an import"""
+        result = BatchResult()
+        batch: dict[int, Note] = {}
+        for i, note in enumerate(notes):
+            if note.note_id <= 0:
+                error = ValueError(f"Invalid note id: {note.note_id}")
+                result.errors.append(ItemError(i, note.note_id, error))
+            else:
+                batch[note.note_id] = note
+
+        for note in batch.values():
+            exists = self.__repo.get(note.note_id, None) is not None
+            (result.updated if exists else result.added).append(note)
+        self.__repo.upsert_many(batch.values())
+        return result
+
+    def delete_many(self, note_ids: Iterable[int]) -> BatchResult[Note]:
+        """Delete notes in one batch, unknown ids are reported per item"""
+        note_ids = list(note_ids)
+        result = BatchResult(deleted=self.__repo.delete_many(note_ids))
+        deleted = set(result.deleted)
+        for i, note_id in enumerate(note_ids):
+            if note_id not in deleted:
+                error = NotFoundError(f"Note: {note_id}")
+                result.errors.append(ItemError(i, note_id, error))
+        return result
+
     def get_note(self, req: GetNoteReq) -> Optional[Note]:
         """Get a note from the repository"""
         return self.__repo.get(req.note_id)
@@ -62,26 +178,133 @@ class NotesService:
 
         return note
 
+    def rename_tag(self, req: RenameTagReq) -> list[Note]:
+        """Replace a tag on every note using it, as one batch"""
+        old, new = Tag(req.old), Tag(req.new)
+        notes = self.__repo.find_by_tags({old})
+        for note in notes:
+            note.edit_note(new_tags=(note.tags - {old}) | {new})
+        self.__repo.upsert_many(notes)
+
+        return notes
+
     def find(self, req: FindReq) -> Iterable[Note]:
         """Find notes by title"""
-        return self.__repo.find(req.query)
+        return self.__cached(
+            req,
+            lambda: self.__repo.find(req.query),
+        )
+
+    def find_ranked(self, req: RankedFindReq) -> list[tuple[Note, float]]:
+        """Find the most relevant notes for a query, scored with BM25"""
+        if req.limit < 0:
+            raise ValueError("Limit must not be negative")
+
+        ranking = self.__ranking.get()
+        return self.__cached(
+            req,
+            lambda: [
+                (self.__repo.get(note_id), score)
+                for note_id, score in ranking.search(req.query, req.limit)
+            ],
+        )
+
+    def related(self, req: RelatedReq) -> list[tuple[Note, float]]:
+        """Find the notes sharing most tags and words with a note, by cosine"""
+        if req.limit < 0:
+            raise ValueError("Limit must not be negative")
+        self.__repo.get(req.note_id)
+
+        related = self.__related.get()
+        return self.__cached(
+            req,
+            lambda: [
+                (self.__repo.get(note_id), score)
+                for note_id, score in related.related(req.note_id, req.limit)
+            ],
+        )
+
+    def duplicates(self, req: DuplicatesReq) -> list[list[tuple[Note, float]]]:
+        """Group near-duplicate notes with their estimated Jaccard similarity"""
+        if not 0 < req.threshold <= 1:
+            raise ValueError("Threshold must be greater than 0 and at most 1")
+
+        duplicates = self.__duplicates.get()
+        return self.__cached(
+            req,
+            lambda: [
+                [(self.__repo.get(note_id), score) for note_id, score in cluster]
+                for cluster in duplicates.clusters(req.threshold)
+            ],
+        )
+
+    def query(self, req: QueryReq) -> list[Note]:
+        """Find notes matching all terms of a structured query"""
+        return self.__cached(
+            req,
+            lambda: self.__planner.run(self.__planner.plan(parse_query(req.query))),
+        )
+
+    def explain(self, req: QueryReq) -> list[str]:
+        """Describe how a structured query would be executed"""
+        with self.__repo.reading():
+            return self.__planner.plan(parse_query(req.query)).describe()
 
     def find_by_tags(self, req: FindByTagsReq) -> Iterable[Note]:
         """Find notes by tags"""
         tags = self.__prepare_tags(req.tags)
-        return self.__repo.find_by_tags(tags)
+        return self.__cached(
+            ("tags", frozenset(tags)),
+            lambda: self.__repo.find_by_tags(tags),
+        )
 
     def sort_by_tags(self, req: SortByTagsReq) -> Iterable[Note]:
-        """Sort notes by tags"""
+        """
+        Sort notes by tags.
+
+        With a limit only the top offset + limit notes are selected with
+        a heap, O(n log k) instead of sorting every note.
+        """
+        if (req.limit is not None and req.limit < 0) or req.offset < 0:
+            raise ValueError("Limit and offset must not be negative")
+
         tags = self.__prepare_tags(req.tags)
-        notes = list(self.__repo.all())
+        notes = self.__repo.all()
+
         #  Sort notes by tags and updated at (to make it stable)
-        notes.sort(
-            key=lambda n: (n.count_matching_tags(tags), n.updated_at),
-            reverse=True,
+        def rank(n: Note):
+            return n.count_matching_tags(tags), n.updated_at
+
+        if req.limit is None:
+            ranked = sorted(notes, key=rank, reverse=True)
+        else:
+            # same order and tie-breaking as sorted(..., reverse=True)[:k]
+            ranked = heapq.nlargest(req.offset + req.limit, notes, key=rank)
+
+        return ranked[req.offset:]
+
+    def notes_per_week(self, column: str = "updated") -> list[tuple[date, int]]:
+        """Return (monday, count) of the weeks notes were created or updated"""
+        if column not in ("created", "updated"):
+            raise ValueError("Column must be 'created' or 'updated'")
+        return self.__cached(
+            ("notes_per_week", column),
+            lambda: analytics.per_week(self.__repo.columns(), column),
         )
 
-        return notes
+    def complete_ids(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Return note ids starting with prefix, for argument completion"""
+        with self.__repo.reading():
+            return self.__ids.complete(prefix, limit)
+
+    def complete_tags(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Return tags in use starting with prefix, for argument completion"""
+        with self.__repo.reading():
+            return self.__tags.complete(prefix, limit)
+
+    def cache_stats(self) -> CacheStats:
+        """Return hit/miss counters of the query cache."""
+        return self.__cache.stats()
 
     def all(self) -> Iterable[Note]:
         """Return all notes."""
@@ -92,6 +315,74 @@ class NotesService:
         note = self.__repo.get(req.note_id)
         self.__repo.delete(note.note_id)
 
+    def __cached(self, key: Hashable, compute: Callable[[], Iterable]) -> list:
+        # the read lock keeps the generation, indexes and records consistent
+        with self.__repo.reading():
+            return self.__cache.get_or_compute(key, self.__repo.generation, compute)
+
+    def __create_planner(self) -> QueryPlanner[int, Note]:
+        fields = {
+            "id": QueryField(_ids, normalize=str.strip, index=HashIndex(_ids)),
+            "tag": QueryField(_tags, normalize=Tag.normalize, index=HashIndex(_tags)),
+            "title": QueryField(_titles, kind=FieldKind.TEXT),
+            "body": QueryField(_bodies, kind=FieldKind.TEXT),
+            "created": QueryField(
+                _created, kind=FieldKind.DATE, date=_created_date,
+                index=DateRangeIndex(_created_date),
+            ),
+            "updated": QueryField(
+                _updated, kind=FieldKind.DATE, date=_updated_date,
+                index=DateRangeIndex(_updated_date),
+            ),
+        }
+        for field in fields.values():
+            if field.index is not None:
+                self.__repo.attach(field.index)
+
+        def text_matcher(text: str):
+            needle = Note.search_needle(text)
+            return lambda note: note.contains_needle(needle)
+
+        return QueryPlanner(
+            fields,
+            text_matcher,
+            self.__repo.get,
+            self.__repo.all,
+            sort_key=lambda n: n.note_id,
+        )
+
     def __prepare_tags(self, tags: list[str]) -> set[Tag]:
         """Normalize a list of tag strings into a set of Tag objects."""
         return {Tag(t) for t in tags}
+
+
+def _ids(note: Note) -> tuple[str, ...]:
+    return (str(note.note_id),)
+
+
+def _tags(note: Note) -> list[str]:
+    return [tag.value for tag in note.tags]
+
+
+def _titles(note: Note) -> tuple[str, ...]:
+    return (note.title.value.casefold(),)
+
+
+def _bodies(note: Note) -> tuple[str, ...]:
+    return (note.body.value.casefold(),)
+
+
+def _created(note: Note) -> tuple[str, ...]:
+    return (note.created_at.date().isoformat(),)
+
+
+def _created_date(note: Note) -> date:
+    return note.created_at.date()
+
+
+def _updated(note: Note) -> tuple[str, ...]:
+    return (note.updated_at.date().isoformat(),)
+
+
+def _updated_date(note: Note) -> date:
+    return note.updated_at.date()
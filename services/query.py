@@ -0,0 +1,264 @@
+import re
+import shlex
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Callable, Generic, Hashable, Iterable, Optional, TypeVar
+
+from services.field_index import DateRangeIndex, HashIndex
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+RANGE_OPS = (">=", "<=", ">", "<")
+# a range index is walked only when it is at most this many times larger
+# than the candidates found so far, otherwise its predicate filters them
+RANGE_RATIO = 4
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """One term of a query: ``field:value``, ``field:>value`` or free text"""
+    field: Optional[str]
+    op: str
+    value: str
+
+    def __str__(self) -> str:
+        text = self.value if self.op in ("=", "*") else f"{self.op}{self.value}"
+        return text if self.field is None else f"{self.field}:{text}"
+
+
+def parse_query(query: str) -> list[Predicate]:
+    """
+    Parse a query into predicates, all of which must hold.
+
+    Terms are separated by spaces, quoted terms are kept whole.
+    ``field:value`` matches a field, ``*`` is a wildcard, and
+    ``field:>value`` (also ``>=``, ``<``, ``<=``) compares dates.
+    Terms without a field are matched against the whole record.
+    """
+    try:
+        terms = shlex.split(query)
+    except ValueError as e:
+        raise ValueError(f"Invalid query: {e}") from e
+    if not terms:
+        raise ValueError("Query is empty")
+
+    predicates = []
+    for term in terms:
+        field, sep, value = term.partition(":")
+        if not sep or not field or " " in field:
+            field, value = None, term
+        elif not value:
+            raise ValueError(f"Missing value for field '{field}'")
+
+        op = "*" if "*" in value else "="
+        for range_op in RANGE_OPS:
+            if field is not None and value.startswith(range_op):
+                op, value = range_op, value[len(range_op):]
+                break
+        predicates.append(Predicate(field and field.lower(), op, value))
+    return predicates
+
+
+def parse_date(value: str) -> date:
+    """Parse a query date, YYYY-MM-DD or DD.MM.YYYY"""
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD or DD.MM.YYYY")
+
+
+class FieldKind(Enum):
+    """How the values of a query field are compared"""
+    KEYWORD = "keyword"  # whole value, case-insensitive
+    TEXT = "text"  # substring, case-insensitive
+    DATE = "date"  # calendar date, supports ranges
+
+
+@dataclass(frozen=True)
+class QueryField(Generic[K, T]):
+    """
+    A field the query language can filter on.
+
+    ``values`` returns the normalized values of a record, ``normalize`` brings
+    query values to the same form. Date fields also provide ``date``. Fields
+    with an ``index`` can be answered without scanning the records.
+    """
+    values: Callable[[T], Iterable[str]]
+    kind: FieldKind = FieldKind.KEYWORD
+    normalize: Callable[[str], str] = str.casefold
+    date: Optional[Callable[[T], Optional[date]]] = None
+    index: HashIndex[K, T] | DateRangeIndex[K, T] | None = None
+
+
+@dataclass(frozen=True)
+class Step:
+    """Access path chosen for a predicate and the rows it is expected to yield"""
+    predicate: Predicate
+    path: str
+    rows: int
+
+
+@dataclass(frozen=True)
+class Plan(Generic[K, T]):
+    """Access paths to intersect and predicates left to filter the survivors"""
+    steps: list[Step]
+    filters: list[Predicate]
+    fetch: list[Callable[[], Iterable[K]]]
+    checks: list[Callable[[T], bool]]
+
+    def describe(self) -> list[str]:
+        """Human-readable plan, one line per step"""
+        lines = [f"{s.path} {s.predicate} (~{s.rows} rows)" for s in self.steps]
+        if not self.steps:
+            lines.append("full scan")
+        lines.extend(f"filter {p}" for p in self.filters)
+        return lines
+
+
+class QueryPlanner(Generic[K, T]):
+    """
+    Plans and runs parsed queries over a repository.
+
+    Every predicate served by an index gets an access path: hash postings
+    for exact values and tags, a bisected date range for date comparisons.
+    Paths are intersected from the most selective one; predicates without
+    a path, or whose range is too wide to be worth walking, filter the
+    surviving records. A query without any path scans the repository.
+    """
+    def __init__(
+        self,
+        fields: dict[str, QueryField[K, T]],
+        text_matcher: Callable[[str], Callable[[T], bool]],
+        get: Callable[[K], T],
+        scan: Callable[[], Iterable[T]],
+        sort_key: Callable[[T], object],
+    ):
+        self.__fields = fields
+        self.__text_matcher = text_matcher
+        self.__get = get
+        self.__scan = scan
+        self.__sort_key = sort_key
+
+    def plan(self, predicates: list[Predicate]) -> Plan[K, T]:
+        """Choose access paths and filters for the predicates"""
+        paths = []
+        filters = []
+        for predicate in predicates:
+            path = self.__access_path(predicate)
+            if path is None:
+                filters.append(predicate)
+            else:
+                paths.append((predicate, *path))
+        paths.sort(key=lambda p: p[2])
+
+        steps, fetch, checks = [], [], []
+        candidates = None
+        for predicate, name, rows, rows_fetch in paths:
+            # postings are already materialized, ranges are built per query
+            if (
+                candidates is None or name == "hash"
+                or rows <= RANGE_RATIO * candidates
+            ):
+                steps.append(Step(predicate, name, rows))
+                fetch.append(rows_fetch)
+                candidates = rows if candidates is None else min(candidates, rows)
+            else:
+                filters.append(predicate)
+
+        checks = [self.__check(p) for p in filters]
+        return Plan(steps, filters, fetch, checks)
+
+    def run(self, plan: Plan[K, T]) -> list[T]:
+        """Execute a plan, records are returned in sort_key order"""
+        if plan.fetch:
+            keys = None
+            for rows_fetch in plan.fetch:
+                rows = rows_fetch()
+                keys = set(rows) if keys is None else keys.intersection(rows)
+                if not keys:
+                    return []
+            records = (self.__get(key) for key in keys)
+        else:
+            records = self.__scan()
+
+        checks = plan.checks
+        result = [r for r in records if all(check(r) for check in checks)]
+        result.sort(key=self.__sort_key)
+        return result
+
+    def __field(self, predicate: Predicate) -> QueryField[K, T]:
+        field = self.__fields.get(predicate.field)
+        if field is None:
+            known = ", ".join(sorted(self.__fields))
+            raise ValueError(f"Unknown field '{predicate.field}', expected: {known}")
+        if predicate.op in RANGE_OPS and field.kind is not FieldKind.DATE:
+            raise ValueError(f"Field '{predicate.field}' does not support ranges")
+        return field
+
+    def __access_path(self, predicate: Predicate):
+        if predicate.field is None:
+            return None
+        field = self.__field(predicate)
+        index = field.index
+
+        if isinstance(index, HashIndex) and predicate.op == "=":
+            value = field.normalize(predicate.value)
+            return "hash", index.count(value), lambda: index.lookup(value)
+        if isinstance(index, DateRangeIndex) and predicate.op != "*":
+            low, high = _date_bounds(predicate)
+            return "range", index.count(low, high), lambda: index.range(low, high)
+        return None
+
+    def __check(self, predicate: Predicate) -> Callable[[T], bool]:
+        if predicate.field is None:
+            return self.__text_matcher(predicate.value)
+        field = self.__field(predicate)
+
+        if field.kind is FieldKind.DATE and predicate.op != "*":
+            low, high = _date_bounds(predicate)
+            value_of = field.date
+            return lambda record: (
+                (value := value_of(record)) is not None
+                and (low is None or value >= low)
+                and (high is None or value <= high)
+            )
+
+        values = field.values
+        if predicate.op == "*":
+            # normalizers may drop the wildcard (phones keep digits only)
+            needle = predicate.value.casefold()
+            pattern = re.escape(needle).replace(r"\*", ".*")
+            if field.kind is FieldKind.TEXT:
+                match = re.compile(pattern).search
+            else:
+                match = re.compile(pattern).fullmatch
+            return lambda record: any(match(v) for v in values(record))
+
+        needle = field.normalize(predicate.value)
+        if field.kind is FieldKind.TEXT:
+            return lambda record: any(needle in v for v in values(record))
+        return lambda record: needle in values(record)
+
+
+def _date_bounds(predicate: Predicate) -> tuple[Optional[date], Optional[date]]:
+    """Inclusive [low, high] days matched by a date predicate"""
+    day = parse_date(predicate.value)
+    match predicate.op:
+        case ">" if day == date.max:
+            raise ValueError(f"No date is after {day.isoformat()}")
+        case "<" if day == date.min:
+            raise ValueError(f"No date is before {day.isoformat()}")
+        case ">":
+            return day + timedelta(days=1), None
+        case ">=":
+            return day, None
+        case "<":
+            return None, day - timedelta(days=1)
+        case "<=":
+            return None, day
+        case _:
+            return day, day
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters of a query cache"""
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results tagged with a repository generation.
+
+    Results are valid only for the generation they were computed at: once the
+    repository reports another generation, every cached entry is dropped.
+    Safe to share by threads, results are computed outside its lock.
+    """
+    def __init__(self, maxsize: int = 128):
+        self.__maxsize: int = maxsize
+        self.__entries: OrderedDict[Hashable, list] = OrderedDict()
+        self.__generation: int | None = None
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__lock = threading.Lock()
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        generation: int,
+        compute: Callable[[], Any],
+    ) -> list:
+        """Return the cached result for the key or compute and cache it."""
+        with self.__lock:
+            if generation != self.__generation:
+                self.__entries.clear()
+                self.__generation = generation
+
+            result = self.__entries.get(key)
+            if result is not None:
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return list(result)
+            self.__misses += 1
+
+        result = list(compute())
+        with self.__lock:
+            if self.__maxsize > 0 and generation == self.__generation:
+                self.__entries[key] = result
+                if len(self.__entries) > self.__maxsize:
+                    self.__entries.popitem(last=False)
+        return list(result)
+
+    def stats(self) -> CacheStats:
+        """Return hit/miss counters and the current size"""
+        return CacheStats(
+            hits=self.__hits,
+            misses=self.__misses,
+            size=len(self.__entries),
+            maxsize=self.__maxsize,
+        )
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self.__lock:
+            self.__entries.clear()
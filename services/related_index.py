@@ -0,0 +1,175 @@
+import heapq
+import math
+import threading
+from collections import Counter
+from operator import itemgetter
+
+from models import Note
+from services.text import tokenize
+
+# share of the notes the corpus may grow or shrink by before norms are redone
+NORM_DRIFT = 0.2
+# candidates kept per requested note once common terms stop opening new ones
+POOL_FACTOR = 20
+MIN_POOL = 100
+
+
+class RelatedNotesIndex:
+    """
+    Sparse TF-IDF vectors of the notes with an inverted index over them.
+
+    A note's vector holds the sublinear term frequencies of its tags, title
+    and body words; inverse document frequencies are applied at query time,
+    so adding a note only touches its own postings. The idf of a term is
+    fixed when the term first appears and the norms are cached with it; all
+    of them are recomputed together once the number of notes has drifted
+    far enough to change the weights, so norms and query weights always use
+    the same idf and scores are true cosines. A query walks the postings of
+    the note's rarest terms first; terms whose postings no longer fit in
+    ``max_postings`` entries only score a pool of the best candidates found
+    so far.
+    """
+    def __init__(
+        self,
+        title_weight: float = 2.0,
+        tag_weight: float = 3.0,
+        max_postings: int = 5_000,
+    ):
+        self.__title_weight: float = title_weight
+        self.__tag_weight: float = tag_weight
+        self.__max_postings: int = max_postings
+        self.__term_ids: dict[str, int] = {}
+        self.__terms: list[str] = []
+        self.__free_ids: list[int] = []
+        self.__postings: dict[int, dict[int, float]] = {}
+        self.__vectors: dict[int, dict[int, float]] = {}
+        self.__norms: dict[int, float] = {}
+        self.__idfs: dict[int, float] = {}
+        self.__norms_count: int = 0
+        # queries of concurrent readers may redo the norms
+        self.__refresh_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__vectors)
+
+    def upsert(self, note_id: int, note: Note) -> None:
+        """Index a new note or re-index a changed one"""
+        self.remove(note_id)
+
+        frequencies = Counter(tokenize(note.body.value))
+        for term in tokenize(note.title.value):
+            frequencies[term] += self.__title_weight
+        for tag in note.tags:
+            frequencies["#" + tag.value.lower()] += self.__tag_weight
+
+        vector = {}
+        for term, frequency in frequencies.items():
+            term_id = self.__term_id(term)
+            weight = 1.0 + math.log(frequency)
+            vector[term_id] = weight
+            self.__postings.setdefault(term_id, {})[note_id] = weight
+        self.__vectors[note_id] = vector
+        self.__norms[note_id] = self.__norm(vector, self.__idfs)
+
+    def remove(self, note_id: int) -> None:
+        """Drop a note from the index"""
+        vector = self.__vectors.pop(note_id, None)
+        if vector is None:
+            return
+
+        for term_id in vector:
+            posting = self.__postings[term_id]
+            del posting[note_id]
+            if not posting:
+                del self.__postings[term_id]
+                del self.__term_ids[self.__terms[term_id]]
+                self.__idfs.pop(term_id, None)
+                self.__free_ids.append(term_id)
+        del self.__norms[note_id]
+
+    def related(self, note_id: int, limit: int = 5) -> list[tuple[int, float]]:
+        """Return up to limit (note_id, cosine) pairs most similar to a note"""
+        vector = self.__vectors.get(note_id)
+        if not vector or limit <= 0:
+            return []
+        with self.__refresh_lock:
+            self.__refresh_norms()
+            idfs, norms = self.__idfs, self.__norms
+
+        postings = self.__postings
+        # query weights carry idf twice: once for each side of the product
+        weights = []
+        for term_id, tf in vector.items():
+            posting = postings[term_id]
+            if len(posting) > 1:
+                idf = idfs[term_id]
+                weights.append((tf * idf * idf, posting))
+        weights.sort(key=itemgetter(0), reverse=True)
+
+        # rare terms open candidates while the postings budget lasts, common
+        # ones only add to the pool of the best candidates found by then
+        scores: dict[int, float] = {}
+        budget = self.__max_postings
+        common = []
+        for weight, posting in weights:
+            if len(posting) > budget and scores:
+                common.append((weight, posting))
+                continue
+            budget -= len(posting)
+            for other, tf in posting.items():
+                scores[other] = scores.get(other, 0.0) + weight * tf
+        scores.pop(note_id, None)
+
+        if common:
+            pool = heapq.nlargest(
+                max(POOL_FACTOR * limit, MIN_POOL), scores,
+                key=lambda i: scores[i] / norms[i],
+            )
+            scores = {i: scores[i] for i in pool}
+            for weight, posting in common:
+                for other in pool:
+                    tf = posting.get(other)
+                    if tf is not None:
+                        scores[other] += weight * tf
+
+        query_norm = norms[note_id]
+        return heapq.nlargest(
+            limit,
+            ((i, s / (query_norm * norms[i])) for i, s in scores.items()),
+            key=itemgetter(1),
+        )
+
+    def __term_id(self, term: str) -> int:
+        term_id = self.__term_ids.get(term)
+        if term_id is None:
+            # ids of terms no note uses any more are reused
+            if self.__free_ids:
+                term_id = self.__free_ids.pop()
+                self.__terms[term_id] = term
+            else:
+                term_id = len(self.__terms)
+                self.__terms.append(term)
+            self.__term_ids[term] = term_id
+        return term_id
+
+    def __norm(self, vector: dict[int, float], idfs: dict[int, float]) -> float:
+        # terms new to the index get their idf fixed here
+        count = max(len(self.__vectors), 1)
+        postings = self.__postings
+        total = 0.0
+        for term_id, tf in vector.items():
+            idf = idfs.get(term_id)
+            if idf is None:
+                idf = idfs[term_id] = math.log(count / len(postings[term_id])) + 1.0
+            weight = tf * idf
+            total += weight * weight
+        return math.sqrt(total) or 1.0
+
+    def __refresh_norms(self) -> None:
+        count = len(self.__vectors)
+        if abs(count - self.__norms_count) <= NORM_DRIFT * self.__norms_count:
+            return
+        idfs: dict[int, float] = {}
+        norms = {i: self.__norm(v, idfs) for i, v in self.__vectors.items()}
+        self.__idfs, self.__norms = idfs, norms
+        self.__norms_count = count
@@ -0,0 +1,8 @@
+import re
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens"""
+    return _WORD.findall(text.lower())
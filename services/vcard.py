@@ -0,0 +1,193 @@
+import quopri
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from models import Contact
+
+FOLD_OCTETS = 75  # longest line of a written card, longer ones are folded
+
+_BDAY = re.compile(r"(\d{4})-?(\d{2})-?(\d{2})")
+_ESCAPED = re.compile(r"\\(.)")
+_TO_ESCAPE = re.compile(r"([\\,;])")
+
+
+@dataclass
+class VCard:
+    """Raw contact values of one card, validated only when imported"""
+    name: Optional[str] = None
+    phones: list[str] = field(default_factory=list)
+    email: Optional[str] = None
+    birthday: Optional[str] = None
+    address: Optional[str] = None
+
+
+def parse_vcards(lines: Iterable[str]) -> Iterator[VCard]:
+    """
+    Read cards from vCard 2.1, 3.0 or 4.0 lines one at a time.
+
+    Folded and quoted-printable lines are joined, so only the current card
+    is held in memory. FN names the contact, N is used without it. Every
+    TEL is kept; the first EMAIL, BDAY and ADR fill the single fields.
+    Other properties are ignored.
+    """
+    card: Optional[VCard] = None
+    structured_name: Optional[str] = None
+    for line in _unfold(lines):
+        head, value = _split_property(line)
+        name = head.partition(";")[0].rpartition(".")[2].upper()
+        if name == "BEGIN" and value.upper() == "VCARD":
+            card, structured_name = VCard(), None
+            continue
+        if card is None:
+            continue
+        if name == "END" and value.upper() == "VCARD":
+            if card.name is None:
+                card.name = structured_name
+            yield card
+            card = None
+            continue
+
+        if "QUOTED-PRINTABLE" in head.upper():
+            value = _decode_quoted_printable(head, value)
+        if name == "FN":
+            card.name = _unescape(value).strip() or None
+        elif name == "N":
+            family, given, middle, *_ = _components(value) + ["", "", ""]
+            structured_name = " ".join(p for p in (given, middle, family) if p) or None
+        elif name == "TEL":
+            phone = _unescape(value).strip()
+            card.phones.append(phone[4:] if phone.lower().startswith("tel:") else phone)
+        elif name == "EMAIL" and card.email is None:
+            card.email = _unescape(value).strip()
+        elif name == "BDAY" and card.birthday is None:
+            card.birthday = _birthday(_unescape(value).strip())
+        elif name == "ADR" and card.address is None:
+            card.address = ", ".join(p.strip() for p in _components(value) if p.strip())
+
+
+def format_vcard(contact: Contact) -> str:
+    """The contact as a vCard 3.0 card with CRLF line ends"""
+    *given, family = contact.name.value.split(" ")
+    lines = [
+        "BEGIN:VCARD",
+        "VERSION:3.0",
+        f"FN:{_escape(contact.name.value)}",
+        f"N:{_escape(family)};{_escape(' '.join(given))};;;",
+    ]
+    lines.extend(f"TEL;TYPE=CELL:{phone.value}" for phone in contact.phones)
+    if contact.email:
+        lines.append(f"EMAIL;TYPE=INTERNET:{_escape(contact.email.value)}")
+    if contact.birthday:
+        day, month, year = contact.birthday.value.split(".")
+        lines.append(f"BDAY:{year}-{month}-{day}")
+    if contact.address:
+        lines.append(f"ADR;TYPE=HOME:;;{_escape(contact.address.value)};;;;")
+    lines.append("END:VCARD")
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    # a line starting with a space or tab continues the previous one, a
+    # quoted-printable value ending with "=" continues on the next line
+    pending: Optional[str] = None
+    soft_break = False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if pending is not None and (soft_break or line[:1] in (" ", "\t")):
+            pending += line if soft_break else line[1:]
+        else:
+            if pending:
+                yield pending
+            pending = line
+        soft_break = pending.endswith("=") and "QUOTED-PRINTABLE" in (
+            pending.partition(":")[0].upper()
+        )
+        if soft_break:
+            pending = pending[:-1]
+    if pending:
+        yield pending
+
+
+def _split_property(line: str) -> tuple[str, str]:
+    head, _, value = line.partition(":")
+    if '"' not in head:
+        return head, value
+
+    # a quoted parameter value may hold a colon
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            return line[:i], line[i + 1:]
+    return line, ""
+
+
+def _decode_quoted_printable(head: str, value: str) -> str:
+    charset = "utf-8"
+    for param in head.split(";")[1:]:
+        key, _, param_value = param.partition("=")
+        if key.upper() == "CHARSET" and param_value:
+            charset = param_value.strip('"')
+    try:
+        return quopri.decodestring(value.encode("ascii", "replace")).decode(charset)
+    except (LookupError, UnicodeDecodeError):
+        return value
+
+
+def _components(value: str) -> list[str]:
+    # fields of a structured value are separated by unescaped semicolons
+    if "\\" not in value:
+        return value.split(";")
+    parts, current, escaped = [], [], False
+    for char in value:
+        if escaped:
+            current.append("\\" + char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == ";":
+            parts.append(_unescape("".join(current)))
+            current = []
+        else:
+            current.append(char)
+    parts.append(_unescape("".join(current)))
+    return parts
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _ESCAPED.sub(
+        lambda m: "\n" if m.group(1) in "nN" else m.group(1), value
+    )
+
+
+def _escape(value: str) -> str:
+    return _TO_ESCAPE.sub(r"\\\1", value).replace("\n", "\\n")
+
+
+def _birthday(value: str) -> str:
+    # ISO 8601 dates become DD.MM.YYYY, anything else is left to validation
+    match = _BDAY.fullmatch(value.partition("T")[0])
+    if match is None:
+        return value
+    year, month, day = match.groups()
+    return f"{day}.{month}.{year}"
+
+
+def _fold(line: str) -> str:
+    if len(line) <= FOLD_OCTETS and line.isascii():
+        return line
+    parts, current, size = [], [], 0
+    for char in line:
+        octets = len(char.encode())
+        if size + octets > FOLD_OCTETS:
+            parts.append("".join(current))
+            # continuation lines start with a space that counts as an octet
+            current, size = [" "], 1
+        current.append(char)
+        size += octets
+    parts.append("".join(current))
+    return "\r\n".join(parts)
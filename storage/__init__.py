@@ -1,9 +1,12 @@
-from storage.file_storage import FileStorage
+from storage.file_storage import FileStorage, Durability
 from storage.json_serializer import JsonSerializer
 from storage.pickle_serializer import PickleSerializer
+from storage.indexed_note_serializer import IndexedNoteSerializer
 
 __all__ = [
     "FileStorage",
+    "Durability",
     "JsonSerializer",
     "PickleSerializer",
+    "IndexedNoteSerializer",
 ]
@@ -1,8 +1,20 @@
-from typing import TypeVar, Generic
+from typing import Callable, Collection, TypeVar, Generic, Iterator, Optional
+from contextlib import contextmanager
+from enum import Enum
 from pathlib import Path
+import json
+import mmap
 import os
+import struct
 import tempfile
+import threading
 
+try:
+    import fcntl
+except ImportError:  # Windows, saves are serialized per process only
+    fcntl = None
+
+from exceptions import ConflictError
 from storage.serializer import Serializer
 
 K = TypeVar("K")
@@ -11,10 +23,60 @@ T = TypeVar("T")
 APP_DIR = '.personal-assistant-cli'
 HOME_DIR = str(Path.home() / APP_DIR)
 
+# magic, generation, length of the record versions block
+HEADER = struct.Struct(">4sQQ")
+MAGIC = b"PAC\x01"
+IOV_MAX = (
+    os.sysconf("SC_IOV_MAX")
+    if "SC_IOV_MAX" in getattr(os, "sysconf_names", {}) else 1024
+)
+
+
+class Durability(Enum):
+    """Durability policy of FileStorage saves."""
+    ALWAYS = "always"  # fsync the file and its directory on every save
+    GROUP = "group"  # fsync the file, one directory fsync per time window
+    NONE = "none"  # leave write-back to the OS (tests, bulk loads)
+
 
 class FileStorage(Generic[K, T]):
-    """File-based storage for items with serialization."""
-    def __init__(self, filename: str, serializer: Serializer[K, T], use_home_dir=True):
+    """
+    File-based storage for items with serialization.
+
+    Saves are guarded by an advisory lock, so several sessions can share
+    a file. Every save bumps the file generation and stamps the records it
+    changed with it. When the file was written by someone else since this
+    instance last synced, ``save`` merges at record granularity instead of
+    overwriting, and ``load_changes`` returns only the records that differ.
+    A record this session edited that another session changed meanwhile is
+    a conflict: their version is kept and ``save`` raises ConflictError
+    after writing the rest. A record kept by ``load_changes`` is a conflict
+    as well, until a later ``load_changes`` takes their version. A record
+    new on both sides is moved to a fresh key with ``rekey``, or is
+    a conflict without it.
+
+    ``reserve_ids`` hands out integer keys from a counter kept next to the
+    file under the same lock, so sessions adding records never collide.
+
+    Items passed to ``save`` are treated as immutable snapshots: a record
+    counts as changed when it is not the same object as the one last
+    written or loaded for its key.
+
+    With ``Durability.GROUP`` every save fsyncs its temporary file before
+    the rename, and a single fsync of the directory runs ``group_window``
+    seconds after the first of them, so a crash loses at most the renames of
+    one window and never leaves a torn file. An error of that background
+    fsync is raised by the next ``sync``.
+    """
+    def __init__(
+        self,
+        filename: str,
+        serializer: Serializer[K, T],
+        use_home_dir=True,
+        durability: Durability = Durability.ALWAYS,
+        group_window: float = 0.5,
+        rekey: Optional[Callable[[T, K], T]] = None,
+    ):
         """Initialize the file storage."""
         filepath = f"{filename}.{ext}" if (ext := serializer.extension()) else filename
         if use_home_dir and filepath.startswith('/'):
@@ -24,19 +86,278 @@ class FileStorage(Generic[K, T]):
         self.__path: Path = (
             (Path(HOME_DIR) / filepath) if use_home_dir else Path(filepath)
         )
+        self.__lock_path: Path = self.__path.with_name(self.__path.name + ".lock")
+        self.__ids_path: Path = self.__path.with_name(self.__path.name + ".ids")
+        self.__rekey: Optional[Callable[[T, K], T]] = rekey
         self.__serializer: Serializer[T] = serializer
+        self.__durability: Durability = durability
+        self.__group_window: float = group_window
+        self.__mutex = threading.Lock()
+        self.__sync_lock = threading.Lock()
+        self.__sync_timer: Optional[threading.Timer] = None
+        self.__sync_error: Optional[OSError] = None
+        # State of the file as reflected by the items of this instance
+        self.__generation: int = 0
+        self.__versions: dict[K, int] = {}
+        self.__written: dict[K, T] = {}
+        self.__stat: Optional[tuple] = None
+        # keys changed on disk whose version load_changes did not take
+        self.__held: set[K] = set()
+
+    @property
+    def generation(self) -> int:
+        """Generation of the file the items in memory are synced with."""
+        return self.__generation
 
     def load(self) -> dict[K, T]:
         """Load items from the storage file."""
-        if not self.__path.exists():
-            return {}
+        with self.__mutex:
+            if not self.__path.exists():
+                return {}
+
+            generation, versions, items, stat = self.__read()
+            self.__sync(generation, versions, items, stat)
+            return items
+
+    def changed(self) -> bool:
+        """Cheap check whether another session has written the file."""
+        if self.__held:
+            return True  # load_changes hands the held records out again
+        try:
+            stat = self.__path.stat()
+        except FileNotFoundError:
+            return False
+        if self.__stat == _stat_key(stat):
+            return False
+
+        with open(self.__path, "rb") as f:
+            generation = _read_generation(f.read(HEADER.size))
+        return generation != self.__generation
 
-        data = self.__path.read_bytes()
-        return self.__serializer.from_bytes(data)
+    def load_changes(self, keep: Collection[K] = ()) -> tuple[dict[K, T], set[K]]:
+        """
+        Load records changed by other sessions since the last sync.
+
+        Records in keep are returned but not synced: the caller keeps its
+        own version, so saving it later is a conflict.
+
+        Returns:
+            tuple: Upserted records by key and the keys deleted on disk.
+        """
+        with self.__mutex:
+            if not self.__path.exists():
+                return {}, set()
+
+            generation, versions, items, stat = self.__read()
+            if generation == self.__generation and not self.__held:
+                self.__stat = stat
+                return {}, set()
+
+            upserts = {
+                k: v for k, v in items.items()
+                if k not in self.__written
+                or versions.get(k, 0) != self.__versions.get(k, 0)
+            }
+            deletes = {k for k in self.__written if k not in items}
+            held = {k for k in keep if k in upserts or k in deletes}
+
+            written = self.__written.copy()
+            written.update((k, v) for k, v in upserts.items() if k not in held)
+            for k in deletes - held:
+                del written[k]
+            versions = versions.copy()
+            for k in held:
+                if k in self.__versions:
+                    versions[k] = self.__versions[k]
+                else:
+                    versions.pop(k, None)
+            self.__held = (self.__held - upserts.keys() - deletes) | held
+            self.__sync(generation, versions, written, stat)
+            return upserts, deletes
 
     def save(self, items: dict[K, T]) -> None:
-        """Save items to the storage file."""
-        data = self.__serializer.to_bytes(items)
+        """
+        Save items to the storage file.
+
+        Raises:
+            ConflictError: records changed by another session as well,
+                their version is kept and everything else is saved.
+        """
+        with self.__mutex, self.__locked():
+            upserts = [
+                k for k, v in items.items() if self.__written.get(k) is not v
+            ]
+            deletes = [k for k in self.__written if k not in items]
+
+            generation, versions, content = self.__generation, self.__versions, items
+            behind = False
+            conflicts: list[K] = []
+            rekeyed: list[K] = []
+            if self.__path.exists():
+                with open(self.__path, "rb") as f:
+                    generation = _read_generation(f.read(HEADER.size))
+                if generation != self.__generation or self.__held:
+                    # Someone else wrote the file, merge our changes into theirs
+                    behind = True
+                    generation, versions, content, _ = self.__read()
+                    content = content.copy()
+                    upserts, conflicts, rekeyed = self.__merge(
+                        upserts, items, versions, content
+                    )
+                    for k in deletes:
+                        content.pop(k, None)
+
+            changed = upserts or rekeyed or deletes or not self.__path.exists()
+            if not changed and not conflicts:
+                return
+
+            if changed:
+                generation += 1
+                versions = {k: v for k, v in versions.items() if k in content}
+                versions.update((k, generation) for k in upserts + rekeyed)
+                stat = self.__write(generation, versions, content)
+
+            if behind:
+                # Records written by others are picked up by load_changes, and
+                # so are the conflicting ones, their version stays behind
+                self.__versions = self.__versions.copy()
+                for k in deletes:
+                    self.__versions.pop(k, None)
+                self.__versions.update((k, generation) for k in upserts)
+                self.__written = items
+                self.__stat = None
+            else:
+                self.__sync(generation, versions, items, stat)
+
+        if conflicts:
+            raise ConflictError(conflicts)
+
+    def reserve_ids(self, count: int, floor: int = 0) -> range:
+        """
+        Reserve count consecutive integer keys no session was given yet.
+
+        floor is the highest key the caller already uses.
+        """
+        if count <= 0:
+            return range(0)
+        with self.__mutex, self.__locked():
+            last = max(self.__last_id(), floor)
+            self.__save_last_id(last + count)
+        return range(last + 1, last + count + 1)
+
+    def sync(self) -> None:
+        """Force saves waiting for a group commit to disk."""
+        with self.__sync_lock:
+            error, self.__sync_error = self.__sync_error, None
+            if self.__sync_timer is not None:
+                self.__sync_timer.cancel()
+                self.__sync_timer = None
+                _fsync_dir(self.__path.parent)
+            if error is not None:
+                raise error
+
+    def __group_commit(self) -> None:
+        # runs on the timer thread, so the error waits for the next sync
+        with self.__sync_lock:
+            self.__sync_timer = None
+            try:
+                _fsync_dir(self.__path.parent)
+            except OSError as e:
+                self.__sync_error = e
+
+    def __schedule_group_commit(self) -> None:
+        with self.__sync_lock:
+            if self.__sync_timer is None:
+                self.__sync_timer = threading.Timer(
+                    self.__group_window, self.__group_commit
+                )
+                self.__sync_timer.start()
+
+    def __merge(
+        self, upserts: list[K], items: dict[K, T], versions: dict[K, int], content
+    ) -> tuple[list[K], list[K], list[K]]:
+        # our upserts applied to their content: (applied, conflicts, rekeyed)
+        applied, conflicts, rekeyed = [], [], []
+        for k in upserts:
+            if k not in content:
+                applied.append(k)
+            elif k in self.__written:
+                if versions.get(k, 0) != self.__versions.get(k, 0):
+                    conflicts.append(k)  # edited here and there
+                    continue
+                applied.append(k)
+            elif self.__rekey is not None and isinstance(k, int):
+                # added here and there under the same key, ours moves aside
+                [key] = self.__allocate(1, content)
+                content[key] = self.__rekey(items[k], key)
+                rekeyed.append(key)
+                continue
+            else:
+                conflicts.append(k)
+                continue
+            content[k] = items[k]
+        return applied, conflicts, rekeyed
+
+    def __allocate(self, count: int, content: dict) -> range:
+        # under the file lock
+        keys = (k for k in content if isinstance(k, int))
+        last = max(self.__last_id(), max(keys, default=0))
+        self.__save_last_id(last + count)
+        return range(last + 1, last + count + 1)
+
+    def __last_id(self) -> int:
+        # under the file lock; files older than the counter use their keys
+        try:
+            return int(self.__ids_path.read_text(encoding="ascii"))
+        except (FileNotFoundError, ValueError):
+            pass
+        if not self.__path.exists():
+            return 0
+        return max((k for k in self.__read()[2] if isinstance(k, int)), default=0)
+
+    def __save_last_id(self, last_id: int) -> None:
+        # replaced atomically, not fsynced: a key handed out twice after a
+        # crash is found new on both sides by save and moved aside
+        fd, tmp = tempfile.mkstemp(
+            dir=str(self.__ids_path.parent), prefix=self.__ids_path.name
+        )
+        with os.fdopen(fd, "w", encoding="ascii") as file:
+            file.write(str(last_id))
+        os.replace(tmp, self.__ids_path)
+
+    def __sync(self, generation: int, versions: dict, items: dict, stat) -> None:
+        self.__generation = generation
+        self.__versions = versions
+        self.__written = items
+        self.__stat = stat
+
+    def __read(self) -> tuple[int, dict[K, int], dict[K, T], tuple]:
+        with open(self.__path, "rb") as f:
+            file_stat = os.fstat(f.fileno())
+            stat = _stat_key(file_stat)
+            # serializers may keep slices of the mapping (lazy note bodies),
+            # it stays valid after the file is replaced by a later save
+            data = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if file_stat.st_size else b""
+            )
+
+        view = memoryview(data)
+        header = bytes(view[:HEADER.size])
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            # legacy file written without a header
+            return 0, {}, self.__serializer.from_bytes(view), stat
+
+        _, generation, versions_len = HEADER.unpack(header)
+        versions_end = HEADER.size + versions_len
+        versions = dict(json.loads(str(view[HEADER.size:versions_end], "utf-8")))
+        items = self.__serializer.from_bytes(view[versions_end:])
+        return generation, versions, items, stat
+
+    def __write(self, generation: int, versions: dict[K, int], items: dict[K, T]):
+        payload = self.__serializer.to_buffers(items)
+        versions_block = json.dumps(list(versions.items())).encode("utf-8")
+        header = HEADER.pack(MAGIC, generation, len(versions_block))
 
         tmp_file = None
         try:
@@ -47,9 +368,10 @@ class FileStorage(Generic[K, T]):
                 prefix=Path(self.__path.name).stem + "_", suffix=".tmp"
             ) as tmp:
                 tmp_file = Path(tmp.name)
-                tmp.write(data)
-                tmp.flush()
-                os.fsync(tmp.fileno())
+                _write_all(tmp.fileno(), [header, versions_block, *payload])
+                if self.__durability is not Durability.NONE:
+                    os.fsync(tmp.fileno())
+                stat = _stat_key(os.fstat(tmp.fileno()))
             os.replace(tmp_file, self.__path)
         except OSError as e:
             if tmp_file and tmp_file.exists():
@@ -58,3 +380,69 @@ class FileStorage(Generic[K, T]):
                 except OSError:
                     pass
             raise e
+
+        # the rename itself is durable only once the directory is synced
+        if self.__durability is Durability.ALWAYS:
+            _fsync_dir(self.__path.parent)
+        elif self.__durability is Durability.GROUP:
+            self.__schedule_group_commit()
+        return stat
+
+    @contextmanager
+    def __locked(self) -> Iterator[None]:
+        """Hold the advisory lock shared by all sessions using the file."""
+        # subdirectories of the home dir are created by the first writer
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.__lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _read_generation(header: bytes) -> int:
+    """Return the generation stamped in a file header, 0 for legacy files."""
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        return 0
+    return HEADER.unpack(header)[1]
+
+
+def _write_all(fd: int, chunks: list) -> None:
+    """Write the chunks in order, in as few vectored writes as possible."""
+    views = [memoryview(c).cast("B") for c in chunks if len(c)]
+    if not hasattr(os, "writev"):  # Windows
+        for view in views:
+            while view:
+                view = view[os.write(fd, view):]
+        return
+
+    while views:
+        written = os.writev(fd, views[:IOV_MAX])
+        # drop fully written chunks and trim a partially written one
+        done = 0
+        while done < len(views) and written >= len(views[done]):
+            written -= len(views[done])
+            done += 1
+        views = views[done:]
+        if written:
+            views[0] = views[0][written:]
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist directory entries, a no-op where directories can't be opened."""
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _stat_key(stat: os.stat_result) -> tuple:
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
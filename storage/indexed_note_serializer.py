@@ -0,0 +1,110 @@
+from array import array
+from datetime import datetime as DateTime, timedelta
+import json
+import struct
+
+from models import Note
+from models.values import LazyField, Tag
+from storage.serializer import Serializer
+
+EPOCH = DateTime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# magic, notes count, offsets of tag table, tag ids, titles and bodies
+PREFIX = struct.Struct("<4sQQQQQ")
+MAGIC = b"PAIX"
+# note_id, created_at, updated_at (microseconds since epoch),
+# first tag id position, tags count, title offset, title length,
+# body offset, body length
+RECORD = struct.Struct("<qqqIIQIQQ")
+
+
+class IndexedNoteSerializer(Serializer[int, Note]):
+    """
+    Serializer storing notes as a fixed-width index plus a body segment.
+
+    Titles, tags and timestamps are decoded on load. Bodies become
+    LazyFields over the loaded buffer: when the storage maps the file,
+    a body is paged in only when it is read, so resident memory is bounded
+    by the size of the metadata.
+    """
+    def to_bytes(self, items: dict[int, Note]) -> bytes:
+        """Serialize notes to the indexed format."""
+        tag_ids: dict[str, int] = {}
+        note_tags = array("I")
+        titles, bodies = bytearray(), bytearray()
+        records = []
+
+        for note in items.values():
+            tags_start = len(note_tags)
+            for tag in note.tags:
+                note_tags.append(tag_ids.setdefault(tag.value, len(tag_ids)))
+            title = note.title.value.encode("utf-8")
+            body = note.body.value.encode("utf-8")
+            records.append(RECORD.pack(
+                note.note_id,
+                _to_micros(note.created_at),
+                _to_micros(note.updated_at),
+                tags_start, len(note.tags),
+                len(titles), len(title),
+                len(bodies), len(body),
+            ))
+            titles += title
+            bodies += body
+
+        tag_table = json.dumps(list(tag_ids)).encode("utf-8")
+        tags_offset = PREFIX.size + RECORD.size * len(records)
+        ids_offset = tags_offset + len(tag_table)
+        titles_offset = ids_offset + note_tags.itemsize * len(note_tags)
+        bodies_offset = titles_offset + len(titles)
+        prefix = PREFIX.pack(
+            MAGIC, len(records),
+            tags_offset, ids_offset, titles_offset, bodies_offset,
+        )
+        return b"".join([
+            prefix, *records, tag_table, note_tags.tobytes(), titles, bodies,
+        ])
+
+    def from_bytes(self, data: bytes | memoryview) -> dict[int, Note]:
+        """Deserialize notes, keeping the bodies inside the given buffer."""
+        view = memoryview(data)
+        if len(view) == 0:
+            return {}
+
+        magic, count, tags_offset, ids_offset, titles_offset, bodies_offset = \
+            PREFIX.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Failed to load resource")
+
+        tags = [Tag(t) for t in json.loads(str(view[tags_offset:ids_offset], "utf-8"))]
+        note_tags = array("I")
+        note_tags.frombytes(view[ids_offset:titles_offset])
+
+        notes = {}
+        for (
+            note_id, created_at, updated_at, tags_start, tags_count,
+            title_offset, title_len, body_offset, body_len,
+        ) in RECORD.iter_unpack(view[PREFIX.size:tags_offset]):
+            title_start = titles_offset + title_offset
+            body_start = bodies_offset + body_offset
+            notes[note_id] = Note(
+                note_id=note_id,
+                title=str(view[title_start:title_start + title_len], "utf-8"),
+                body=LazyField(view[body_start:body_start + body_len]),
+                tags={tags[i] for i in note_tags[tags_start:tags_start + tags_count]},
+                created_at=_from_micros(created_at),
+                updated_at=_from_micros(updated_at),
+            )
+        return notes
+
+    def extension(self) -> str | None:
+        """Return the file extension for the indexed format."""
+        return 'idx'
+
+
+def _to_micros(value: DateTime) -> int:
+    return (value - EPOCH) // MICROSECOND
+
+
+def _from_micros(value: int) -> DateTime:
+    return EPOCH + timedelta(microseconds=value)
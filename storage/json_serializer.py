@@ -26,9 +26,9 @@ class JsonSerializer(Serializer[K, T], Generic[K, T]):
         payload = {self.__to_key(k): self.__to_dict(v) for k, v in items.items()}
         return json.dumps(payload, ensure_ascii=False).encode("utf-8")
 
-    def from_bytes(self, data: bytes) -> dict[K, T]:
+    def from_bytes(self, data: bytes | memoryview) -> dict[K, T]:
         """Deserialize JSON bytes into a dictionary of items."""
-        raw = json.loads(data.decode("utf-8"))
+        raw = json.loads(str(data, "utf-8"))
         if not isinstance(raw, dict):
             raise ValueError("JSON root must be an object")
 
@@ -1,21 +1,66 @@
 from typing import Generic, TypeVar
+import io
 import pickle
+import struct
 
+from models.values import Field, LazyField
 from storage.serializer import Serializer
 
 K = TypeVar("K")
 T = TypeVar("T")
 
+# magic, number of out-of-band buffers, length of the pickle stream
+PREFIX = struct.Struct("<4sIQ")
+MAGIC = b"PAP5"
+LENGTH = struct.Struct("<Q")
+
 
 class PickleSerializer(Serializer[K, T], Generic[K, T]):
-    """Pickle-based serializer for storing items."""
+    """
+    Pickle-based serializer for storing items.
+
+    Text fields of at least ``min_buffer_size`` bytes (note bodies) are
+    passed out-of-band with pickle protocol 5: they are handed to the storage
+    as separate buffers and restored as LazyFields over the loaded buffer,
+    so large bodies are neither copied into the pickle stream nor out of
+    a memory-mapped file.
+    """
+    def __init__(self, min_buffer_size: int = 4096):
+        self.__min_buffer_size: int = min_buffer_size
+
     def to_bytes(self, items: dict[K, T]) -> bytes:
         """Serialize items to bytes using pickle."""
-        return pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL)
+        return b"".join(self.to_buffers(items))
+
+    def to_buffers(self, items: dict[K, T]) -> list:
+        """Serialize items to the pickle stream followed by large bodies."""
+        buffers: list[pickle.PickleBuffer] = []
+        stream = io.BytesIO()
+        _Pickler(stream, self.__min_buffer_size, buffers.append).dump(items)
 
-    def from_bytes(self, data: bytes) -> dict[K, T]:
+        raw = [b.raw() for b in buffers]
+        lengths = b"".join(LENGTH.pack(len(r)) for r in raw)
+        prefix = PREFIX.pack(MAGIC, len(raw), stream.tell())
+        return [prefix, lengths, stream.getbuffer(), *raw]
+
+    def from_bytes(self, data: bytes | memoryview) -> dict[K, T]:
         """Deserialize bytes into a dictionary of items using pickle."""
-        raw = pickle.loads(data)
+        view = memoryview(data)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raw = pickle.loads(view)  # written before out-of-band buffers
+        else:
+            _, count, stream_len = PREFIX.unpack_from(view)
+            offset = PREFIX.size + LENGTH.size * count
+            stream = view[offset:offset + stream_len]
+
+            lengths = view[PREFIX.size:PREFIX.size + LENGTH.size * count]
+            buffers = []
+            offset += stream_len
+            for (length,) in LENGTH.iter_unpack(lengths):
+                buffers.append(view[offset:offset + length])
+                offset += length
+            raw = pickle.loads(stream, buffers=buffers)
+
         if not isinstance(raw, dict):
             raise ValueError("Failed to load resource")
 
@@ -24,3 +69,28 @@ class PickleSerializer(Serializer[K, T], Generic[K, T]):
     def extension(self) -> str | None:
         """Return the file extension for pickle serialization."""
         return 'pkl'
+
+
+class _Pickler(pickle.Pickler):
+    """Pickler moving large text fields out-of-band."""
+    def __init__(self, file, min_buffer_size: int, buffer_callback):
+        super().__init__(file, protocol=5, buffer_callback=buffer_callback)
+        self.__min_buffer_size = min_buffer_size
+
+    def reducer_override(self, obj):
+        if type(obj) is LazyField:
+            # already encoded, typically a slice of the mapped file
+            buffer = obj.buffer
+        elif type(obj) is Field and len(obj.value) >= self.__min_buffer_size:
+            buffer = obj.value.encode("utf-8")
+        else:
+            return NotImplemented
+
+        if len(buffer) < self.__min_buffer_size:
+            return NotImplemented
+        return _restore_field, (pickle.PickleBuffer(buffer),)
+
+
+def _restore_field(buffer) -> LazyField:
+    """Restore an out-of-band field without copying its buffer."""
+    return LazyField(memoryview(buffer))
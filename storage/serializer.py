@@ -6,5 +6,10 @@ T = TypeVar("T")
 
 class Serializer(Protocol[K, T]):
     def to_bytes(self, items: dict[K, T]) -> bytes: ...
-    def from_bytes(self, data: bytes) -> dict[K, T]: ...
+
+    def to_buffers(self, items: dict[K, T]) -> list:
+        """Serialize items to a list of bytes-like chunks written in order."""
+        return [self.to_bytes(items)]
+
+    def from_bytes(self, data: bytes | memoryview) -> dict[K, T]: ...
     def extension(self) -> str | None: ...
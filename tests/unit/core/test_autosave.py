@@ -0,0 +1,159 @@
+import threading
+import unittest
+
+from core.autosave import AutosaveScheduler
+from exceptions import ConflictError
+from models.contact import Contact
+from models.values import Phone
+from repositories import ContactsInMemoryRepository
+
+
+class MemoryStorage:
+    """Storage keeping saved snapshots in memory"""
+    def __init__(self, block: threading.Event | None = None):
+        self.saves: list[dict] = []
+        self.block = block
+
+    def load(self) -> dict:
+        return {}
+
+    def save(self, items: dict) -> None:
+        if self.block is not None:
+            self.block.wait(5)
+        self.saves.append(items)
+
+    def changed(self) -> bool:
+        return False
+
+    def load_changes(self, keep=()) -> tuple[dict, set]:
+        return {}, set()
+
+
+class FailingStorage(MemoryStorage):
+    """Storage raising the given error on every save"""
+    def __init__(self, error: Exception):
+        super().__init__()
+        self.error = error
+        self.attempts = 0
+
+    def save(self, items: dict) -> None:
+        self.attempts += 1
+        raise self.error
+
+
+class TestAutosaveScheduler(unittest.TestCase):
+    """Test AutosaveScheduler class"""
+    def setUp(self):
+        self.storage = MemoryStorage()
+        self.repo = ContactsInMemoryRepository(self.storage)
+
+    def add(self, scheduler: AutosaveScheduler, name: str):
+        with scheduler.command():
+            contact = Contact(name)
+            contact.add_phone(Phone("+380671234567"))
+            self.repo.add(contact)
+
+    def test_saves_after_mutation_threshold(self):
+        """Test a save is triggered after max_mutations changes"""
+        scheduler = AutosaveScheduler(
+            [self.repo], max_mutations=2, idle_seconds=60
+        ).start()
+        self.add(scheduler, "Ann")
+        self.assertTrue(scheduler.wait_idle(5))
+        self.assertEqual(self.storage.saves, [])
+
+        self.add(scheduler, "Bob")
+        self.assertTrue(scheduler.wait_idle(5))
+        self.assertEqual(len(self.storage.saves), 1)
+        self.assertEqual(set(self.storage.saves[0]), {"Ann", "Bob"})
+        scheduler.close()
+
+    def test_saves_after_idle_time(self):
+        """Test pending changes are saved once the session is idle"""
+        scheduler = AutosaveScheduler(
+            [self.repo], max_mutations=100, idle_seconds=0.05
+        ).start()
+        self.add(scheduler, "Ann")
+        for _ in range(100):
+            if self.storage.saves:
+                break
+            threading.Event().wait(0.02)
+        self.assertEqual(len(self.storage.saves), 1)
+        scheduler.close()
+        self.assertEqual(len(self.storage.saves), 1)
+
+    def test_snapshot_is_isolated_from_later_changes(self):
+        """Test a snapshot does not see mutations made after it was taken"""
+        self.add(AutosaveScheduler([self.repo]), "Ann")
+        snapshot = self.repo.snapshot()
+
+        contact = self.repo.get("Ann")
+        contact.add_phone(Phone("+380931234567"))
+        self.repo.save(contact)
+
+        self.assertEqual(len(snapshot["Ann"].phones), 1)
+        self.assertEqual(len(self.repo.snapshot()["Ann"].phones), 2)
+
+    def test_overlapping_saves_are_coalesced(self):
+        """Test requests during a save in flight collapse into one save"""
+        self.storage.block = threading.Event()
+        scheduler = AutosaveScheduler(
+            [self.repo], max_mutations=1, idle_seconds=60
+        ).start()
+        self.add(scheduler, "Ann")
+        for name in ("Bob", "Cid", "Dan"):
+            self.add(scheduler, name)
+        self.storage.block.set()
+
+        self.assertTrue(scheduler.wait_idle(5))
+        self.assertLessEqual(len(self.storage.saves), 2)
+        self.assertEqual(len(self.storage.saves[-1]), 4)
+        scheduler.close()
+
+    def test_close_flushes_pending_changes(self):
+        """Test close persists changes not saved in the background"""
+        scheduler = AutosaveScheduler(
+            [self.repo], max_mutations=100, idle_seconds=60
+        ).start()
+        self.add(scheduler, "Ann")
+        scheduler.close()
+        self.assertEqual(len(self.storage.saves), 1)
+        self.assertIn("Ann", self.storage.saves[0])
+
+    def test_failing_saves_back_off(self):
+        """Test a failing save is retried later and its error is kept"""
+        storage = FailingStorage(OSError("disk full"))
+        self.repo = ContactsInMemoryRepository(storage)
+        scheduler = AutosaveScheduler(
+            [self.repo], max_mutations=1, idle_seconds=0.05
+        ).start()
+        self.add(scheduler, "Ann")
+        threading.Event().wait(0.5)
+        # retried after 0.05s, 0.1s, 0.2s: far from a busy loop
+        self.assertLessEqual(storage.attempts, 5)
+        self.assertIsInstance(scheduler.take_error(), OSError)
+        self.assertIsNone(scheduler.take_error())
+        with self.assertRaises(OSError):
+            scheduler.close()
+
+    def test_conflict_is_reported_not_retried(self):
+        """Test a conflicting background save is kept for the next command"""
+        storage = FailingStorage(ConflictError(["Ann"]))
+        self.repo = ContactsInMemoryRepository(storage)
+        scheduler = AutosaveScheduler(
+            [self.repo], max_mutations=1, idle_seconds=0.01
+        ).start()
+        self.add(scheduler, "Ann")
+        self.assertTrue(scheduler.wait_idle(5))
+        threading.Event().wait(0.1)
+        self.assertEqual(storage.attempts, 1)
+        self.assertEqual(scheduler.take_error().keys, ("Ann",))
+        scheduler.close()
+        self.assertEqual(storage.attempts, 1)
+
+    def test_close_without_start_does_not_save(self):
+        """Test a scheduler that was never started persists nothing"""
+        scheduler = AutosaveScheduler([self.repo])
+        self.add(scheduler, "Ann")
+        scheduler.close()
+        self.assertEqual(self.storage.saves, [])
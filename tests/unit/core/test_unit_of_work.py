@@ -0,0 +1,96 @@
+import unittest
+
+from core.app_context import AppContext
+from core.unit_of_work import UnitOfWork
+from exceptions import AlreadyExistError
+from models import Note
+from models.values import Tag
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from services import FindByTagsReq, NotesService, RenameTagReq
+from services.contacts_service import ContactsService
+
+
+class MemoryStorage:
+    """Storage keeping saved snapshots in memory"""
+    def __init__(self, items: dict | None = None):
+        self.items = items or {}
+        self.saves: list[dict] = []
+
+    def load(self) -> dict:
+        return self.items
+
+    def save(self, items: dict) -> None:
+        self.saves.append(items)
+
+
+class TestUnitOfWork(unittest.TestCase):
+    """Test UnitOfWork class"""
+    def setUp(self):
+        notes = {
+            i: Note(i, f"Note {i}", "", {Tag("work")}) for i in range(1, 4)
+        }
+        self.notes_storage = MemoryStorage(notes)
+        self.contacts_storage = MemoryStorage()
+        self.notes_repo = NotesInMemoryRepository(self.notes_storage)
+        self.contacts_repo = ContactsInMemoryRepository(self.contacts_storage)
+        self.ctx = AppContext(
+            ContactsService(self.contacts_repo),
+            NotesService(self.notes_repo, self.notes_repo),
+            UnitOfWork([self.contacts_repo, self.notes_repo]),
+        )
+
+    def tagged(self, tag: str) -> list[int]:
+        return [n.note_id for n in self.ctx.notes.find_by_tags(FindByTagsReq([tag]))]
+
+    def test_commit_flushes_each_repository_once(self):
+        """Test a batch of edits costs one save per repository"""
+        with self.ctx.transaction():
+            self.ctx.notes.rename_tag(RenameTagReq("work", "job"))
+            self.ctx.contacts.add_contact("Ann", "+380670000001")
+            self.ctx.contacts.add_phone("Ann", "+380670000002")
+
+        self.assertEqual(len(self.notes_storage.saves), 1)
+        self.assertEqual(len(self.contacts_storage.saves), 1)
+        self.assertEqual(self.tagged("job"), [1, 2, 3])
+        self.assertEqual(len(self.contacts_storage.saves[0]["Ann"].phones), 2)
+
+    def test_rollback_restores_records_and_indexes(self):
+        """Test an exception undoes edits, adds, deletes and id reservations"""
+        with self.assertRaises(RuntimeError):
+            with self.ctx.transaction():
+                self.ctx.notes.rename_tag(RenameTagReq("work", "job"))
+                self.notes_repo.delete(1)
+                self.notes_repo.add(Note(self.notes_repo.generate(), "New"))
+                self.ctx.contacts.add_contact("Ann", "+380670000001")
+                raise RuntimeError("boom")
+
+        self.assertEqual(self.tagged("work"), [1, 2, 3])
+        self.assertEqual(self.tagged("job"), [])
+        self.assertEqual(self.ctx.contacts.all(), [])
+        self.assertEqual(self.notes_repo.generate(), 4)
+        self.assertEqual(self.notes_storage.saves, [])
+
+    def test_nested_transactions_join_the_outer_one(self):
+        """Test an inner block neither commits nor flushes on its own"""
+        with self.assertRaises(AlreadyExistError):
+            with self.ctx.transaction():
+                with self.ctx.transaction():
+                    self.ctx.contacts.add_contact("Ann", "+380670000001")
+                self.assertEqual(self.contacts_storage.saves, [])
+                self.ctx.contacts.add_contact("Bob", "+380670000002")
+                self.ctx.contacts.add_phone("Bob", "+380670000002")
+
+        self.assertEqual(self.ctx.contacts.all(), [])
+
+    def test_move_phone_is_atomic(self):
+        """Test a failing move keeps the phone on the source contact"""
+        self.ctx.contacts.add_contact("Ann", "+380670000001")
+        self.ctx.contacts.add_contact("Bob", "+380670000001")
+        with self.assertRaises(AlreadyExistError):
+            with self.ctx.transaction():
+                self.ctx.contacts.move_phone("Ann", "Bob", "+380670000001")
+
+        self.assertEqual(len(self.ctx.contacts.get("Ann").phones), 1)
+        self.assertEqual(self.ctx.contacts.query("phone:0670000001"), [
+            self.ctx.contacts.get("Ann"), self.ctx.contacts.get("Bob"),
+        ])
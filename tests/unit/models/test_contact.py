@@ -174,3 +174,27 @@ class TestContact(unittest.TestCase):
         self.assertEqual(len(self.contact.phones), 3)
         self.assertEqual(self.contact.phones[1].value, "+380931234567")
         self.assertEqual(self.contact.phones[2].value, "+380501112233")
+
+    def test_is_matching_follows_changes(self):
+        """Test cached search keys are refreshed by the mutators"""
+        self.assertTrue(self.contact.is_matching("john doe"))
+        self.assertFalse(self.contact.is_matching("*@example.com"))
+
+        self.contact.set_email(Email("john@example.com"))
+        self.assertTrue(self.contact.is_matching("*@example.com"))
+
+        self.contact.edit_phone(Phone("+380671234567"), Phone("+380931234567"))
+        self.assertFalse(self.contact.is_matching("+380671234567"))
+        self.assertTrue(self.contact.is_matching("*0931234567"))
+
+    def test_assigned_fields_refresh_search_keys(self):
+        """Test assigning a field directly refreshes the cached search keys"""
+        self.assertFalse(self.contact.is_matching("*@example.com"))
+        self.contact.email = Email("john@example.com")
+        self.assertTrue(self.contact.is_matching("*@example.com"))
+
+        self.contact.birthday = Birthday("01.01.1990")
+        self.assertTrue(self.contact.is_matching("01.01.1990"))
+        self.contact.phones = [Phone("+380931234567")]
+        self.assertFalse(self.contact.is_matching("+380671234567"))
+        self.assertTrue(self.contact.is_matching("+380931234567"))
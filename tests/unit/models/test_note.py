@@ -75,3 +75,10 @@ class TestNote(unittest.TestCase):
         self.assertEqual(self.note.title.value, "New Title")
         self.assertEqual(self.note.body.value, "New Body")
         self.assertEqual(self.note.tags, set([Tag("new tag")]))
+
+    def test_note_contains_after_edit(self):
+        """Test cached search key is refreshed by edit_note"""
+        self.assertTrue(self.note.contains("test note"))
+        self.note.edit_note(new_title="Groceries", new_body="Buy MILK")
+        self.assertFalse(self.note.contains("test note"))
+        self.assertTrue(self.note.contains("milk"))
@@ -0,0 +1,56 @@
+import pickle
+import unittest
+from copy import copy
+
+from models import Contact, Phones
+from models.values import Phone
+
+FIRST, SECOND, THIRD = Phone("0671111111"), Phone("0672222222"), Phone("0673333333")
+
+
+class TestPhones(unittest.TestCase):
+    """Test Phones class"""
+    def setUp(self):
+        self.phones = Phones([FIRST, SECOND, FIRST])
+
+    def test_keeps_insertion_order_without_duplicates(self):
+        """Test duplicates are dropped and order, indexing and len are kept"""
+        self.assertEqual(self.phones, [FIRST, SECOND])
+        self.assertEqual(self.phones[-1], SECOND)
+        self.assertEqual(len(self.phones), 2)
+        self.assertIn(Phone("+380671111111"), self.phones)
+
+    def test_replace_keeps_the_position(self):
+        """Test an edited phone stays in place and clashes are refused"""
+        self.assertTrue(self.phones.replace(FIRST, THIRD))
+        self.assertEqual(self.phones, [THIRD, SECOND])
+        self.assertFalse(self.phones.replace(THIRD, SECOND))
+        self.assertFalse(self.phones.replace(FIRST, THIRD))
+
+    def test_add_and_discard(self):
+        """Test add and discard report whether anything changed"""
+        self.assertFalse(self.phones.add(SECOND))
+        self.assertTrue(self.phones.discard(FIRST))
+        self.assertFalse(self.phones.discard(FIRST))
+        self.assertTrue(self.phones.add(FIRST))
+        self.assertEqual(self.phones, [SECOND, FIRST])
+
+    def test_copies_are_detached(self):
+        """Test a copied contact does not share its phones"""
+        contact = Contact("John", phones=self.phones)
+        clone = copy(contact)
+        clone.add_phone(THIRD)
+        self.assertEqual(len(contact.phones), 2)
+
+    def test_pickled_as_a_list(self):
+        """Test contacts keep storing phones as a list and load them back"""
+        contact = Contact("John", phones=[FIRST, SECOND])
+        self.assertEqual(contact.__getstate__()["phones"], [FIRST, SECOND])
+        loaded = pickle.loads(pickle.dumps(contact))
+        self.assertIsInstance(loaded.phones, Phones)
+        self.assertEqual(loaded.phones, [FIRST, SECOND])
+        self.assertEqual(loaded.to_dict(), contact.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
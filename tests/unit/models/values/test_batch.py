@@ -0,0 +1,60 @@
+import unittest
+from datetime import date
+
+from models.values import Birthday, Email, Phone, Tag, validate_batch
+from models.values.validation import CLEANERS, parse_birthday
+
+
+class TestValidateBatch(unittest.TestCase):
+    """Test validate_batch function"""
+    def test_fields_align_with_input(self):
+        """Test valid values become fields and invalid ones are reported"""
+        result = validate_batch("phone", ["067 123 45 67", "12", "380501112233"])
+        self.assertEqual(result.fields[0], Phone("+380671234567"))
+        self.assertIsNone(result.fields[1])
+        self.assertIsInstance(result.fields[2], Phone)
+        self.assertEqual(len(result.valid), 2)
+        self.assertEqual(
+            [(e.index, e.value, e.message) for e in result.errors],
+            [(1, "12", "Phone should start with +380")],
+        )
+
+    def test_same_values_and_messages_as_the_fields(self):
+        """Test every kind agrees with constructing the field directly"""
+        cases = {
+            "email": (Email, [" A@B.com ", "nope", ""]),
+            "birthday": (Birthday, ["1/2/1990", "29.02.2023", "32.01.2000", "x"]),
+            "tag": (Tag, ["My Work", "__"]),
+        }
+        for kind, (cls, values) in cases.items():
+            result = validate_batch(kind, values)
+            for value, built in zip(values, result.fields):
+                with self.subTest(kind=kind, value=value):
+                    try:
+                        expected = cls(value)
+                    except ValueError as e:
+                        self.assertIsNone(built)
+                        errors = [x for x in result.errors if x.value == value]
+                        self.assertEqual([x.message for x in errors], [str(e)])
+                    else:
+                        self.assertEqual(built, expected)
+                        self.assertIs(type(built), cls)
+
+    def test_unknown_kind(self):
+        """Test an unknown kind raises ValueError"""
+        with self.assertRaises(ValueError):
+            validate_batch("fax", ["1"])
+        self.assertIn("phone", CLEANERS)
+
+
+class TestParseBirthday(unittest.TestCase):
+    """Test parse_birthday function"""
+    def test_parses_once_against_a_given_day(self):
+        """Test the date is returned and compared with the given today"""
+        self.assertEqual(parse_birthday("1.2.1990"), date(1990, 2, 1))
+        with self.assertRaises(ValueError):
+            parse_birthday("01.02.2020", today=date(2019, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
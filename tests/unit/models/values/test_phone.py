@@ -17,6 +17,11 @@ class TestPhone(unittest.TestCase):
                 phone = Phone(input_value)
                 self.assertEqual(phone.value, expected_value)
 
+    def test_phone_hash_matches_equality(self):
+        """Test that equal phones hash alike and work as set members"""
+        self.assertEqual(hash(Phone("0671234567")), hash(Phone("+380671234567")))
+        self.assertEqual(len({Phone("0671234567"), Phone("380671234567")}), 1)
+
     def test_phone_validation_errors(self):
         """Test that Phone raises ValueError for invalid inputs"""
         test_cases = [
@@ -0,0 +1,287 @@
+import random
+import threading
+import time
+import unittest
+from datetime import datetime as DateTime
+from unittest import mock
+
+from models import Contact, Note
+from models.values import Phone
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from repositories.rwlock import ReadWriteLock
+from services import CreateNoteReq, NotesService, QueryReq, RankedFindReq
+from services.bm25_index import BM25Index
+from services.contacts_service import ContactsService
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+def _run(threads: list[threading.Thread]) -> None:
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+
+class TestReadWriteLock(unittest.TestCase):
+    """Test ReadWriteLock class"""
+    def test_readers_share_the_lock(self):
+        """Test readers holding the lock run at the same time"""
+        lock = ReadWriteLock()
+
+        def read():
+            with lock.read():
+                time.sleep(0.05)
+
+        start = time.perf_counter()
+        _run([threading.Thread(target=read) for _ in range(8)])
+        # one after another would take 0.4s
+        self.assertLess(time.perf_counter() - start, 0.25)
+
+    def test_writer_excludes_readers(self):
+        """Test a reader waits for the writer and sees its whole change"""
+        lock, state, seen = ReadWriteLock(), [0, 0], []
+
+        def read():
+            with lock.read():
+                seen.append(tuple(state))
+
+        with lock.write():
+            reader = threading.Thread(target=read)
+            reader.start()
+            state[0] = 1
+            time.sleep(0.05)
+            state[1] = 1
+        reader.join(timeout=5)
+        self.assertEqual(seen, [(1, 1)])
+
+    def test_reentrant(self):
+        """Test nested reads and writes of one thread, upgrades are refused"""
+        lock = ReadWriteLock()
+        with lock.write():
+            with lock.read(), lock.write():
+                pass
+        with lock.read():
+            with lock.read():
+                pass
+            with self.assertRaises(RuntimeError):
+                with lock.write():
+                    pass
+        with lock.write():  # released by all the blocks above
+            pass
+
+
+class TestConcurrentRepositories(unittest.TestCase):
+    """Stress the repositories from several threads"""
+    def test_notes_stress(self):
+        """Test ids stay unique and readers never see a broken state"""
+        repo = NotesInMemoryRepository(EmptyStorage(), concurrent=True)
+        errors, kept = [], []
+        stop = threading.Event()
+        day = DateTime(2026, 1, 1)
+
+        def write(seed: int):
+            rnd = random.Random(seed)
+            try:
+                for _ in range(300):
+                    ids = [repo.generate() for _ in range(2)] + list(repo.reserve(3))
+                    repo.add_many(Note(i, f"Note {i}", "text", None, day) for i in ids)
+                    dropped = rnd.sample(ids, 2)
+                    self.assertEqual(sorted(repo.delete_many(dropped)), sorted(dropped))
+                    kept.extend(i for i in ids if i not in dropped)
+            except Exception as e:  # reported by the main thread
+                errors.append(e)
+
+        def read():
+            try:
+                while not stop.is_set():
+                    for note in repo:
+                        self.assertIs(repo.get(note.note_id, note), note)
+                    repo.find("note 1")
+                    columns = repo.columns()
+                    self.assertEqual(len(columns), len(columns.values["created"]))
+            except Exception as e:  # reported by the main thread
+                errors.append(e)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        _run([threading.Thread(target=write, args=(s,)) for s in range(4)])
+        stop.set()
+        for reader in readers:
+            reader.join(timeout=30)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(kept), len(set(kept)))
+        self.assertEqual(sorted(n.note_id for n in repo.all()), sorted(kept))
+        self.assertEqual(repo.last_id, 4 * 300 * 5)
+
+    def test_contacts_stress(self):
+        """Test concurrent upserts and deletes leave exactly the last state"""
+        repo = ContactsInMemoryRepository(EmptyStorage(), concurrent=True)
+        errors = []
+
+        def write(letter: str):
+            try:
+                for i in range(200):
+                    name = f"{letter} {'abcdefghij'[i % 10] * (i // 10 + 1)}"
+                    repo.upsert_many([Contact(name, phones=[Phone("0671234567")])])
+                    if i % 2:
+                        repo.delete_many([name])
+                    repo.find(f"{letter}*")
+            except Exception as e:  # reported by the main thread
+                errors.append(e)
+
+        _run([threading.Thread(target=write, args=(c,)) for c in "ABCD"])
+        self.assertEqual(errors, [])
+        self.assertEqual(len(repo.all()), 4 * 100)
+        self.assertEqual(len(repo.snapshot()), 4 * 100)
+
+    def test_services_stress(self):
+        """Test service queries read their indexes while others write"""
+        notes_repo = NotesInMemoryRepository(EmptyStorage(), concurrent=True)
+        notes = NotesService(notes_repo, notes_repo)
+        contacts = ContactsService(
+            ContactsInMemoryRepository(EmptyStorage(), concurrent=True)
+        )
+        errors = []
+        stop = threading.Event()
+
+        def write(worker: int):
+            try:
+                # long enough for readers to meet writes, unguarded ones fail
+                deadline = time.monotonic() + 1.5
+                i = 0
+                while time.monotonic() < deadline:
+                    i += 1
+                    notes.add_note(CreateNoteReq(
+                        f"Plan {worker} {i}", f"word{i % 7} plan body", [f"t{i % 5}"]
+                    ))
+                    name = f"Name {_word(worker)} {_word(i)}"
+                    contacts.add_contact(name, "0671234567")
+            except Exception as e:  # reported by the main thread
+                errors.append(e)
+
+        def read(seed: int):
+            rnd = random.Random(seed)
+            try:
+                reads = [
+                    lambda: notes.find_ranked(RankedFindReq("plan body")),
+                    lambda: notes.query(QueryReq("tag:t1 updated:>2000-01-01")),
+                    lambda: notes.complete_tags("t"),
+                    lambda: contacts.query("name:'name b b'"),
+                    lambda: contacts.suggest("Nmae b c"),
+                    lambda: contacts.complete_names("Name a"),
+                ]
+                while not stop.is_set():
+                    rnd.choice(reads)()
+            except Exception as e:  # reported by the main thread
+                errors.append(e)
+
+        readers = [threading.Thread(target=read, args=(s,)) for s in range(4)]
+        for reader in readers:
+            reader.start()
+        _run([threading.Thread(target=write, args=(w,)) for w in range(2)])
+        stop.set()
+        for reader in readers:
+            reader.join(timeout=30)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            len(notes.find_ranked(RankedFindReq("plan", 100_000))),
+            len(notes.all()),
+        )
+
+    def test_index_reads_exclude_writers(self):
+        """Test a note added while a service reads its index waits for it"""
+        repo = NotesInMemoryRepository(EmptyStorage(), concurrent=True)
+        notes = NotesService(repo, repo)
+        notes.add_note(CreateNoteReq("Plan", "body", []))
+        search, order = BM25Index.search, []
+        writer = threading.Thread(target=lambda: (
+            notes.add_note(CreateNoteReq("Other plan", "body", [])),
+            order.append("write"),
+        ))
+
+        def search_meeting_a_writer(index, *args):
+            writer.start()
+            writer.join(0.05)
+            order.append("search")
+            return search(index, *args)
+
+        with mock.patch.object(BM25Index, "search", search_meeting_a_writer):
+            self.assertEqual(len(notes.find_ranked(RankedFindReq("plan"))), 1)
+        writer.join(timeout=5)
+        self.assertEqual(order, ["search", "write"])
+
+    def test_rollback_keeps_other_threads_notes(self):
+        """Test a rollback undoes only its own thread's work and ids"""
+        repo = NotesInMemoryRepository(EmptyStorage(), concurrent=True)
+        generated, added = threading.Event(), threading.Event()
+
+        def other():
+            note_id = repo.generate()
+            generated.set()
+            repo.add(Note(note_id, "From another thread"))  # waits for rollback
+            added.set()
+
+        repo.begin()
+        thread = threading.Thread(target=other)
+        thread.start()
+        self.assertTrue(generated.wait(5))
+        repo.add(Note(repo.generate(), "Rolled back"))
+        self.assertFalse(added.wait(0.05))
+        with self.assertRaises(RuntimeError):
+            _raise_in_thread(repo.commit)
+        repo.rollback()
+        thread.join(timeout=5)
+
+        self.assertEqual([n.title.value for n in repo.all()], ["From another thread"])
+        # only the rolled back id 2 is handed out again
+        self.assertEqual(repo.generate(), 2)
+
+    def test_transaction_excludes_other_writers(self):
+        """Test another thread's change waits until the transaction commits"""
+        repo = ContactsInMemoryRepository(EmptyStorage(), concurrent=True)
+        order = []
+
+        def other():
+            repo.upsert_many([Contact("Other", phones=[Phone("0671234567")])])
+            order.append("other")
+
+        repo.begin()
+        thread = threading.Thread(target=other)
+        thread.start()
+        time.sleep(0.05)
+        repo.upsert_many([Contact("Mine", phones=[Phone("0671234567")])])
+        order.append("mine")
+        repo.commit()
+        thread.join(timeout=5)
+        self.assertEqual(order, ["mine", "other"])
+        self.assertEqual(len(repo.all()), 2)
+
+
+def _word(number: int) -> str:
+    return "".join("abcdefghij"[int(digit)] for digit in str(number))
+
+
+def _raise_in_thread(fn) -> None:
+    errors = []
+
+    def run():
+        try:
+            fn()
+        except Exception as e:  # re-raised by the calling thread
+            errors.append(e)
+
+    _run([threading.Thread(target=run)])
+    if errors:
+        raise errors[0]
+
+
+if __name__ == "__main__":
+    unittest.main()
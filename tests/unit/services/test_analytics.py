@@ -0,0 +1,122 @@
+import unittest
+from datetime import date, datetime as DateTime
+from unittest import mock
+
+from models import Contact, Note
+from models.values import Birthday
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from repositories.columns import ColumnStore
+from services import NotesService
+from services.contacts_service import ContactsService
+
+
+class StaticStorage:
+    """Storage returning a fixed set of items"""
+    def __init__(self, items: dict):
+        self.items = items
+
+    def load(self) -> dict:
+        return self.items
+
+
+def _contact(name: str, birthday: str | None = None) -> Contact:
+    return Contact(name, birthday=birthday and Birthday(birthday))
+
+
+class WithoutNumPy:
+    """Runs the inherited tests on the pure-Python columns"""
+    def setUp(self):
+        for target in ("repositories.columns.numpy", "services.analytics.numpy"):
+            patcher = mock.patch(target, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        super().setUp()
+
+
+class TestColumnStore(unittest.TestCase):
+    """Test ColumnStore class"""
+    def test_rows_follow_upserts_and_removes(self):
+        """Test edits overwrite rows and removed rows are masked, then compacted"""
+        store = ColumnStore({"double": lambda v: 2 * v})
+        for key in range(6):
+            store.upsert(key, key)
+        store.upsert(0, 10)
+        store.remove(1)
+        store.remove(1)
+
+        columns = store.columns()
+        self.assertEqual(list(columns.values["double"]), [20, 4, 6, 8, 10])
+        self.assertEqual(columns.keys(range(len(columns))), [0, 2, 3, 4, 5])
+
+        for key in (2, 3, 4):
+            store.remove(key)
+        store.upsert(6, 6)
+        columns = store.columns()
+        self.assertEqual(len(store), 3)
+        self.assertEqual(list(columns.values["double"]), [20, 10, 12])
+        self.assertEqual(columns.keys([2]), [6])
+
+
+class TestContactsAnalytics(unittest.TestCase):
+    """Test ContactsService aggregations over birthday columns"""
+    def setUp(self):
+        self.repo = ContactsInMemoryRepository(StaticStorage({}))
+        self.service = ContactsService(self.repo)
+        for contact in (
+            _contact("Ann", "01.01.1990"),  # Saturday in 2028
+            _contact("Bob", "29.02.2000"),  # 28.02.2027 is a Sunday
+            _contact("Cid", "15.03.1985"),
+            _contact("Dan"),
+        ):
+            self.repo.add(contact)
+
+    def test_birthdays_per_month(self):
+        """Test months are counted from the columns and follow deletes"""
+        self.assertEqual(self.service.birthdays_per_month(), [1, 1, 1] + [0] * 9)
+        self.repo.delete("Cid")
+        self.assertEqual(self.service.birthdays_per_month(), [1, 1] + [0] * 10)
+
+    def test_weekend_birthdays(self):
+        """Test weekdays per year, 29 February falls back to the 28th"""
+        self.assertEqual(
+            [c.name.value for c in self.service.weekend_birthdays(2027)], ["Bob"]
+        )
+        self.assertEqual(
+            [c.name.value for c in self.service.weekend_birthdays(2028)], ["Ann"]
+        )
+
+
+class TestNotesAnalytics(unittest.TestCase):
+    """Test NotesService aggregations over date columns"""
+    def test_notes_per_week(self):
+        """Test notes are counted per Monday-based week"""
+        notes = {
+            i: Note(i, f"Note {i}", created_at=DateTime(2026, 1, day, 23, 59))
+            for i, day in enumerate((4, 5, 11, 12, 1), start=1)
+        }
+        repo = NotesInMemoryRepository(StaticStorage(notes))
+        service = NotesService(repo, repo)
+
+        self.assertEqual(service.notes_per_week("created"), [
+            (date(2025, 12, 29), 2),
+            (date(2026, 1, 5), 2),
+            (date(2026, 1, 12), 1),
+        ])
+        with self.assertRaises(ValueError):
+            service.notes_per_week("deleted")
+
+
+class TestColumnStoreWithoutNumPy(WithoutNumPy, TestColumnStore):
+    """Test ColumnStore class without NumPy"""
+
+
+class TestContactsAnalyticsWithoutNumPy(WithoutNumPy, TestContactsAnalytics):
+    """Test ContactsService aggregations without NumPy"""
+
+
+class TestNotesAnalyticsWithoutNumPy(WithoutNumPy, TestNotesAnalytics):
+    """Test NotesService aggregations without NumPy"""
+
+
+if __name__ == "__main__":
+    unittest.main()
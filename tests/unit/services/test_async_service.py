@@ -0,0 +1,196 @@
+import asyncio
+import threading
+import unittest
+from datetime import datetime as DateTime
+
+from models import Contact, Note
+from models.values import Phone
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from services import FindByTagsReq, FindReq, GetNoteReq, NotesService
+from services.async_service import (
+    AsyncContactsService,
+    AsyncNotesService,
+    SingleFlight,
+)
+from services.contacts_service import ContactsService
+
+
+class RecordingStorage:
+    """Storage recording the saved items and the saving thread"""
+    def __init__(self, items: dict):
+        self.items = items
+        self.saves: list[tuple[str, dict]] = []
+
+    def load(self) -> dict:
+        return self.items
+
+    def save(self, items: dict) -> None:
+        self.saves.append((threading.current_thread().name, dict(items)))
+
+
+def _contact(name: str, phone: str) -> Contact:
+    contact = Contact(name)
+    contact.add_phone(Phone(phone))
+    return contact
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """Test SingleFlight class"""
+    async def asyncSetUp(self):
+        self.flights = SingleFlight()
+        self.runs = 0
+        self.release = asyncio.Event()
+
+    async def work(self):
+        self.runs += 1
+        await self.release.wait()
+        return self.runs
+
+    async def test_same_key_runs_once(self):
+        """Test concurrent callers of a key share one execution"""
+        calls = [
+            asyncio.ensure_future(self.flights.do(key, self.work))
+            for key in ("a", "a", "a", "b")
+        ]
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual(await asyncio.gather(*calls), [1, 1, 1, 2])
+        self.assertEqual(len(self.flights), 0)
+
+    async def test_unhashable_keys_are_not_shared(self):
+        """Test a key that can't be hashed runs for every caller"""
+        self.release.set()
+        results = await asyncio.gather(
+            self.flights.do(["a"], self.work), self.flights.do(["a"], self.work)
+        )
+        self.assertEqual(sorted(results), [1, 2])
+
+    async def test_cancelled_caller_leaves_the_others(self):
+        """Test cancelling one caller keeps the execution for the rest"""
+        first = asyncio.ensure_future(self.flights.do("a", self.work))
+        second = asyncio.ensure_future(self.flights.do("a", self.work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual(await second, 1)
+        self.assertTrue(first.cancelled())
+
+    async def test_last_cancelled_caller_cancels_execution(self):
+        """Test the execution stops when no caller waits for it"""
+        started = []
+
+        async def work():
+            started.append(True)
+            try:
+                await self.release.wait()
+            except asyncio.CancelledError:
+                started.append(False)
+                raise
+
+        calls = [asyncio.ensure_future(self.flights.do("a", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        await asyncio.sleep(0)
+        self.assertEqual(started, [True, False])
+        self.assertEqual(len(self.flights), 0)
+
+
+class TestAsyncContactsService(unittest.IsolatedAsyncioTestCase):
+    """Test AsyncContactsService class"""
+    async def asyncSetUp(self):
+        self.storage = RecordingStorage({
+            name: _contact(name, phone) for name, phone in (
+                ("Alice", "0501234567"), ("Bob", "0507654321"),
+            )
+        })
+        self.service = ContactsService(ContactsInMemoryRepository(self.storage))
+        self.contacts = AsyncContactsService(self.service)
+
+    async def asyncTearDown(self):
+        await self.contacts.close()
+
+    async def test_identical_reads_run_once(self):
+        """Test concurrent identical queries reach the service once"""
+        results = await asyncio.gather(
+            *(self.contacts.find("Alice") for _ in range(50))
+        )
+        self.assertTrue(all(
+            [c.name.value for c in found] == ["Alice"] for found in results
+        ))
+        stats = self.service.cache_stats()
+        self.assertEqual(stats.hits + stats.misses, 1)
+        # every caller gets its own list
+        self.assertIsNot(results[0], results[1])
+
+    async def test_read_after_write_sees_it(self):
+        """Test a read issued after a write never joins an older read"""
+        # the service thread is held, so both calls below queue behind it
+        gate = threading.Event()
+        blocker = asyncio.ensure_future(self.contacts._call(gate.wait))
+        before = asyncio.ensure_future(self.contacts.all())
+        await asyncio.sleep(0.01)
+        write = asyncio.ensure_future(
+            self.contacts.add_contact("Carol", "0501112233")
+        )
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.gather(blocker, write)
+        after = await self.contacts.all()
+        self.assertEqual(len(await before), 2)
+        self.assertEqual(len(after), 3)
+
+    async def test_errors_reach_every_caller(self):
+        """Test a failing shared read raises for all its callers"""
+        results = await asyncio.gather(
+            self.contacts.get("Nobody"), self.contacts.get("Nobody"),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(r, Exception) for r in results))
+
+    async def test_flush_runs_on_storage_thread(self):
+        """Test flush writes a snapshot from the storage thread"""
+        await self.contacts.del_contact("Bob")
+        await asyncio.gather(self.contacts.flush(), self.contacts.flush())
+        self.assertEqual(len(self.storage.saves), 1)
+        thread, items = self.storage.saves[0]
+        self.assertTrue(thread.startswith("storage"))
+        self.assertEqual(list(items), ["Alice"])
+
+
+class TestAsyncNotesService(unittest.IsolatedAsyncioTestCase):
+    """Test AsyncNotesService class"""
+    async def asyncSetUp(self):
+        day = DateTime(2026, 1, 1)
+        repo = NotesInMemoryRepository(RecordingStorage({
+            i: Note(i, f"Note {i}", "", set(), day, day) for i in (1, 2, 3)
+        }))
+        self.notes = AsyncNotesService(NotesService(repo, repo), repo)
+
+    async def asyncTearDown(self):
+        await self.notes.close()
+
+    async def test_reads(self):
+        """Test reads return the service results"""
+        found, note, tagged = await asyncio.gather(
+            self.notes.find(FindReq("Note")),
+            self.notes.get_note(GetNoteReq(2)),
+            self.notes.find_by_tags(FindByTagsReq(["x"])),
+        )
+        self.assertEqual([n.note_id for n in found], [1, 2, 3])
+        self.assertEqual(note.note_id, 2)
+        self.assertEqual(tagged, [])
+
+    async def test_cancelled_read_does_not_block(self):
+        """Test a cancelled call leaves the facade usable"""
+        call = asyncio.ensure_future(self.notes.all())
+        await asyncio.sleep(0)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        self.assertEqual(len(await self.notes.all()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+from exceptions import AlreadyExistError, NotFoundError
+from models import Contact, Note
+from models.values import Email, Phone
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from services import CreateNoteReq, FindByTagsReq, NotesService
+from services.contacts_service import ContactsService
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+class TestContactsBatch(unittest.TestCase):
+    """Test ContactsService bulk operations"""
+    def setUp(self):
+        self.repo = ContactsInMemoryRepository(EmptyStorage())
+        self.service = ContactsService(self.repo)
+        self.service.add_contact("Ann", "+380670000001")
+
+    def test_add_many_reports_taken_names(self):
+        """Test taken and repeated names are reported, the rest is added"""
+        generation = self.repo.generation
+        result = self.service.add_many(
+            [Contact("Bob"), Contact("Ann"), Contact("Cid"), Contact("Bob")]
+        )
+        self.assertEqual([c.name.value for c in result.added], ["Bob", "Cid"])
+        self.assertEqual(
+            [(e.index, e.key) for e in result.errors], [(1, "Ann"), (3, "Bob")]
+        )
+        self.assertIsInstance(result.errors[0].error, AlreadyExistError)
+        self.assertEqual(self.repo.generation, generation + 1)
+
+    def test_upsert_many_merges_into_copies(self):
+        """Test existing contacts are merged and replaced, not mutated"""
+        ann = self.repo.get("Ann")
+        result = self.service.upsert_many([
+            Contact("Ann", phones=[Phone("+380670000001"), Phone("+380670000002")]),
+            Contact("Ann", email=Email("ann@example.com")),
+            Contact("Bob", phones=[Phone("+380670000003")]),
+            Contact("Ann", phones=[Phone("+380670000002")]),
+        ])
+        self.assertEqual([c.name.value for c in result.added], ["Bob"])
+        self.assertEqual([c.name.value for c in result.updated], ["Ann"])
+        self.assertTrue(result.ok)
+
+        stored = self.repo.get("Ann")
+        self.assertEqual(len(stored.phones), 2)
+        self.assertEqual(stored.email, Email("ann@example.com"))
+        self.assertEqual(len(ann.phones), 1)
+        self.assertEqual(self.service.query("phone:0670000002"), [stored])
+
+    def test_upsert_without_changes(self):
+        """Test an item adding nothing is neither added nor updated"""
+        same = Contact("Ann", phones=[Phone("0670000001")])
+        result = self.service.upsert_many([same])
+        self.assertEqual((result.added, result.updated), ([], []))
+        with self.assertRaises(AlreadyExistError):
+            self.service.add_contact_or_phone("Ann", "0670000001")
+        added = self.service.add_contact_or_phone("Ann", "0670000009")
+        self.assertEqual(added, "phone")
+
+    def test_delete_many(self):
+        """Test unknown names are reported per item"""
+        result = self.service.delete_many(["Ann", "Zed"])
+        self.assertEqual(result.deleted, ["Ann"])
+        self.assertEqual([e.key for e in result.errors], ["Zed"])
+        self.assertIsInstance(result.errors[0].error, NotFoundError)
+        self.assertEqual(self.service.all(), [])
+
+
+class TestNotesBatch(unittest.TestCase):
+    """Test NotesService bulk operations"""
+    def setUp(self):
+        self.repo = NotesInMemoryRepository(EmptyStorage())
+        self.service = NotesService(self.repo, self.repo)
+
+    def test_add_many_reserves_ids_for_valid_requests(self):
+        """Test invalid requests are reported and valid ones get a block of ids"""
+        self.repo.generate()
+        generation = self.repo.generation
+        result = self.service.add_many([
+            CreateNoteReq("One", "", ["work"]),
+            CreateNoteReq("  ", "", []),
+            CreateNoteReq("Two", "", ["work", "team"]),
+        ])
+        self.assertEqual([n.note_id for n in result.added], [2, 3])
+        self.assertEqual([e.index for e in result.errors], [1])
+        self.assertEqual(self.repo.generate(), 4)
+        self.assertEqual(self.repo.generation, generation + 1)
+        found = self.service.find_by_tags(FindByTagsReq(["team"]))
+        self.assertEqual([n.note_id for n in found], [3])
+
+    def test_upsert_and_delete_many(self):
+        """Test notes are replaced by id and deletes report unknown ids"""
+        result = self.service.upsert_many([Note(5, "Five"), Note(0, "Zero")])
+        self.assertEqual([n.note_id for n in result.added], [5])
+        self.assertEqual([e.key for e in result.errors], [0])
+        self.assertEqual(self.repo.generate(), 6)
+
+        result = self.service.upsert_many([Note(5, "Five again")])
+        self.assertEqual([n.note_id for n in result.updated], [5])
+        self.assertEqual(self.repo.get(5).title.value, "Five again")
+
+        result = self.service.delete_many([5, 7])
+        self.assertEqual(result.deleted, [5])
+        self.assertEqual([e.key for e in result.errors], [7])
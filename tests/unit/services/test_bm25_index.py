@@ -0,0 +1,156 @@
+import math
+import random
+import unittest
+from collections import Counter
+from unittest import mock
+
+from models import Note
+from repositories import NotesInMemoryRepository
+from services import NotesService, RankedFindReq
+from services.bm25_index import BM25Index
+from services.text import tokenize
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+class TestBM25Index(unittest.TestCase):
+    """Test BM25Index class"""
+    def setUp(self):
+        self.index = BM25Index()
+        self.index.upsert(1, Note(1, "Groceries", "milk eggs bread milk"))
+        self.index.upsert(2, Note(2, "Quarterly report", "numbers for the board"))
+        self.index.upsert(3, Note(3, "Ideas", "a report about milk prices"))
+
+    def ids(self, query: str, limit: int = 10) -> list[int]:
+        return [note_id for note_id, _ in self.index.search(query, limit)]
+
+    def test_ranks_by_term_frequency(self):
+        """Test notes repeating a term rank above a single mention"""
+        self.assertEqual(self.ids("milk"), [1, 3])
+
+    def test_title_matches_weigh_more(self):
+        """Test a term in the title outranks the same term in a body"""
+        self.assertEqual(self.ids("report"), [2, 3])
+
+    def test_limit_and_unknown_terms(self):
+        """Test the limit is applied and unknown terms match nothing"""
+        self.assertEqual(self.ids("milk report", limit=1), [3])
+        self.assertEqual(self.ids("unknown"), [])
+        self.assertEqual(self.ids("milk", limit=0), [])
+
+    def test_upsert_and_remove_update_postings(self):
+        """Test re-indexing and removal are reflected in results"""
+        self.index.upsert(1, Note(1, "Groceries", "eggs bread"))
+        self.assertEqual(self.ids("milk"), [3])
+        self.index.remove(3)
+        self.assertEqual(self.ids("milk"), [])
+        self.assertEqual(len(self.index), 2)
+
+    def test_common_terms_still_find_notes(self):
+        """Test a note matching only common terms isn't dropped by pruning"""
+        filler = " ".join(f"x{i}" for i in range(60))
+        index = BM25Index()
+        index.upsert(1, Note(1, "One", "zeta " + filler))
+        index.upsert(2, Note(2, "Two", "zeta " + filler))
+        index.upsert(3, Note(3, "aa bb cc dd ee", "aa bb cc dd ee"))
+        for i in range(4, 12):
+            index.upsert(i, Note(i, "Common", "aa bb cc dd ee " + filler))
+        self.assertEqual(
+            [i for i, _ in index.search("zeta aa bb cc dd ee", limit=1)], [3]
+        )
+
+    def test_matches_brute_force(self):
+        """Test search returns the exact top scores of a random corpus"""
+        rng = random.Random(7)
+        words = [f"w{i}" for i in range(40)]
+        weights = [1 / (i + 1) for i in range(40)]
+        notes = {
+            i: Note(
+                i,
+                " ".join(rng.choices(words, weights, k=rng.randint(1, 3))),
+                " ".join(rng.choices(words, weights, k=rng.randint(0, 30))),
+            )
+            for i in range(1, 301)
+        }
+        index = BM25Index()
+        for note_id, note in notes.items():
+            index.upsert(note_id, note)
+
+        for _ in range(50):
+            query = " ".join(rng.sample(words, rng.randint(1, 6)))
+            limit = rng.randint(1, 15)
+            expected = _brute_force(notes, query)
+            found = index.search(query, limit)
+            self.assertEqual(
+                [round(score, 9) for _, score in found],
+                [round(score, 9) for score in sorted(expected.values())[::-1][:limit]],
+            )
+            for note_id, score in found:
+                self.assertAlmostEqual(score, expected[note_id])
+
+
+def _brute_force(notes: dict[int, Note], query: str) -> dict[int, float]:
+    # BM25 of every note scored from scratch, with the index defaults
+    k1, b, title_weight = 1.2, 0.75, 3.0
+    frequencies, lengths = {}, {}
+    for note_id, note in notes.items():
+        title, body = tokenize(note.title.value), tokenize(note.body.value)
+        frequencies[note_id] = Counter(body)
+        for term in title:
+            frequencies[note_id][term] += title_weight
+        lengths[note_id] = title_weight * len(title) + len(body)
+    average = sum(lengths.values()) / len(notes)
+
+    scores: dict[int, float] = {}
+    for term in set(tokenize(query)):
+        df = sum(1 for tf in frequencies.values() if term in tf)
+        if not df:
+            continue
+        idf = math.log(1 + (len(notes) - df + 0.5) / (df + 0.5))
+        for note_id, tf in frequencies.items():
+            if term in tf:
+                norm = k1 * (1 - b + b * lengths[note_id] / average)
+                scores[note_id] = scores.get(note_id, 0.0) + (
+                    idf * tf[term] * (k1 + 1) / (tf[term] + norm)
+                )
+    return scores
+
+
+class TestRankedFind(unittest.TestCase):
+    """Test NotesService.find_ranked"""
+    def setUp(self):
+        self.repo = NotesInMemoryRepository(EmptyStorage())
+        self.service = NotesService(self.repo, self.repo)
+
+    def test_follows_repository_changes(self):
+        """Test the ranking sees notes added, edited and deleted"""
+        note = Note(self.repo.generate(), "Trip", "pack the tent")
+        self.repo.add(note)
+        found = self.service.find_ranked(RankedFindReq("tent"))
+        self.assertEqual([n for n, _ in found], [note])
+
+        note.edit_note(new_body="pack the bags")
+        self.repo.save(note)
+        self.assertEqual(self.service.find_ranked(RankedFindReq("tent")), [])
+
+        self.repo.delete(note.note_id)
+        self.assertEqual(self.service.find_ranked(RankedFindReq("bags")), [])
+
+    def test_index_is_built_on_first_search(self):
+        """Test saved notes are indexed by the first search, not at startup"""
+        note = Note(self.repo.generate(), "Trip", "pack the tent")
+        self.repo.add(note)
+        with mock.patch.object(BM25Index, "upsert") as upsert:
+            service = NotesService(self.repo, self.repo)
+            upsert.assert_not_called()
+        found = service.find_ranked(RankedFindReq("tent"))
+        self.assertEqual([n for n, _ in found], [note])
+
+    def test_rejects_negative_limit(self):
+        """Test a negative limit raises ValueError"""
+        with self.assertRaises(ValueError):
+            self.service.find_ranked(RankedFindReq("tent", limit=-1))
@@ -0,0 +1,85 @@
+import unittest
+
+from models import Contact, Note
+from models.values import Tag
+from services.completion_index import KeyCompletion, PrefixIndex, TagCompletion
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """Test PrefixIndex class"""
+    def setUp(self):
+        self.index = PrefixIndex()
+        for value in ("bob", "Anna", "alex", "Alexander", "ben"):
+            self.index.add(value)
+
+    def test_complete_is_case_insensitive_and_sorted(self):
+        """Test completions ignore case and come in casefolded order"""
+        self.assertEqual(self.index.complete("AL"), ["alex", "Alexander"])
+        self.assertEqual(self.index.complete("b"), ["ben", "bob"])
+        self.assertEqual(self.index.complete("z"), [])
+        self.assertEqual(len(self.index.complete("")), 5)
+
+    def test_limit(self):
+        """Test the limit caps the number of completions"""
+        self.assertEqual(self.index.complete("a", limit=2), ["alex", "Alexander"])
+        self.assertEqual(self.index.complete("a", limit=0), [])
+
+    def test_values_are_reference_counted(self):
+        """Test a value added twice stays until discarded twice"""
+        self.index.add("bob")
+        self.index.discard("bob")
+        self.assertEqual(self.index.complete("bo"), ["bob"])
+        self.index.discard("bob")
+        self.assertEqual(self.index.complete("bo"), [])
+        self.index.discard("bob")
+        self.assertEqual(len(self.index), 4)
+
+    def test_update_matches_single_adds(self):
+        """Test a bulk update sorts and counts values like one add each"""
+        self.index.update(["Bea", "anna", "bob", "Bea"])
+        self.assertEqual(self.index.complete("b"), ["Bea", "ben", "bob"])
+        self.assertEqual(self.index.complete("an"), ["Anna", "anna"])
+        for _ in range(2):
+            self.index.discard("bob")
+        self.index.discard("Bea")
+        self.assertEqual(self.index.complete("b"), ["Bea", "ben"])
+
+
+class TestRecordCompletions(unittest.TestCase):
+    """Test KeyCompletion and TagCompletion classes"""
+    def test_key_completion_is_idempotent(self):
+        """Test re-indexing a key neither duplicates nor loses it"""
+        keys = KeyCompletion()
+        keys.upsert("Anna", Contact("Anna"))
+        keys.upsert("Anna", Contact("Anna"))
+        self.assertEqual(keys.complete("a"), ["Anna"])
+        keys.remove("Anna")
+        self.assertEqual(keys.complete("a"), [])
+
+    def test_tag_completion_follows_note_edits(self):
+        """Test tags stay while any note uses them"""
+        tags = TagCompletion()
+        tags.upsert(1, Note(1, "One", "", {Tag("work"), Tag("team")}))
+        tags.upsert(2, Note(2, "Two", "", {Tag("work")}))
+        self.assertEqual(tags.complete("t"), ["team"])
+
+        tags.upsert(1, Note(1, "One", "", {Tag("travel")}))
+        self.assertEqual(tags.complete("t"), ["travel"])
+        self.assertEqual(tags.complete("w"), ["work"])
+
+        tags.remove(2)
+        self.assertEqual(tags.complete("w"), [])
+
+    def test_load_builds_like_upserts(self):
+        """Test records loaded in bulk complete and unload like upserted ones"""
+        keys, tags = KeyCompletion(), TagCompletion()
+        notes = [
+            (1, Note(1, "One", "", {Tag("work"), Tag("team")})),
+            (2, Note(2, "Two", "", {Tag("work")})),
+        ]
+        keys.load(notes)
+        tags.load(notes)
+        self.assertEqual(keys.complete(""), ["1", "2"])
+        self.assertEqual(tags.complete(""), ["team", "work"])
+        tags.remove(1)
+        self.assertEqual(tags.complete(""), ["work"])
@@ -0,0 +1,166 @@
+import io
+import unittest
+from datetime import datetime as DateTime
+
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from services import CreateNoteReq, NotesService, SortByTagsReq
+from services.contacts_service import ContactsService
+from services.csv_import import (
+    RejectedRow, clean_chunks, clean_contacts, clean_notes, read_chunks, write_report,
+)
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+CONTACTS = (
+    "Name,Phones,Email,Birthday,Address,Extra\n"
+    "John,067 123 45 67; 0501112233,John@Mail.com,1/2/1990,Kyiv  st. 1,x\n"
+    "\n"
+    "Bad Name!,0671234567,,,,\n"
+    "Anna,12,,,,\n"
+    "Kate,,,,,\n"
+)
+
+
+class TestReadChunks(unittest.TestCase):
+    """Test read_chunks function"""
+    def test_chunks_keep_lines(self):
+        """Test rows are keyed by the lowercased header with their line"""
+        chunks = list(read_chunks(io.StringIO(CONTACTS), "contacts", chunk_size=3))
+        self.assertEqual([[line for line, _ in c] for c in chunks], [[2, 4, 5], [6]])
+        self.assertEqual(chunks[0][0][1]["phones"], "067 123 45 67; 0501112233")
+
+    def test_required_column(self):
+        """Test a header without the kind's required column is refused"""
+        with self.assertRaises(ValueError):
+            list(read_chunks(io.StringIO("title\nx\n"), "contacts"))
+        with self.assertRaises(ValueError):
+            list(read_chunks(io.StringIO("title\nx\n"), "events"))
+
+
+class TestClean(unittest.TestCase):
+    """Test clean_contacts, clean_notes and clean_chunks functions"""
+    def test_contacts(self):
+        """Test valid rows become to_dict records and invalid ones are rejected"""
+        [rows] = read_chunks(io.StringIO(CONTACTS), "contacts")
+        chunk = clean_contacts(rows)
+        self.assertEqual(chunk.records, [
+            {
+                "name": "John",
+                "phones": ["+380671234567", "+380501112233"],
+                "email": "john@mail.com",
+                "birthday": "01.02.1990",
+                "address": "Kyiv st. 1",
+            },
+            {
+                "name": "Kate", "phones": [], "email": None,
+                "birthday": None, "address": None,
+            },
+        ])
+        self.assertEqual(
+            [(r.line, r.message) for r in chunk.rejected],
+            [
+                (4, "Name can contain only letters and spaces"),
+                (5, "Phone should start with +380"),
+            ],
+        )
+
+    def test_notes(self):
+        """Test tags are normalized and timestamps default to each other"""
+        text = (
+            "title,body,tags,created_at\n"
+            "Plan, body ,\"Work, Home Stuff\",2026-01-31\n"
+            " ,,,\n"
+            "Later,,,31.01.2026\n"
+        )
+        [rows] = read_chunks(io.StringIO(text), "notes")
+        chunk = clean_notes(rows)
+        [record] = chunk.records
+        self.assertEqual(record["tags"], ["home-stuff", "work"])
+        self.assertEqual(record["body"], "body")
+        self.assertEqual(record["created_at"], "2026-01-31T00:00:00")
+        self.assertEqual(record["updated_at"], record["created_at"])
+        self.assertEqual([r.line for r in chunk.rejected], [3, 4])
+
+    def test_note_timestamps(self):
+        """Test offsets become local time and updates can't precede creation"""
+        text = (
+            "title,created_at,updated_at\n"
+            "Zoned,2026-01-31T10:00:00+02:00,2026-01-31T09:00:00Z\n"
+            "Backwards,2026-02-01,2026-01-31\n"
+        )
+        [rows] = read_chunks(io.StringIO(text), "notes")
+        chunk = clean_notes(rows)
+        [record] = chunk.records
+        created = DateTime.fromisoformat(record["created_at"])
+        self.assertIsNone(created.tzinfo)
+        self.assertEqual(
+            created,
+            DateTime.fromisoformat("2026-01-31T08:00:00+00:00")
+            .astimezone().replace(tzinfo=None),
+        )
+        self.assertEqual(
+            [(r.line, r.message) for r in chunk.rejected],
+            [(3, "updated_at can't be before created_at")],
+        )
+
+        repo = NotesInMemoryRepository(EmptyStorage())
+        service = NotesService(repo, repo)
+        service.import_records(chunk.records)
+        service.add_note(CreateNoteReq("Local", "", []))
+        self.assertEqual(len(list(service.sort_by_tags(SortByTagsReq([])))), 2)
+
+    def test_pool_keeps_order(self):
+        """Test chunks cleaned by worker processes come back in input order"""
+        text = "name\n" + "".join(f"Name {'ab'[i % 2] * (i + 1)}\n" for i in range(40))
+        chunks = read_chunks(io.StringIO(text), "contacts", chunk_size=3)
+        names = [
+            record["name"]
+            for chunk in clean_chunks("contacts", chunks, workers=2)
+            for record in chunk.records
+        ]
+        self.assertEqual(names, [f"Name {'ab'[i % 2] * (i + 1)}" for i in range(40)])
+
+    def test_report(self):
+        """Test rejected rows are written with their line and error"""
+        out = io.StringIO()
+        rejected = [RejectedRow(4, {"name": "Bad!", "phones": "1"}, "Wrong")]
+        self.assertEqual(write_report(out, rejected, "contacts"), 1)
+        self.assertEqual(out.getvalue().splitlines(), [
+            "line,error,name,phones,email,birthday,address",
+            "4,Wrong,Bad!,1,,,",
+        ])
+
+
+class TestImportRecords(unittest.TestCase):
+    """Test import_records of the services"""
+    def test_contacts_are_merged(self):
+        """Test records are added or merged into existing contacts"""
+        service = ContactsService(ContactsInMemoryRepository(EmptyStorage()))
+        service.add_contact("John", "0671234567")
+        [rows] = read_chunks(io.StringIO(CONTACTS), "contacts")
+
+        result = service.import_records(clean_contacts(rows).records)
+        self.assertEqual([c.name.value for c in result.added], ["Kate"])
+        self.assertEqual(
+            service.get("John").to_dict(), clean_contacts(rows).records[0]
+        )
+
+    def test_notes_get_ids(self):
+        """Test notes get fresh ids and keep the cleaned values"""
+        repo = NotesInMemoryRepository(EmptyStorage())
+        service = NotesService(repo, repo)
+        [rows] = read_chunks(io.StringIO("title,tags\nOne,a\nTwo,b\n"), "notes")
+
+        result = service.import_records(clean_notes(rows).records)
+        self.assertEqual([n.title.value for n in result.added], ["One", "Two"])
+        self.assertEqual(len({n.note_id for n in result.added}), 2)
+        self.assertEqual([t.value for t in result.added[1].tags], ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+
+from exceptions import NotFoundError
+from models import Contact
+from models.values import Birthday, Email, Phone
+from repositories import ContactsInMemoryRepository
+from services.contacts_service import ContactsService
+from services.dedupe import DuplicateFinder, blocking_keys, score
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+def _contact(name: str, *phones: str, email=None, birthday=None) -> Contact:
+    return Contact(
+        name,
+        email=email and Email(email),
+        phones=[Phone(p) for p in phones],
+        birthday=birthday and Birthday(birthday),
+    )
+
+
+class TestScore(unittest.TestCase):
+    """Test blocking_keys and score functions"""
+    def test_blocking_keys(self):
+        """Test phones, casefolded email, birthday and name tokens are keys"""
+        contact = _contact(
+            "John Smith", "0671234567", email="J@Mail.com", birthday="01.02.1990"
+        )
+        self.assertEqual(blocking_keys(contact), [
+            "phone:+380671234567", "email:j@mail.com", "birthday:01.02.1990",
+            "name:john", "name:smith",
+        ])
+
+    def test_evidence_adds_up(self):
+        """Test shared fields and name tokens add to the score"""
+        first = _contact("John Smith", "0671234567", birthday="01.02.1990")
+        second = _contact("Smith John", "0671234567", birthday="01.02.1990")
+        self.assertEqual(score(first, second), (1.0, ("phone", "birthday", "name")))
+
+        value, reasons = score(first, _contact("John Doe", "0501112233"))
+        self.assertAlmostEqual(value, 0.4 / 3)
+        self.assertEqual(reasons, ("name",))
+
+
+class TestDuplicateFinder(unittest.TestCase):
+    """Test DuplicateFinder class"""
+    def setUp(self):
+        self.contacts = {
+            c.name.value: c for c in (
+                _contact("John Smith", "0671234567"),
+                _contact("Johnny Smith", "0671234567", email="js@mail.com"),
+                _contact("J Smith", email="JS@mail.com"),
+                _contact("Ann Lee", "0509998877", birthday="03.04.1985"),
+                _contact("Lee Ann", birthday="03.04.1985"),
+            )
+        }
+        self.finder = DuplicateFinder()
+        for name, contact in self.contacts.items():
+            self.finder.upsert(name, contact)
+
+    def pairs(self, threshold: float = 0.6) -> list[tuple[str, str]]:
+        return [
+            (m.first.name.value, m.second.name.value)
+            for m in self.finder.find(self.contacts.__getitem__, threshold)
+        ]
+
+    def test_pairs_sharing_a_block(self):
+        """Test pairs are found by shared phone, email or name and birthday"""
+        self.assertEqual(
+            self.pairs(),
+            [("J Smith", "Johnny Smith"), ("John Smith", "Johnny Smith"),
+             ("Ann Lee", "Lee Ann")],
+        )
+        self.assertEqual(self.pairs(threshold=0.1)[-1], ("J Smith", "John Smith"))
+
+    def test_oversized_blocks_are_skipped(self):
+        """Test a block above max_block pairs nothing"""
+        finder = DuplicateFinder(max_block=1)
+        for name, contact in self.contacts.items():
+            finder.upsert(name, contact)
+        self.assertEqual(finder.find(self.contacts.__getitem__), [])
+
+    def test_removed_contacts_leave_blocks(self):
+        """Test removed contacts are not paired any more"""
+        self.finder.remove("Johnny Smith")
+        self.finder.remove("Lee Ann")
+        self.assertEqual(self.pairs(), [])
+
+
+class TestMergeContacts(unittest.TestCase):
+    """Test ContactsService duplicates and merge_contacts"""
+    def setUp(self):
+        self.repo = ContactsInMemoryRepository(EmptyStorage())
+        self.service = ContactsService(self.repo)
+        self.repo.add(_contact("John Smith", "0671234567"))
+        self.repo.add(_contact(
+            "Johnny Smith", "0671234567", "0501112233",
+            email="js@mail.com", birthday="01.02.1990",
+        ))
+
+    def test_merge_combines_phones_and_fields(self):
+        """Test phones are combined without duplicates and gaps are filled"""
+        self.assertEqual(len(self.service.duplicates()), 1)
+        merged = self.service.merge_contacts("John Smith", ["Johnny Smith"])
+
+        phones = [p.value for p in merged.phones]
+        self.assertEqual(phones, ["+380671234567", "+380501112233"])
+        self.assertEqual(merged.email.value, "js@mail.com")
+        self.assertIs(self.repo.get("John Smith"), merged)
+        self.assertIsNone(self.repo.get("Johnny Smith", None))
+        self.assertEqual(self.service.duplicates(), [])
+
+    def test_invalid_merges(self):
+        """Test unknown contacts and merging into itself raise errors"""
+        with self.assertRaises(NotFoundError):
+            self.service.merge_contacts("John Smith", ["Nobody"])
+        with self.assertRaises(ValueError):
+            self.service.merge_contacts("John Smith", ["John Smith"])
+        self.assertIsNotNone(self.repo.get("Johnny Smith", None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+from exceptions import NotFoundError
+from models import Contact
+from repositories import ContactsInMemoryRepository
+from services.contacts_service import ContactsService
+from services.fuzzy_index import edit_distance, FuzzyNameIndex
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+class TestFuzzyNameIndex(unittest.TestCase):
+    """Test FuzzyNameIndex class"""
+    def setUp(self):
+        self.index = FuzzyNameIndex()
+        for name in ("Jonathan", "Joanna", "John", "Maria", "Marina"):
+            self.index.upsert(name, Contact(name))
+
+    def names(self, query: str, limit: int = 3) -> list[str]:
+        return [name for name, _ in self.index.lookup(query, limit)]
+
+    def test_finds_typos_within_two_edits(self):
+        """Test insertions, deletions, substitutions and transpositions"""
+        self.assertEqual(self.names("jonahtan"), ["Jonathan"])
+        self.assertEqual(self.names("Jonathn"), ["Jonathan"])
+        self.assertEqual(self.names("Jonathanxx"), ["Jonathan"])
+        self.assertEqual(self.names("Jonatahnxx"), [])
+        self.assertEqual(self.names("Marya"), ["Maria", "Marina"])
+
+    def test_closest_first_and_limit(self):
+        """Test results are ordered by distance and capped by limit"""
+        self.assertEqual(
+            self.index.lookup("Joann", 3), [("Joanna", 1), ("John", 2)]
+        )
+        self.assertEqual(self.names("Joann", limit=1), ["Joanna"])
+
+    def test_remove(self):
+        """Test removed names are no longer suggested"""
+        self.index.remove("Maria")
+        self.assertEqual(self.names("Marya"), ["Marina"])
+        self.index.remove("Maria")
+        self.assertEqual(len(self.index), 4)
+
+    def test_edit_distance(self):
+        """Test the bounded optimal string alignment distance"""
+        self.assertEqual(edit_distance("abc", "abc", 2), 0)
+        self.assertEqual(edit_distance("abc", "acb", 2), 1)
+        self.assertEqual(edit_distance("abc", "xyz", 2), 3)
+        self.assertEqual(edit_distance("abc", "abcdef", 2), 3)
+
+
+class TestContactSuggestions(unittest.TestCase):
+    """Test ContactsService "did you mean" suggestions"""
+    def setUp(self):
+        self.repo = ContactsInMemoryRepository(EmptyStorage())
+        self.service = ContactsService(self.repo)
+        self.service.add_contact("Jonathan", "+380671234567")
+
+    def test_not_found_carries_suggestions(self):
+        """Test a mistyped name raises NotFoundError with close names"""
+        with self.assertRaises(NotFoundError) as ctx:
+            self.service.set_email("Jonatan", "jon@example.com")
+        self.assertEqual(ctx.exception.suggestions, ("Jonathan",))
+
+    def test_suggestions_follow_repository(self):
+        """Test deleted contacts are not suggested"""
+        self.service.del_contact("Jonathan")
+        with self.assertRaises(NotFoundError) as ctx:
+            self.service.get("Jonatan")
+        self.assertEqual(ctx.exception.suggestions, ())
@@ -0,0 +1,152 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime as DateTime
+from unittest import mock
+
+from models import Note
+from models.values import Tag
+from repositories import NotesInMemoryRepository
+from services import EditBodyReq, GetNoteReq, NotesService
+from services.markdown_sync import MANIFEST, MarkdownSync, parse_markdown
+
+
+class StaticStorage:
+    """Storage returning a fixed set of items"""
+    def __init__(self, items: dict):
+        self.items = items
+
+    def load(self) -> dict:
+        return self.items
+
+
+class TestParseMarkdown(unittest.TestCase):
+    """Test parse_markdown function"""
+    def test_front_matter(self):
+        """Test title and tags come from the front matter"""
+        note = parse_markdown("---\ntitle: Plan\ntags: [work, 'home']\n---\n\nBody\n")
+        self.assertEqual((note.title, note.body, note.tags), ("Plan", "Body", [
+            "work", "home",
+        ]))
+
+    def test_heading_title(self):
+        """Test without front matter the first line is the title"""
+        note = parse_markdown("\n# Plan\nline one\nline two")
+        self.assertEqual((note.title, note.body, note.tags), (
+            "Plan", "line one\nline two", [],
+        ))
+        with self.assertRaises(ValueError):
+            parse_markdown("---\ntags: [a]\n---\n\n")
+
+
+class TestMarkdownSync(unittest.TestCase):
+    """Test MarkdownSync class"""
+    def setUp(self):
+        day = DateTime(2026, 1, 1)
+        notes = {
+            1: Note(1, "First", "one", {Tag("work")}, day, day),
+            2: Note(2, "Second", "", set(), day, day),
+        }
+        repo = NotesInMemoryRepository(StaticStorage(notes))
+        self.service = NotesService(repo, repo)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.sync = MarkdownSync(self.service, self.dir)
+        self.first = self.sync.sync()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def read(self, name: str) -> str:
+        with open(self.path(name), encoding="utf-8") as file:
+            return file.read()
+
+    def write(self, name: str, text: str) -> None:
+        with open(self.path(name), "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def note(self, note_id: int) -> Note:
+        return self.service.get_note(GetNoteReq(note_id))
+
+    def test_first_sync_writes_every_note(self):
+        """Test notes are written once and an unchanged sync does nothing"""
+        self.assertEqual(self.first.written, ["1-first.md", "2-second.md"])
+        self.assertEqual(
+            self.read("1-first.md"), "---\ntitle: First\ntags: [work]\n---\none\n"
+        )
+        manifest_mtime = os.stat(self.path(MANIFEST)).st_mtime_ns
+
+        report = self.sync.sync()
+        self.assertFalse(report.changed)
+        self.assertEqual(os.stat(self.path(MANIFEST)).st_mtime_ns, manifest_mtime)
+
+    def test_changes_flow_both_ways(self):
+        """Test edited files update notes and edited notes rewrite files"""
+        self.write("1-first.md", "---\ntitle: First!\ntags: [work, new]\n---\nmore\n")
+        self.service.edit_body(EditBodyReq(2, "written in the app"))
+        self.write("sub.md", "# Fresh\nfrom disk")
+
+        report = self.sync.sync()
+        self.assertEqual(report.updated, ["1-first.md"])
+        self.assertEqual(report.written, ["2-second.md"])
+        self.assertEqual(report.imported, ["sub.md"])
+        self.assertEqual(self.note(1).title.value, "First!")
+        self.assertEqual({t.value for t in self.note(1).tags}, {"work", "new"})
+        self.assertIn("written in the app", self.read("2-second.md"))
+        self.assertEqual(
+            [n.title.value for n in self.service.all()], ["First!", "Second", "Fresh"]
+        )
+        self.assertFalse(self.sync.sync().changed)
+
+    def test_save_during_sync_is_picked_up_later(self):
+        """Test a file saved right after it was read is imported next time"""
+        self.write("1-first.md", "---\ntitle: First\n---\nedit one\n")
+        read = self.sync._MarkdownSync__read
+
+        def read_then_save(path: str) -> bytes:
+            data = read(path)
+            self.write(path, "---\ntitle: First\n---\nedit two, saved meanwhile\n")
+            return data
+
+        with mock.patch.object(self.sync, "_MarkdownSync__read", read_then_save):
+            self.assertEqual(self.sync.sync().updated, ["1-first.md"])
+        self.assertEqual(self.note(1).body.value, "edit one")
+
+        self.assertEqual(self.sync.sync().updated, ["1-first.md"])
+        self.assertEqual(self.note(1).body.value, "edit two, saved meanwhile")
+
+    def test_conflict_keeps_both_sides(self):
+        """Test a pair changed on both sides is reported and left as is"""
+        self.write("1-first.md", "---\ntitle: First\n---\nfrom the file\n")
+        self.service.edit_body(EditBodyReq(1, "from the app"))
+
+        report = self.sync.sync()
+        self.assertEqual(report.conflicts, ["1-first.md"])
+        self.assertFalse(report.changed)
+        self.assertEqual(self.note(1).body.value, "from the app")
+        self.assertIn("from the file", self.read("1-first.md"))
+
+    def test_deletes_flow_both_ways(self):
+        """Test a removed file deletes its note and a deleted note its file"""
+        os.remove(self.path("1-first.md"))
+        self.service.delete_many([2])
+
+        report = self.sync.sync()
+        self.assertEqual(report.deleted, ["1-first.md"])
+        self.assertEqual(report.removed, ["2-second.md"])
+        self.assertEqual(list(self.service.all()), [])
+        self.assertEqual(os.listdir(self.dir), [MANIFEST])
+
+    def test_invalid_file_is_reported(self):
+        """Test a file without a title is reported and not imported"""
+        self.write("empty.md", "\n\n")
+        report = self.sync.sync()
+        self.assertEqual(report.errors, [("empty.md", "Note file needs a title")])
+        self.assertEqual(len(list(self.service.all())), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
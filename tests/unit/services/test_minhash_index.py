@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+
+from models import Note
+from repositories import NotesInMemoryRepository
+from services import DuplicatesReq, NotesService
+from services.minhash_index import MinHashIndex, shingles, signature, similarity
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+WORDS = [f"word{i}" for i in range(80)]
+BODY = " ".join(WORDS)
+
+
+def _edited(body: str, *positions: int) -> str:
+    words = body.split()
+    for position in positions:
+        words[position] = "changed"
+    return " ".join(words)
+
+
+class TestSignature(unittest.TestCase):
+    """Test shingles, signature and similarity functions"""
+    def test_estimates_jaccard(self):
+        """Test signatures estimate the shingle Jaccard similarity"""
+        first, second = shingles(BODY), shingles(_edited(BODY, 10, 40))
+        exact = len(first & second) / len(first | second)
+        estimate = similarity(signature(first), signature(second))
+        self.assertAlmostEqual(estimate, exact, delta=0.15)
+        self.assertEqual(similarity(signature(first), signature(first)), 1.0)
+
+    def test_short_texts(self):
+        """Test texts shorter than a shingle use their words"""
+        self.assertEqual(shingles("Hello, World"), {"hello world"})
+        self.assertEqual(shingles("  "), set())
+
+
+class TestMinHashIndex(unittest.TestCase):
+    """Test MinHashIndex class"""
+    def setUp(self):
+        self.index = MinHashIndex()
+        notes = [
+            Note(1, "Plan", BODY),
+            Note(2, "Plan", _edited(BODY, 5)),
+            Note(3, "Plan", _edited(BODY, 70)),
+            Note(4, "Other", " ".join(reversed(WORDS))),
+            Note(5, "Empty"),
+        ]
+        for note in notes:
+            self.index.upsert(note.note_id, note)
+
+    def ids(self, threshold: float = 0.5) -> list[list[int]]:
+        return [[i for i, _ in c] for c in self.index.clusters(threshold)]
+
+    def test_clusters_near_duplicates(self):
+        """Test edited copies are grouped with their first note"""
+        self.assertEqual(self.ids(), [[1, 2, 3]])
+        cluster = self.index.clusters()[0]
+        self.assertEqual(cluster[0], (1, 1.0))
+        self.assertTrue(all(0.5 <= score < 1.0 for _, score in cluster[1:]))
+
+    def test_threshold(self):
+        """Test a threshold above the similarity splits the cluster"""
+        self.assertEqual(self.ids(threshold=1.0), [])
+
+    def test_edits_and_removes_update_buckets(self):
+        """Test re-indexed and removed notes leave their buckets"""
+        self.index.upsert(2, Note(2, "Plan", "something else entirely now"))
+        self.index.remove(3)
+        self.assertEqual(self.ids(), [])
+        self.assertEqual(len(self.index), 4)
+
+
+class TestDuplicateNotes(unittest.TestCase):
+    """Test NotesService.duplicates"""
+    def test_duplicates_follow_repository_changes(self):
+        """Test clusters come from the attached index and follow deletes"""
+        repo = NotesInMemoryRepository(EmptyStorage())
+        repo.add(Note(1, "Plan", BODY))
+        with mock.patch.object(MinHashIndex, "upsert") as upsert:
+            service = NotesService(repo, repo)
+        upsert.assert_not_called()  # built on first use, not at startup
+        repo.add(Note(2, "Plan", _edited(BODY, 5)))
+
+        clusters = service.duplicates(DuplicatesReq())
+        self.assertEqual([[n.note_id for n, _ in c] for c in clusters], [[1, 2]])
+        repo.delete(2)
+        self.assertEqual(service.duplicates(DuplicatesReq()), [])
+        with self.assertRaises(ValueError):
+            service.duplicates(DuplicatesReq(threshold=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
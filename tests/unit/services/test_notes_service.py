@@ -0,0 +1,56 @@
+import unittest
+from datetime import datetime as DateTime
+
+from models import Note
+from models.values import Tag
+from repositories import NotesInMemoryRepository
+from services import NotesService, SortByTagsReq
+
+
+class StaticStorage:
+    """Storage returning a fixed set of items"""
+    def __init__(self, items: dict):
+        self.items = items
+
+    def load(self) -> dict:
+        return self.items
+
+
+class TestNotesService(unittest.TestCase):
+    """Test NotesService class"""
+    def setUp(self):
+        day = DateTime(2026, 1, 1)
+        tag_sets = [
+            {"work"}, {"work", "team"}, set(), {"team"}, {"work"}, {"work", "team"},
+        ]
+        notes = {
+            i: Note(i, f"Note {i}", "", {Tag(t) for t in tags}, day, day)
+            for i, tags in enumerate(tag_sets, start=1)
+        }
+        self.repo = NotesInMemoryRepository(StaticStorage(notes))
+        self.service = NotesService(self.repo, self.repo)
+
+    def ids(self, notes) -> list[int]:
+        return [n.note_id for n in notes]
+
+    def test_sort_by_tags_keeps_stable_order(self):
+        """Test notes are ordered by matching tags, ties keep insertion order"""
+        notes = self.service.sort_by_tags(SortByTagsReq(["work", "team"]))
+        self.assertEqual(self.ids(notes), [2, 6, 1, 4, 5, 3])
+
+    def test_sort_by_tags_pages_match_full_sort(self):
+        """Test top-K pages are slices of the full ranking"""
+        full = self.ids(self.service.sort_by_tags(SortByTagsReq(["work", "team"])))
+        for offset in range(0, 7):
+            for limit in range(0, 7):
+                with self.subTest(offset=offset, limit=limit):
+                    req = SortByTagsReq(["work", "team"], limit=limit, offset=offset)
+                    page = self.ids(self.service.sort_by_tags(req))
+                    self.assertEqual(page, full[offset:offset + limit])
+
+    def test_sort_by_tags_rejects_negative_page(self):
+        """Test a negative limit or offset raises ValueError"""
+        with self.assertRaises(ValueError):
+            self.service.sort_by_tags(SortByTagsReq(["work"], limit=-1))
+        with self.assertRaises(ValueError):
+            self.service.sort_by_tags(SortByTagsReq(["work"], offset=-1))
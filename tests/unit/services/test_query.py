@@ -0,0 +1,180 @@
+import unittest
+from datetime import date, datetime as DateTime
+
+from models import Contact, Note
+from models.values import Birthday, Email, Phone, Tag
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from services import NotesService, QueryReq
+from services.contacts_service import ContactsService
+from services.field_index import DateRangeIndex
+from services.query import Predicate, parse_query
+
+
+class StaticStorage:
+    """Storage returning a fixed set of items"""
+    def __init__(self, items: dict):
+        self.items = items
+
+    def load(self) -> dict:
+        return self.items
+
+
+class TestParseQuery(unittest.TestCase):
+    """Test parse_query function"""
+    def test_fields_ranges_and_free_text(self):
+        """Test field terms, wildcards, ranges and quoted free text"""
+        self.assertEqual(
+            parse_query('Tag:work updated:>=2026-01-01 "quarterly report" a*'),
+            [
+                Predicate("tag", "=", "work"),
+                Predicate("updated", ">=", "2026-01-01"),
+                Predicate(None, "=", "quarterly report"),
+                Predicate(None, "*", "a*"),
+            ],
+        )
+
+    def test_invalid_queries(self):
+        """Test empty queries and fields without value raise ValueError"""
+        for query in ("", "   ", "tag:", '"open'):
+            with self.subTest(query=query):
+                with self.assertRaises(ValueError):
+                    parse_query(query)
+
+
+class TestDateRangeIndex(unittest.TestCase):
+    """Test DateRangeIndex class"""
+    def test_inclusive_ranges_follow_updates(self):
+        """Test range bounds are inclusive days and follow re-indexing"""
+        index = DateRangeIndex(lambda d: d)
+        for key, day in enumerate([date(2026, 1, d) for d in (1, 2, 2, 5)]):
+            index.upsert(key, day)
+        self.assertEqual(index.range(date(2026, 1, 2), date(2026, 1, 2)), [1, 2])
+        self.assertEqual(index.count(None, date(2026, 1, 4)), 3)
+        self.assertEqual(index.range(date(2026, 1, 3), None), [3])
+
+        index.upsert(0, date(2026, 1, 9))
+        index.remove(3)
+        self.assertEqual(index.range(date(2026, 1, 3), None), [0])
+        self.assertEqual(index.count(date(2026, 1, 6), date(2026, 1, 1)), 0)
+
+    def test_load_sorts_like_upserts(self):
+        """Test records loaded in bulk are ordered and re-indexed like upserts"""
+        index = DateRangeIndex(lambda d: d)
+        days = [date(2026, 1, d) for d in (5, 2, 1, 2)]
+        index.load(enumerate(days))
+        index.load([(9, None), (0, date(2026, 1, 3))])
+        self.assertEqual(index.range(None, None), [2, 1, 3, 0])
+        index.remove(1)
+        self.assertEqual(index.range(date(2026, 1, 2), date(2026, 1, 2)), [3])
+
+
+class TestContactsQuery(unittest.TestCase):
+    """Test ContactsService.query"""
+    def setUp(self):
+        def contact(name, email, birthday, phone):
+            return Contact(
+                name, Email(email), [Phone(phone)], Birthday(birthday)
+            )
+
+        contacts = [
+            contact("Ann", "ann@gmail.com", "01.03.1990", "+380670000001"),
+            contact("Bob", "bob@example.com", "15.03.1985", "+380670000002"),
+            contact("Cid", "cid@gmail.com", "20.07.2000", "+380670000003"),
+        ]
+        repo = ContactsInMemoryRepository(
+            StaticStorage({c.name.value: c for c in contacts})
+        )
+        self.service = ContactsService(repo)
+
+    def names(self, query: str) -> list[str]:
+        return [c.name.value for c in self.service.query(query)]
+
+    def test_wildcards_filter_a_scan(self):
+        """Test wildcard predicates are answered by filtering"""
+        self.assertEqual(self.names("email:*@gmail.com birthday:*.03.*"), ["Ann"])
+        self.assertEqual(
+            self.service.explain("email:*@gmail.com"),
+            ["full scan", "filter email:*@gmail.com"],
+        )
+
+    def test_indexed_paths(self):
+        """Test exact values and date ranges use the indexes"""
+        self.assertEqual(self.names("phone:0670000002"), ["Bob"])
+        self.assertEqual(self.names("name:ann"), ["Ann"])
+        self.assertEqual(self.names("birthday:<01.01.1995"), ["Ann", "Bob"])
+        self.assertEqual(
+            self.service.explain("birthday:<01.01.1995 email:BOB@example.com"),
+            [
+                "hash email:BOB@example.com (~1 rows)",
+                "range birthday:<01.01.1995 (~2 rows)",
+            ],
+        )
+        self.assertEqual(
+            self.names("birthday:<01.01.1995 email:BOB@example.com"), ["Bob"]
+        )
+
+    def test_free_text_and_errors(self):
+        """Test free text terms and invalid fields or ranges"""
+        self.assertEqual(self.names("cid"), ["Cid"])
+        with self.assertRaises(ValueError):
+            self.service.query("nickname:ann")
+        with self.assertRaises(ValueError):
+            self.service.query("name:>ann")
+
+
+class TestNotesQuery(unittest.TestCase):
+    """Test NotesService.query"""
+    def setUp(self):
+        def note(note_id, title, tags, day):
+            at = DateTime(2026, 1, day)
+            return Note(note_id, title, f"{title} body", {Tag(t) for t in tags}, at, at)
+
+        notes = [
+            note(1, "Quarterly plan", {"work"}, 5),
+            note(2, "Quarterly review", {"work", "team"}, 20),
+            note(3, "Holiday", {"travel"}, 25),
+            note(4, "Team lunch", {"team"}, 28),
+            note(5, "Groceries", {"home"}, 29),
+        ]
+        self.repo = NotesInMemoryRepository(
+            StaticStorage({n.note_id: n for n in notes})
+        )
+        self.service = NotesService(self.repo, self.repo)
+
+    def ids(self, query: str) -> list[int]:
+        return [n.note_id for n in self.service.query(QueryReq(query))]
+
+    def test_tags_dates_and_text(self):
+        """Test the predicates are intersected"""
+        self.assertEqual(self.ids('tag:work updated:>2026-01-10 "quarterly"'), [2])
+        self.assertEqual(self.ids("tag:team"), [2, 4])
+        self.assertEqual(self.ids("created:2026-01-25"), [3])
+        self.assertEqual(self.ids("title:review body:*review*"), [2])
+        self.assertEqual(self.ids("tag:missing updated:>2026-01-01"), [])
+
+    def test_wide_range_filters_survivors(self):
+        """Test a range much wider than the candidates becomes a filter"""
+        self.assertEqual(
+            self.service.explain(QueryReq("id:3 updated:>2025-12-31")),
+            ["hash id:3 (~1 rows)", "filter updated:>2025-12-31"],
+        )
+        self.assertEqual(self.ids("id:3 updated:>2025-12-31"), [3])
+
+    def test_range_past_the_calendar_is_rejected(self):
+        """Test a range starting after the last or before the first day fails"""
+        for query in ("updated:>9999-12-31", "created:<0001-01-01"):
+            with self.subTest(query=query):
+                with self.assertRaises(ValueError):
+                    self.ids(query)
+        self.assertEqual(self.ids("updated:>=9999-12-31"), [])
+
+    def test_indexes_follow_edits(self):
+        """Test query results follow note edits and deletes"""
+        note = self.repo.get(3)
+        note.edit_note(new_tags={Tag("work")})
+        self.repo.save(note)
+        self.assertEqual(self.ids("tag:work"), [1, 2, 3])
+        self.assertEqual(self.ids(f"updated:{date.today().isoformat()}"), [3])
+
+        self.repo.delete(1)
+        self.assertEqual(self.ids("tag:work"), [2, 3])
@@ -0,0 +1,61 @@
+import unittest
+
+from repositories import NotesInMemoryRepository
+from services import NotesService, CreateNoteReq, EditTitleReq, FindReq
+from services.query_cache import QueryCache
+
+
+class EmptyStorage:
+    """Storage without persisted items"""
+    def load(self) -> dict:
+        return {}
+
+
+class TestQueryCache(unittest.TestCase):
+    """Test QueryCache class"""
+    def test_hits_and_misses(self):
+        """Test repeated queries are served from the cache"""
+        cache = QueryCache(maxsize=2)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return [1, 2]
+
+        self.assertEqual(cache.get_or_compute("a", 0, compute), [1, 2])
+        self.assertEqual(cache.get_or_compute("a", 0, compute), [1, 2])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.stats().hits, cache.stats().misses), (1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache stays within maxsize"""
+        cache = QueryCache(maxsize=2)
+        cache.get_or_compute("a", 0, list)
+        cache.get_or_compute("b", 0, list)
+        cache.get_or_compute("a", 0, list)
+        cache.get_or_compute("c", 0, list)
+
+        self.assertEqual(cache.stats().size, 2)
+        cache.get_or_compute("a", 0, list)
+        self.assertEqual(cache.stats().hits, 2)
+        cache.get_or_compute("b", 0, list)
+        self.assertEqual(cache.stats().misses, 4)
+
+    def test_new_generation_discards_entries(self):
+        """Test entries of an older generation are not returned"""
+        cache = QueryCache()
+        cache.get_or_compute("a", 0, lambda: [1])
+        self.assertEqual(cache.get_or_compute("a", 1, lambda: [2]), [2])
+        self.assertEqual(cache.stats().size, 1)
+
+    def test_service_mutation_invalidates_results(self):
+        """Test a note edit is visible to a repeated search"""
+        repo = NotesInMemoryRepository(EmptyStorage())
+        service = NotesService(repo, repo)
+        note = service.add_note(CreateNoteReq("Milk", "", ["shop"]))
+
+        self.assertEqual(service.find(FindReq("bread")), [])
+        service.edit_title(EditTitleReq(note.note_id, "Bread"))
+        self.assertEqual(service.find(FindReq("bread")), [note])
+        self.assertEqual(service.find(FindReq("bread")), [note])
+        self.assertEqual(service.cache_stats().hits, 1)
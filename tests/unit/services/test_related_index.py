@@ -0,0 +1,136 @@
+import math
+import unittest
+from collections import Counter
+from unittest import mock
+
+from models import Note
+from models.values import Tag
+from repositories import NotesInMemoryRepository
+from services import NotesService, RelatedReq
+from services.related_index import RelatedNotesIndex
+from services.text import tokenize
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+def _note(note_id: int, title: str, body: str, tags: tuple[str, ...] = ()) -> Note:
+    return Note(note_id, title, body, {Tag(t) for t in tags})
+
+
+NOTES = [
+    _note(1, "Garden plan", "tomatoes peppers compost watering", ("garden",)),
+    _note(2, "Compost", "compost bins and watering schedule", ("garden",)),
+    _note(3, "Budget", "rent groceries savings"),
+    _note(4, "Groceries", "tomatoes milk bread"),
+    _note(5, "Savings", "savings goal and rent budget", ("money",)),
+]
+
+
+class TestRelatedNotesIndex(unittest.TestCase):
+    """Test RelatedNotesIndex class"""
+    def setUp(self):
+        self.index = RelatedNotesIndex()
+        for note in NOTES:
+            self.index.upsert(note.note_id, note)
+
+    def ids(self, note_id: int, limit: int = 5) -> list[int]:
+        return [other for other, _ in self.index.related(note_id, limit)]
+
+    def test_shared_tags_and_words_rank_first(self):
+        """Test notes sharing tags and rare words come first, self excluded"""
+        self.assertEqual(self.ids(1, limit=2), [2, 4])
+        self.assertEqual(self.ids(3, limit=1), [5])
+
+    def test_common_terms_only_score_the_pool(self):
+        """Test terms over the postings budget still add to found candidates"""
+        index = RelatedNotesIndex(max_postings=1)
+        for note in NOTES:
+            index.upsert(note.note_id, note)
+        # note 4 shares only a word over the budget, so it is never opened
+        self.assertEqual(index.related(1), self.index.related(1, limit=1))
+
+    def test_scores_are_cosines(self):
+        """Test scores match a brute-force cosine over the same weights"""
+        def vector(note: Note) -> Counter:
+            counts = Counter(tokenize(note.body.value))
+            for term in tokenize(note.title.value):
+                counts[term] += 2.0
+            for tag in note.tags:
+                counts["#" + tag.value] += 3.0
+            return counts
+
+        vectors = {n.note_id: vector(n) for n in NOTES}
+        df = Counter(term for v in vectors.values() for term in v)
+
+        def weights(v: Counter) -> dict:
+            return {
+                t: (1 + math.log(tf)) * (math.log(len(NOTES) / df[t]) + 1)
+                for t, tf in v.items()
+            }
+
+        def cosine(a: dict, b: dict) -> float:
+            dot = sum(w * b.get(t, 0.0) for t, w in a.items())
+            norm = math.sqrt(sum(w * w for w in a.values()))
+            return dot / norm / math.sqrt(sum(w * w for w in b.values()))
+
+        first, second = weights(vectors[1]), weights(vectors[2])
+        (other, score), *_ = self.index.related(1)
+        self.assertEqual(other, 2)
+        self.assertAlmostEqual(score, cosine(first, second))
+
+    def test_notes_added_after_a_query_score_true_cosines(self):
+        """Test norms and query weights share one idf as the corpus grows"""
+        self.index.upsert(6, _note(6, "Zeta", "eta theta"))
+        self.index.related(1)
+        self.index.upsert(7, _note(7, "Zeta", "eta theta"))
+        (other, score), *_ = self.index.related(6)
+        self.assertEqual(other, 7)
+        self.assertAlmostEqual(score, 1.0)
+        for note_id in range(1, 8):
+            for _, score in self.index.related(note_id):
+                self.assertLessEqual(score, 1.0 + 1e-9)
+
+    def test_upsert_and_remove(self):
+        """Test edits re-index a note and removed notes are never returned"""
+        self.index.upsert(4, _note(4, "Savings", "budget rent savings", ("money",)))
+        self.index.remove(5)
+        self.assertEqual(self.ids(3, limit=1), [4])
+        self.assertEqual(self.index.related(5), [])
+        self.assertEqual(self.index.related(1, limit=0), [])
+        self.assertEqual(len(self.index), 4)
+
+
+class TestRelatedNotes(unittest.TestCase):
+    """Test NotesService.related"""
+    def test_related_follows_repository_changes(self):
+        """Test related notes come from the attached index and follow edits"""
+        repo = NotesInMemoryRepository(EmptyStorage())
+        service = NotesService(repo, repo)
+        for note in NOTES:
+            repo.add(note)
+
+        related = service.related(RelatedReq(3, limit=1))
+        self.assertEqual([n.note_id for n, _ in related], [5])
+        repo.delete(5)
+        related = service.related(RelatedReq(3, limit=1))
+        self.assertEqual([n.note_id for n, _ in related], [4])
+
+    def test_index_is_built_on_first_use(self):
+        """Test notes are indexed by the first related query, not at startup"""
+        repo = NotesInMemoryRepository(EmptyStorage())
+        for note in NOTES:
+            repo.add(note)
+        with mock.patch.object(RelatedNotesIndex, "upsert") as upsert:
+            service = NotesService(repo, repo)
+            upsert.assert_not_called()
+        self.assertEqual(
+            [n.note_id for n, _ in service.related(RelatedReq(3, limit=1))], [5]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
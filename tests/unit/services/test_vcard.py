@@ -0,0 +1,136 @@
+import unittest
+
+from exceptions import NotFoundError
+from models import Contact
+from models.values import Address, Birthday, Email, Phone
+from repositories import ContactsInMemoryRepository
+from services.contacts_service import ContactsService
+from services.vcard import VCard, format_vcard, parse_vcards
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+class TestParseVcards(unittest.TestCase):
+    """Test parse_vcards function"""
+    def test_reads_fields(self):
+        """Test names, phones, email, birthday and address are mapped"""
+        lines = [
+            "BEGIN:VCARD",
+            "VERSION:4.0",
+            "FN:John Smith",
+            "N:Smith;John;;;",
+            "TEL;TYPE=cell:067 123 45 67",
+            'item1.TEL;VALUE=uri;TYPE="voice,home":tel:+380501112233',
+            "EMAIL:john@mail.com",
+            "EMAIL:other@mail.com",
+            "BDAY:19900201",
+            "ADR;TYPE=home:;;Khreshchatyk 1\\, apt 2;Kyiv;;01001;Ukraine",
+            "NOTE:ignored",
+            "END:VCARD",
+        ]
+        self.assertEqual(list(parse_vcards(lines)), [VCard(
+            name="John Smith",
+            phones=["067 123 45 67", "+380501112233"],
+            email="john@mail.com",
+            birthday="01.02.1990",
+            address="Khreshchatyk 1, apt 2, Kyiv, 01001, Ukraine",
+        )])
+
+    def test_folded_and_quoted_printable_lines(self):
+        """Test continuation lines are joined and 2.1 encodings decoded"""
+        lines = [
+            "BEGIN:VCARD\r\n",
+            "VERSION:2.1\r\n",
+            "N:;Ivan;;;\r\n",
+            "ADR;CHARSET=UTF-8;ENCODING=QUOTED-PRINTABLE:;;=D0=9A=D0=B8=\r\n",
+            "=D1=97=D0=B2=\r\n",
+            " 1;;;;\r\n",
+            "BDAY:1990-02-01T00:00:00Z\r\n",
+            "END:VCARD\r\n",
+            "BEGIN:VCARD\r\n",
+            "FN:Anna\r\n",
+            "  Smith\r\n",
+            "END:VCARD\r\n",
+        ]
+        first, second = parse_vcards(lines)
+        self.assertEqual(first.name, "Ivan")
+        self.assertEqual(first.address, "Київ 1")
+        self.assertEqual(first.birthday, "01.02.1990")
+        self.assertEqual(second.name, "Anna Smith")
+
+    def test_round_trip(self):
+        """Test a written card reads back as the same contact values"""
+        contact = Contact(
+            "Anna Maria Smith",
+            email=Email("anna@mail.com"),
+            phones=[Phone("0671234567"), Phone("0501112233")],
+            birthday=Birthday("1.2.1990"),
+            address=Address("Kyiv, Khreshchatyk st. 1, " + "long " * 20),
+        )
+        text = format_vcard(contact)
+        self.assertTrue(all(
+            len(line.encode()) <= 75 for line in text.split("\r\n")
+        ))
+        [card] = parse_vcards(text.splitlines(keepends=True))
+        self.assertEqual(card, VCard(
+            name="Anna Maria Smith",
+            phones=["+380671234567", "+380501112233"],
+            email="anna@mail.com",
+            birthday="01.02.1990",
+            address=contact.address.value,
+        ))
+
+
+class TestImportVcards(unittest.TestCase):
+    """Test ContactsService.import_vcards and export_vcards"""
+    def setUp(self):
+        self.service = ContactsService(ContactsInMemoryRepository(EmptyStorage()))
+        self.service.add_contact("John", "0671234567")
+
+    def test_import_merges_and_reports_per_card(self):
+        """Test valid cards are added or merged and invalid ones skipped"""
+        cards = [
+            VCard("John", ["0501112233"], email="john@mail.com"),
+            VCard("Anna", ["0631234567"], birthday="01.02.1990"),
+            VCard("Bad", ["12"]),
+            VCard(None, ["0991234567"]),
+            VCard("Later", birthday="01.01.3000"),
+        ]
+        result = self.service.import_vcards(cards, chunk_size=2)
+
+        self.assertEqual([c.name.value for c in result.added], ["Anna"])
+        self.assertEqual([c.name.value for c in result.updated], ["John"])
+        self.assertEqual(
+            [(e.index, e.key, e.message) for e in result.errors],
+            [
+                (2, "Bad", "Phone should start with +380"),
+                (3, None, "Name should not be empty"),
+                (4, "Later", "Birthday cannot be in the future"),
+            ],
+        )
+        john = self.service.get("John")
+        self.assertEqual([p.value for p in john.phones],
+                         ["+380671234567", "+380501112233"])
+        self.assertEqual(john.email, Email("john@mail.com"))
+        with self.assertRaises(NotFoundError):
+            self.service.get("Bad")
+
+    def test_export_reads_back(self):
+        """Test exported cards import into an empty book unchanged"""
+        self.service.set_birthday("John", "01.02.1990")
+        text = "".join(self.service.export_vcards())
+
+        other = ContactsService(ContactsInMemoryRepository(EmptyStorage()))
+        result = other.import_vcards(parse_vcards(text.splitlines()))
+        self.assertTrue(result.ok)
+        self.assertEqual(
+            other.get("John").to_dict(), self.service.get("John").to_dict()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
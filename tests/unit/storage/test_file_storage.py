@@ -0,0 +1,294 @@
+import multiprocessing
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from exceptions import ConflictError
+from models import Note
+from models.contact import Contact
+from models.values import Phone
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from storage import Durability, FileStorage, JsonSerializer, PickleSerializer
+
+
+def _write_records(path: str, worker: int, rounds: int) -> None:
+    """Save one new record per round, never reloading the file."""
+    storage = FileStorage(path, PickleSerializer(), use_home_dir=False)
+    items = storage.load()
+    for i in range(rounds):
+        items = dict(items)
+        items[f"{worker}-{i}"] = {"worker": worker, "round": i}
+        storage.save(items)
+
+
+def _add_notes(path: str, worker: int, rounds: int) -> None:
+    """Add and flush one note per round, never reloading the file."""
+    storage = FileStorage(
+        path, PickleSerializer(), use_home_dir=False, rekey=Note.with_id
+    )
+    repo = NotesInMemoryRepository(storage, ids=storage)
+    for i in range(rounds):
+        repo.add(Note(repo.generate(), f"{worker}-{i}"))
+        repo.flush()
+
+
+class TestFileStorage(unittest.TestCase):
+    """Test FileStorage class"""
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "items")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def storage(self) -> FileStorage:
+        return FileStorage(self.path, PickleSerializer(), use_home_dir=False)
+
+    def test_save_and_load(self):
+        """Test saved items are loaded back"""
+        self.storage().save({"a": 1, "b": 2})
+        self.assertEqual(self.storage().load(), {"a": 1, "b": 2})
+
+    def test_durability_policies(self):
+        """Test every durability policy persists the saved items"""
+        for durability in Durability:
+            with self.subTest(durability=durability.value):
+                storage = FileStorage(
+                    f"{self.path}-{durability.value}", PickleSerializer(),
+                    use_home_dir=False, durability=durability, group_window=60,
+                )
+                storage.save({"a": 1})
+                storage.save({"a": 1, "b": 2})
+                storage.sync()
+                self.assertEqual(storage.load(), {"a": 1, "b": 2})
+
+    def test_group_commit_fsyncs_the_file_before_the_rename(self):
+        """Test a group save syncs its data and defers only the directory"""
+        storage = FileStorage(
+            self.path, PickleSerializer(), use_home_dir=False,
+            durability=Durability.GROUP, group_window=60,
+        )
+        with mock.patch("storage.file_storage.os.fsync") as fsync, \
+                mock.patch("storage.file_storage._fsync_dir") as fsync_dir:
+            storage.save({"a": 1})
+            fsync.assert_called_once()
+            fsync_dir.assert_not_called()
+            storage.sync()
+            fsync_dir.assert_called_once()
+
+    def test_group_commit_error_is_raised_by_sync(self):
+        """Test a failed background fsync is reported by the next sync"""
+        storage = FileStorage(
+            self.path, PickleSerializer(), use_home_dir=False,
+            durability=Durability.GROUP, group_window=0.01,
+        )
+        failure = OSError("disk gone")
+        with mock.patch("storage.file_storage._fsync_dir", side_effect=failure):
+            storage.save({"a": 1})
+            time.sleep(0.2)
+        with self.assertRaises(OSError) as raised:
+            storage.sync()
+        self.assertIs(raised.exception, failure)
+        storage.sync()  # reported once
+
+    def test_json_round_trip(self):
+        """Test the header works with the JSON serializer"""
+        storage = FileStorage(
+            self.path, JsonSerializer(to_dict=dict, from_dict=dict),
+            use_home_dir=False,
+        )
+        storage.save({"a": {"x": 1}})
+        self.assertEqual(storage.load(), {"a": {"x": 1}})
+
+    def test_legacy_file_without_header(self):
+        """Test files written before generation stamps are still readable"""
+        Path(self.path + ".pkl").write_bytes(PickleSerializer().to_bytes({"a": 1}))
+        storage = self.storage()
+        self.assertEqual(storage.load(), {"a": 1})
+        self.assertEqual(storage.generation, 0)
+
+        storage.save({"a": 1, "b": 2})
+        self.assertEqual(self.storage().load(), {"a": 1, "b": 2})
+
+    def test_concurrent_sessions_are_merged(self):
+        """Test a stale session merges its changes instead of overwriting"""
+        first, second = self.storage(), self.storage()
+        first_items, second_items = first.load(), second.load()
+
+        first.save({**first_items, "a": 1})
+        second.save({**second_items, "b": 2})
+
+        self.assertEqual(self.storage().load(), {"a": 1, "b": 2})
+        self.assertTrue(first.changed())
+        self.assertEqual(first.load_changes(), ({"b": 2}, set()))
+        self.assertFalse(first.changed())
+
+    def test_deletes_are_merged(self):
+        """Test deletions from another session are reported and kept"""
+        first = self.storage()
+        first.save({"a": 1, "b": 2})
+        second = self.storage()
+        items = second.load()
+
+        second.save({"a": items["a"]})
+        self.assertEqual(first.load_changes(), ({}, {"b"}))
+
+        first.save({"a": 1, "c": 3})
+        self.assertEqual(self.storage().load(), {"a": 1, "c": 3})
+
+    def test_concurrent_edits_conflict(self):
+        """Test a record edited by two sessions keeps the first save"""
+        first, second = self.storage(), self.storage()
+        first.save({1: "one", 2: "two"})
+        items = second.load()
+        first.save({**first.load(), 1: "first"})
+
+        with self.assertRaises(ConflictError) as raised:
+            second.save({**items, 1: "second", 3: "three"})
+        self.assertEqual(raised.exception.keys, (1,))
+        self.assertEqual(self.storage().load(), {1: "first", 2: "two", 3: "three"})
+        self.assertEqual(second.load_changes(), ({1: "first"}, set()))
+
+    def test_new_records_on_both_sides(self):
+        """Test a key added by two sessions is moved aside or a conflict"""
+        first, second = self.storage(), self.storage()
+        first.save({1: "first"})
+        with self.assertRaises(ConflictError):
+            second.save({1: "second"})
+        self.assertEqual(self.storage().load(), {1: "first"})
+
+        path = self.path + "-rekey"
+        first, second = (
+            FileStorage(
+                path, PickleSerializer(), use_home_dir=False,
+                rekey=lambda value, key: f"{value} as {key}",
+            )
+            for _ in range(2)
+        )
+        first.save({1: "first"})
+        second.save({1: "second"})
+        self.assertEqual(
+            FileStorage(path, PickleSerializer(), use_home_dir=False).load(),
+            {1: "first", 2: "second as 2"},
+        )
+        self.assertEqual(
+            second.load_changes(), ({1: "first", 2: "second as 2"}, set())
+        )
+
+    def test_reserved_ids_are_shared(self):
+        """Test sessions adding notes at the same time get distinct ids"""
+        first, second = (
+            NotesInMemoryRepository(storage, ids=storage)
+            for storage in (self.storage(), self.storage())
+        )
+        first.refresh()
+        first.add(Note(first.generate(), "from A"))
+        second.refresh()
+        second.add(Note(second.generate(), "from B"))
+        self.assertEqual(list(second.reserve(2)), [3, 4])
+        first.flush()
+        second.flush()
+
+        notes = self.storage().load()
+        self.assertEqual(
+            sorted((k, n.title.value) for k, n in notes.items()),
+            [(1, "from A"), (2, "from B")],
+        )
+
+    def test_missing_directory_is_created(self):
+        """Test the first save or reservation creates the data directory"""
+        path = Path(self.tmp.name) / "sub" / "dir" / "items"
+        storage = FileStorage(str(path), PickleSerializer(), use_home_dir=False)
+        self.assertEqual(list(storage.reserve_ids(2)), [1, 2])
+        storage.save({1: "a"})
+        self.assertEqual(storage.load(), {1: "a"})
+
+    def test_repository_refresh(self):
+        """Test repositories pick up records changed by other sessions"""
+        first = ContactsInMemoryRepository(self.storage())
+        second = ContactsInMemoryRepository(self.storage())
+
+        first.add(Contact("Ann", phones=[Phone("+380671234567")]))
+        first.flush()
+        second.add(Contact("Bob", phones=[Phone("+380931234567")]))
+        second.flush()
+
+        self.assertTrue(first.refresh())
+        self.assertEqual({c.name.value for c in first.all()}, {"Ann", "Bob"})
+        self.assertTrue(second.refresh())
+        self.assertEqual({c.name.value for c in second.all()}, {"Ann", "Bob"})
+        self.assertFalse(second.refresh())
+
+    def test_unsaved_edits_survive_refresh(self):
+        """Test a refresh keeps local edits until their save has returned"""
+        first = ContactsInMemoryRepository(self.storage())
+        first.add(Contact("Ann", phones=[Phone("+380671234567")]))
+        first.flush()
+        second = ContactsInMemoryRepository(self.storage())
+
+        ann = first.get("Ann")
+        ann.add_phone(Phone("+380501111111"))
+        first.save(ann)
+        snapshot = first.snapshot()  # taken for a save still in flight
+        theirs = second.get("Ann")
+        theirs.add_phone(Phone("+380502222222"))
+        second.save(theirs)
+        second.flush()
+
+        self.assertTrue(first.refresh())
+        self.assertIs(first.get("Ann"), ann)
+        with self.assertRaises(ConflictError):
+            first.flush(snapshot)
+        first.refresh()
+        self.assertIs(first.get("Ann"), ann)
+
+        # changed again, the local version is saved over theirs
+        ann.add_phone(Phone("+380503333333"))
+        first.save(ann)
+        first.flush()
+        self.assertEqual(
+            len(self.storage().load()["Ann"].phones), len(ann.phones)
+        )
+
+    def test_multi_process_updates_are_not_lost(self):
+        """Test concurrent writers in several processes lose no update"""
+        workers, rounds = 4, 25
+        processes = [
+            multiprocessing.Process(
+                target=_write_records, args=(self.path, w, rounds)
+            )
+            for w in range(workers)
+        ]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join(60)
+            self.assertEqual(p.exitcode, 0)
+
+        items = self.storage().load()
+        self.assertEqual(len(items), workers * rounds)
+        for w in range(workers):
+            for i in range(rounds):
+                self.assertEqual(items[f"{w}-{i}"], {"worker": w, "round": i})
+
+    def test_multi_process_notes_are_not_lost(self):
+        """Test notes added by several processes all survive"""
+        workers, rounds = 4, 15
+        processes = [
+            multiprocessing.Process(target=_add_notes, args=(self.path, w, rounds))
+            for w in range(workers)
+        ]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join(60)
+            self.assertEqual(p.exitcode, 0)
+
+        notes = self.storage().load()
+        self.assertEqual(
+            sorted(n.title.value for n in notes.values()),
+            sorted(f"{w}-{i}" for w in range(workers) for i in range(rounds)),
+        )
+        self.assertTrue(all(k == n.note_id for k, n in notes.items()))
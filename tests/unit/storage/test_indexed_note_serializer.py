@@ -0,0 +1,63 @@
+import tempfile
+import unittest
+from datetime import datetime as DateTime
+from pathlib import Path
+
+from models import Note
+from models.values import LazyField, Tag
+from storage import FileStorage, IndexedNoteSerializer
+
+
+class TestIndexedNoteSerializer(unittest.TestCase):
+    """Test IndexedNoteSerializer class"""
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = FileStorage[int, Note](
+            str(Path(self.tmp.name) / "notes"), IndexedNoteSerializer(),
+            use_home_dir=False,
+        )
+        created_at = DateTime(2026, 1, 2, 3, 4, 5, 678901)
+        self.notes = {
+            1: Note(1, "Первая", "Line one\nline two",
+                    {Tag("work"), Tag("team")}, created_at),
+            2: Note(2, "Second", "", set(), created_at, DateTime(2026, 2, 1)),
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Test notes are restored with all their fields"""
+        self.storage.save(self.notes)
+        loaded = self.storage.load()
+
+        self.assertEqual(loaded.keys(), self.notes.keys())
+        for note_id, note in self.notes.items():
+            with self.subTest(note_id=note_id):
+                self.assertEqual(loaded[note_id].to_dict(), note.to_dict())
+
+    def test_bodies_are_lazy(self):
+        """Test bodies are loaded lazily and previews read the first line"""
+        self.storage.save(self.notes)
+        note = self.storage.load()[1]
+
+        self.assertIsInstance(note.body, LazyField)
+        self.assertEqual(note.body.first_line(), "Line one")
+        self.assertEqual(Note.field_preview(note.body), "Line one")
+        self.assertTrue(note.contains("line two"))
+
+    def test_lazy_body_survives_edit_and_resave(self):
+        """Test untouched lazy bodies are written again after an edit"""
+        self.storage.save(self.notes)
+        loaded = self.storage.load()
+        loaded = {**loaded, 2: loaded[2].__copy__().edit_note(new_body="new")}
+        self.storage.save(loaded)
+
+        reloaded = self.storage.load()
+        self.assertEqual(reloaded[1].body.value, "Line one\nline two")
+        self.assertEqual(reloaded[2].body.value, "new")
+
+    def test_empty_file(self):
+        """Test an empty notes dict round trips"""
+        self.storage.save({})
+        self.assertEqual(self.storage.load(), {})
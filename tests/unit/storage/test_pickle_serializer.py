@@ -0,0 +1,57 @@
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from models import Note
+from models.values import LazyField
+from storage import FileStorage, PickleSerializer
+
+
+class TestPickleSerializer(unittest.TestCase):
+    """Test PickleSerializer class"""
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "notes")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_large_bodies_are_out_of_band(self):
+        """Test large bodies are separate buffers restored lazily"""
+        serializer = PickleSerializer(min_buffer_size=16)
+        notes = {1: Note(1, "Big", "x" * 32), 2: Note(2, "Small", "tiny")}
+
+        chunks = serializer.to_buffers(notes)
+        self.assertEqual(bytes(chunks[-1]), b"x" * 32)
+
+        loaded = serializer.from_bytes(b"".join(chunks))
+        self.assertIsInstance(loaded[1].body, LazyField)
+        self.assertNotIsInstance(loaded[2].body, LazyField)
+        self.assertEqual(loaded[1].to_dict(), notes[1].to_dict())
+        self.assertEqual(loaded[2].to_dict(), notes[2].to_dict())
+
+    def test_many_buffers_through_file_storage(self):
+        """Test more buffers than one vectored write accepts round trip"""
+        storage = FileStorage[int, Note](
+            self.path, PickleSerializer(min_buffer_size=8), use_home_dir=False
+        )
+        notes = {i: Note(i, f"Note {i}", f"body of note {i}") for i in range(1, 3001)}
+        storage.save(notes)
+
+        loaded = storage.load()
+        self.assertEqual(len(loaded), 3000)
+        self.assertEqual(loaded[2999].body.value, "body of note 2999")
+
+        # lazy bodies are written out-of-band again on the next save
+        storage.save({**loaded, 1: Note(1, "Edited", "edited body")})
+        reloaded = FileStorage[int, Note](
+            self.path, PickleSerializer(min_buffer_size=8), use_home_dir=False
+        ).load()
+        self.assertEqual(reloaded[1].body.value, "edited body")
+        self.assertEqual(reloaded[3000].body.value, "body of note 3000")
+
+    def test_legacy_pickle(self):
+        """Test plain pickles written before out-of-band buffers load"""
+        data = pickle.dumps({1: "a"}, protocol=pickle.HIGHEST_PROTOCOL)
+        self.assertEqual(PickleSerializer().from_bytes(data), {1: "a"})
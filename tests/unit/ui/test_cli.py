@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+
+
+class TestDemoSession(unittest.TestCase):
+    """Test the CLI started with --demo"""
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.home.cleanup()
+
+    def run_cli(self, commands: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(ROOT / "main.py"), "--demo"],
+            input=commands, capture_output=True, text=True, timeout=60,
+            cwd=ROOT, env={**os.environ, "HOME": self.home.name},
+        )
+
+    def test_demo_session_writes_nothing(self):
+        """Test a demo session adds notes and leaves no file behind"""
+        result = self.run_cli(
+            "add-note Hello body work\nadd-note Again body work\nnotes\nexit\n"
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn("Error", result.stdout)
+        self.assertIn("Again", result.stdout)
+        files = [p for p in Path(self.home.name).rglob("*") if p.is_file()]
+        self.assertEqual(files, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
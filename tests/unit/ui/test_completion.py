@@ -0,0 +1,69 @@
+import unittest
+
+from core.app_context import AppContext
+from models import Note
+from models.values import Tag
+from repositories import ContactsInMemoryRepository, NotesInMemoryRepository
+from services import NotesService
+from services.contacts_service import ContactsService
+from ui.completion import ArgumentCompleter
+
+
+class EmptyStorage:
+    """Storage without saved items"""
+    def load(self) -> dict:
+        return {}
+
+
+class TestArgumentCompleter(unittest.TestCase):
+    """Test ArgumentCompleter class"""
+    def setUp(self):
+        contacts = ContactsService(ContactsInMemoryRepository(EmptyStorage()))
+        notes_repo = NotesInMemoryRepository(EmptyStorage())
+        notes = NotesService(notes_repo, notes_repo)
+        self.completer = ArgumentCompleter(
+            ["add", "add-note", "all", "phone", "note", "find-notes-tags"],
+            AppContext(contacts, notes),
+        )
+
+        contacts.add_contact("Anna", "+380671234567")
+        contacts.add_contact("Anna Smith", "+380671234568")
+        notes_repo.add(Note(12, "One", "", {Tag("work"), Tag("team")}))
+        notes_repo.add(Note(3, "Two", "", {Tag("travel")}))
+
+    def test_completes_command_names(self):
+        """Test the first word is completed from the command names"""
+        self.assertEqual(self.completer.complete("ad", "ad"), ["add", "add-note"])
+        self.assertEqual(self.completer.complete("", ""), [
+            "add", "add-note", "all", "find-notes-tags", "note", "phone",
+        ])
+
+    def test_completes_contact_names(self):
+        """Test names with spaces are completed quoted"""
+        self.assertEqual(
+            self.completer.complete("phone an", "an"), ["Anna", '"Anna Smith"']
+        )
+        # readline hands over only the text after the last space
+        self.assertEqual(
+            self.completer.complete("phone 'Anna S", "S"), ["Smith'"]
+        )
+        self.assertEqual(
+            self.completer.complete('phone "anna s', "s"), ['Smith"']
+        )
+        self.assertEqual(self.completer.complete("phone 'Anna X", "X"), [])
+        self.assertEqual(
+            self.completer.complete("phone 'Anna", "'Anna"),
+            ["'Anna'", "'Anna Smith'"],
+        )
+        self.assertEqual(self.completer.complete("phone Anna ", ""), [])
+
+    def test_completes_note_ids_and_tags(self):
+        """Test note ids and comma separated tags are completed"""
+        self.assertEqual(self.completer.complete("note 1", "1"), ["12"])
+        self.assertEqual(
+            self.completer.complete("find-notes-tags work,t", "work,t"),
+            ["work,team", "work,travel"],
+        )
+        self.assertEqual(
+            self.completer.complete("find-notes-tags work w", "w"), ["work"]
+        )
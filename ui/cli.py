@@ -6,7 +6,11 @@ from ui.output_util import Out
 from services import NotesService
 from ui.factory import create_notes_repo, create_contacts_repo, SerializerType
 from core.app_context import AppContext
+from core.autosave import AutosaveScheduler
+from core.unit_of_work import UnitOfWork
+from exceptions import ConflictError
 from ui.commands import handle_command, get_available_commands
+from ui.completion import ArgumentCompleter
 
 
 def welcome_message():
@@ -23,9 +27,9 @@ def welcome_message():
     )
 
 
-def init_autocomplete(available_commands: list):
+def init_autocomplete(available_commands: list, ctx: AppContext | None = None):
     """
-    Initialize command-line autocomplete for available commands.
+    Initialize command-line autocomplete for commands and their arguments.
     """
     try:
         # Support arrows, command history on unix systems and cmd autocomplete
@@ -33,13 +37,14 @@ def init_autocomplete(available_commands: list):
     except ImportError:
         return
 
-    def completer(text, state):
-        buf = readline.get_line_buffer()
-        end = readline.get_endidx()
-        if " " in buf[:end]:
-            return None
+    argument_completer = ArgumentCompleter(available_commands, ctx)
+    options: list[str] = []
 
-        options = [c for c in available_commands if c.startswith(text)]
+    def completer(text, state):
+        # readline asks for every option in turn, compute them once per Tab
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_endidx()]
+            options[:] = argument_completer.complete(line, text)
         return options[state] if state < len(options) else None
 
     readline.set_completer(completer)
@@ -56,9 +61,18 @@ def init_autocomplete(available_commands: list):
         readline.parse_and_bind("tab: complete")
 
 
-def main():
-    init_autocomplete(get_available_commands())
+def report_save_error(autosave: AutosaveScheduler):
+    """Print the error of the last background save, if any."""
+    error = autosave.take_error()
+    if isinstance(error, ConflictError):
+        print(Out.warn(error.message))
+    elif error is not None:
+        print(Out.warn(
+            f"Autosave failed, retrying later: {type(error).__name__}: {error}"
+        ))
+
 
+def main():
     is_demo = "--demo" in sys.argv
     storage_dir = "demo/" if is_demo else ""
 
@@ -66,36 +80,52 @@ def main():
         f"{storage_dir}contacts",
         SerializerType.PICKLE
     )
+    # demo sessions write nothing, not even reserved note ids
     notes_repository = create_notes_repo(
         f"{storage_dir}notes",
-        SerializerType.PICKLE
+        SerializerType.PICKLE,
+        shared_ids=not is_demo,
     )
 
     ctx = AppContext(
         ContactsService(contacts_repository),
-        NotesService(notes_repository, notes_repository)
+        NotesService(notes_repository, notes_repository),
+        # demo sessions are never persisted, transactions only roll back
+        UnitOfWork([contacts_repository, notes_repository], flush=not is_demo),
     )
+    init_autocomplete(get_available_commands(), ctx)
+
+    # Demo sessions are never persisted, so the scheduler is not started
+    autosave = AutosaveScheduler([contacts_repository, notes_repository])
+    if not is_demo:
+        autosave.start()
 
     welcome_message()
     print(handle_command('help', ctx))
 
-    while True:
-        try:
-            user_input = input(Out.input_prompt("Enter a command: ")).strip()
-            if not user_input:
-                continue
-            result = handle_command(user_input, ctx)
-            if result == "exit":
+    try:
+        while True:
+            try:
+                user_input = input(Out.input_prompt("Enter a command: ")).strip()
+                if not user_input:
+                    continue
+                report_save_error(autosave)
+                with autosave.command():
+                    result = handle_command(user_input, ctx)
+                if result == "exit":
+                    break
+                if result:
+                    print(result)
+            except KeyboardInterrupt:
+                handle_command("exit", ctx)
                 break
-            if result:
-                print(result)
-        except KeyboardInterrupt:
-            handle_command("exit", ctx)
-            break
-
-    if not is_demo:
-        notes_repository.flush()
-        contacts_repository.flush()
+    finally:
+        # waits for a save in flight and persists what is left
+        try:
+            autosave.close()
+        except ConflictError as e:
+            print(Out.warn(e.message))
+        report_save_error(autosave)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
+import calendar
+import os
 import shlex
+from datetime import date
 from typing import Dict, List, Tuple, Callable
 from core.app_context import AppContext
 
@@ -11,11 +14,24 @@ from services import (
     EditTitleReq,
     EditBodyReq,
     EditTagsReq,
+    RenameTagReq,
     FindReq,
+    RankedFindReq,
+    RelatedReq,
+    DuplicatesReq,
+    QueryReq,
     FindByTagsReq,
     SortByTagsReq,
     DeleteReq,
 )
+from services.csv_import import (
+    RejectedRow, clean_chunks, read_chunks, write_report,
+)
+from services.markdown_sync import MarkdownSync
+from services.vcard import parse_vcards
+
+# skipped items listed after a bulk import, the rest are only counted
+MAX_REPORTED_ERRORS = 10
 
 
 # ---------- CONTACT COMMANDS ----------
@@ -153,6 +169,29 @@ def find_contacts(args, ctx: AppContext):
     return "\n\n".join(lines)
 
 
+def query_contacts(args, ctx: AppContext):
+    """Find contacts with a structured query, or explain its plan."""
+    explain = "--explain" in args
+    args = [a for a in args if a != "--explain"]
+    if not args:
+        raise ValueError("query command requires a query, e.g. email:*@gmail.com")
+
+    # re-quote the terms the command parser has split
+    query = shlex.join(args)
+    if explain:
+        return "\n".join(ctx.contacts.explain(query))
+
+    contacts = ctx.contacts.query(query)
+    if not contacts:
+        return f"No contacts found for this query: {Out.res_attribute(query)}"
+
+    lines = [Out.section("> FOUND CONTACTS <")]
+    for contact in contacts:
+        lines.append(Out.contact(contact))
+
+    return "\n\n".join(lines)
+
+
 def all_contacts(args, ctx: AppContext):
     """List all contacts in the contact book."""
     contacts = ctx.contacts.all()
@@ -200,6 +239,25 @@ def upcoming_birthdays(args, ctx: AppContext):
     return "\n".join(lines)
 
 
+def birthday_stats(args, ctx: AppContext):
+    """Show birthdays per month and the ones falling on a weekend."""
+    try:
+        year = int(args[0]) if args else date.today().year
+    except ValueError:
+        raise ValueError("Year must be an integer")
+
+    counts = ctx.contacts.birthdays_per_month()
+    lines = ["Birthdays per month:"]
+    for month, count in enumerate(counts, start=1):
+        lines.append(f"{Out.PARAM}{calendar.month_abbr[month]}: {Out.INFO}{count}{Out.RESET}")
+
+    weekend = ctx.contacts.weekend_birthdays(year)
+    lines.append(f"Birthdays on a weekend in [{Out.res_attribute(str(year))}]:")
+    for contact in weekend:
+        lines.append(f"{Out.PARAM}{contact.name.value}: {Out.INFO}{contact.birthday.value}{Out.RESET}")
+    return "\n".join(lines)
+
+
 def delete_phone(args, ctx: AppContext):
     """Delete a phone number from a contact."""
     if len(args) < 2:
@@ -211,6 +269,93 @@ def delete_phone(args, ctx: AppContext):
     return f"Phone was removed from {Out.res_attribute(name)}."
 
 
+def move_phone(args, ctx: AppContext):
+    """Move a phone number from one contact to another."""
+    if len(args) < 3:
+        raise ValueError(
+            "move phone command requires 3 arguments: from_username, to_username "
+            "and phone"
+        )
+
+    source, target, phone = args[0], args[1], " ".join(args[2:])
+    with ctx.transaction():
+        ctx.contacts.move_phone(source, target, phone)
+    return (
+        f"Phone was moved from {Out.res_attribute(source)} "
+        f"to {Out.res_attribute(target)}."
+    )
+
+
+def duplicate_contacts(args, ctx: AppContext):
+    """List pairs of contacts likely to be the same person."""
+    try:
+        threshold = float(args[0]) if args else 0.6
+    except ValueError:
+        raise ValueError("Threshold must be a number, e.g. 0.8")
+
+    matches = ctx.contacts.duplicates(threshold)
+    if not matches:
+        return Out.warn("No duplicate contacts found")
+
+    return "\n".join(
+        f"{Out.PARAM}{m.first.name.value} ~ {m.second.name.value}: "
+        f"{Out.INFO}{m.score:.2f} (same {', '.join(m.reasons)}){Out.RESET}"
+        for m in matches
+    )
+
+
+def merge_contacts(args, ctx: AppContext):
+    """Merge contacts into the first one given."""
+    if len(args) < 2:
+        raise ValueError(
+            "merge contacts command requires at least 2 arguments: target "
+            "and source usernames"
+        )
+
+    target, sources = args[0], args[1:]
+    with ctx.transaction():
+        merged = ctx.contacts.merge_contacts(target, sources)
+    return (
+        f"Merged {Out.res_attribute(', '.join(sources))} "
+        f"into {Out.res_attribute(target)}:\n{merged}"
+    )
+
+
+def import_vcard(args, ctx: AppContext):
+    """Add or merge contacts from a vCard file."""
+    if len(args) < 1:
+        raise ValueError("import-vcard command requires 1 argument: file path")
+
+    with open(args[0], encoding="utf-8", errors="replace") as file:
+        with ctx.transaction():
+            result = ctx.contacts.import_vcards(parse_vcards(file))
+
+    lines = [
+        f"Imported {Out.res_attribute(args[0])}: {len(result.added)} added, "
+        f"{len(result.updated)} updated, {len(result.errors)} skipped"
+    ]
+    lines.extend(
+        Out.warn(f"card {e.index + 1} ({e.key or 'no name'}): {e.message}")
+        for e in result.errors[:MAX_REPORTED_ERRORS]
+    )
+    if len(result.errors) > MAX_REPORTED_ERRORS:
+        lines.append(Out.warn(f"... {len(result.errors) - MAX_REPORTED_ERRORS} more"))
+    return "\n".join(lines)
+
+
+def export_vcard(args, ctx: AppContext):
+    """Write all contacts to a vCard file."""
+    if len(args) < 1:
+        raise ValueError("export-vcard command requires 1 argument: file path")
+
+    count = 0
+    with open(args[0], "w", encoding="utf-8", newline="") as file:
+        for card in ctx.contacts.export_vcards():
+            file.write(card)
+            count += 1
+    return f"Exported {count} contacts to {Out.res_attribute(args[0])}"
+
+
 def delete_contact(args, ctx: AppContext):
     """Delete a contact by name."""
     if len(args) < 1:
@@ -253,8 +398,17 @@ def get_note(args, ctx: AppContext):
     note_id = _get_note_id(args[0])
     req = GetNoteReq(note_id=note_id)
     note = ctx.notes.get_note(req)
-
-    return Out.note(note)
+    related = ctx.notes.related(RelatedReq(note_id=note_id))
+    if not related:
+        return Out.note(note)
+
+    lines = [Out.note(note), f"{Out.SECTION}Related notes:{Out.RESET}"]
+    lines.extend(
+        f"{Out.PARAM} > #{other.note_id}: {Out.INFO}"
+        f"{other.field_preview(other.title)} ({score:.2f}){Out.RESET}"
+        for other, score in related
+    )
+    return "\n".join(lines)
 
 
 def edit_note_title(args, ctx: AppContext):
@@ -298,6 +452,16 @@ def edit_note_tags(args, ctx: AppContext):
     return Out.note(note)
 
 
+def rename_tag(args, ctx: AppContext):
+    """Rename a tag on every note using it."""
+    if len(args) != 2:
+        raise ValueError("rename tag command requires 2 arguments: old_tag and new_tag")
+
+    with ctx.transaction():
+        notes = ctx.notes.rename_tag(RenameTagReq(old=args[0], new=args[1]))
+    return f"Tag was renamed on {Out.res_attribute(str(len(notes)))} note(s)."
+
+
 def find_notes(args, ctx: AppContext):
     """Find notes by text query."""
     if len(args) < 1:
@@ -311,6 +475,69 @@ def find_notes(args, ctx: AppContext):
     return '\n'.join([Out.note_preview(n) for n in notes])
 
 
+def query_notes(args, ctx: AppContext):
+    """Find notes with a structured query, or explain its plan."""
+    explain = "--explain" in args
+    args = [a for a in args if a != "--explain"]
+    if not args:
+        raise ValueError("query notes command requires a query, e.g. tag:work")
+
+    req = QueryReq(query=shlex.join(args))
+    if explain:
+        return '\n'.join(ctx.notes.explain(req))
+
+    notes = ctx.notes.query(req)
+    return '\n'.join([Out.note_preview(n) for n in notes])
+
+
+def search_notes(args, ctx: AppContext):
+    """Find the most relevant notes for a query."""
+    args, limit = _pop_int_option(args, "--limit")
+    if len(args) < 1:
+        raise ValueError("search notes command requires 1 argument: query")
+
+    query = ' '.join(args)
+    req = RankedFindReq(query=query) if limit is None else RankedFindReq(query, limit)
+    ranked = ctx.notes.find_ranked(req)
+
+    return '\n'.join([Out.note_preview(n) for n, _ in ranked])
+
+
+def duplicate_notes(args, ctx: AppContext):
+    """List clusters of near-duplicate notes."""
+    try:
+        req = DuplicatesReq(float(args[0])) if args else DuplicatesReq()
+    except ValueError:
+        raise ValueError("Threshold must be a number, e.g. 0.8")
+
+    clusters = ctx.notes.duplicates(req)
+    if not clusters:
+        return Out.warn("No near-duplicate notes found")
+
+    lines = []
+    for number, cluster in enumerate(clusters, start=1):
+        lines.append(f"{Out.SECTION}Cluster {number}:{Out.RESET}")
+        lines.extend(
+            f"{Out.PARAM} > #{note.note_id}: {Out.INFO}"
+            f"{note.field_preview(note.title)} (~{score:.2f}){Out.RESET}"
+            for note, score in cluster
+        )
+    return "\n".join(lines)
+
+
+def notes_per_week(args, ctx: AppContext):
+    """Show how many notes were created or updated per week."""
+    column = args[0].lower() if args else "updated"
+    weeks = ctx.notes.notes_per_week(column)
+    if not weeks:
+        return Out.warn("No notes yet")
+
+    lines = [f"Notes {column} per week:"]
+    for monday, count in weeks:
+        lines.append(f"{Out.PARAM}{monday:%d.%m.%Y}: {Out.INFO}{count}{Out.RESET}")
+    return "\n".join(lines)
+
+
 def find_notes_by_tags(args, ctx: AppContext):
     """Find notes matching specific tags."""
     if len(args) < 1:
@@ -323,13 +550,31 @@ def find_notes_by_tags(args, ctx: AppContext):
     return '\n'.join([Out.note_preview(n) for n in notes])
 
 
+def _pop_int_option(args: list[str], name: str) -> tuple[list[str], int | None]:
+    """Remove `--name N` from args and return the rest with N."""
+    if name not in args:
+        return args, None
+
+    i = args.index(name)
+    if i + 1 >= len(args):
+        raise ValueError(f"{name} requires a number")
+    try:
+        value = int(args[i + 1])
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+    return args[:i] + args[i + 2:], value
+
+
 def sort_notes_by_tags(args, ctx: AppContext):
     """Sort notes by number of matching tags."""
+    args, limit = _pop_int_option(args, "--limit")
+    args, offset = _pop_int_option(args, "--offset")
     if len(args) < 1:
         raise ValueError("sort notes by tag command requires 1 argument: tags")
 
     tags = ','.join(args)
-    req = SortByTagsReq(tags=tags.split(","))
+    req = SortByTagsReq(tags=tags.split(","), limit=limit, offset=offset or 0)
     notes = ctx.notes.sort_by_tags(req)
 
     return '\n'.join([Out.note_preview(n) for n in notes])
@@ -353,6 +598,72 @@ def all_notes(args, ctx: AppContext):
     return '\n'.join([Out.note_preview(n) for n in notes])
 
 
+def sync_notes(args, ctx: AppContext):
+    """Sync the notes with a directory of Markdown files both ways."""
+    if len(args) < 1:
+        raise ValueError("sync-notes command requires 1 argument: directory")
+    if not os.path.isdir(args[0]):
+        raise ValueError(f"{args[0]} is not a directory")
+
+    with ctx.transaction():
+        report = MarkdownSync(ctx.notes, args[0]).sync()
+
+    counts = [
+        (len(report.imported), "imported"),
+        (len(report.updated), "updated"),
+        (len(report.deleted), "deleted"),
+        (len(report.written), "files written"),
+        (len(report.removed), "files removed"),
+    ]
+    lines = [
+        f"Synced {Out.res_attribute(args[0])}: "
+        + (", ".join(f"{n} {label}" for n, label in counts if n) or "up to date")
+    ]
+    lines.extend(
+        Out.warn(f"conflict, changed in the file and the note: {path}")
+        for path in report.conflicts
+    )
+    lines.extend(Out.warn(f"{path}: {message}") for path, message in report.errors)
+    return "\n".join(lines)
+
+
+# ---------- IMPORT COMMANDS ----------
+
+def import_csv(args, ctx: AppContext):
+    """Import contacts or notes from a CSV file, rejected rows go to a report."""
+    args, workers = _pop_int_option(args, "--workers")
+    if len(args) < 2:
+        raise ValueError(
+            "import-csv command requires 2 arguments: contacts or notes, file path"
+        )
+
+    kind, path = args[0].lower(), args[1]
+    service = {"contacts": ctx.contacts, "notes": ctx.notes}.get(kind)
+    if service is None:
+        raise ValueError("Import kind must be contacts or notes")
+
+    added = updated = 0
+    rejected: list[RejectedRow] = []
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        with ctx.transaction():
+            for chunk in clean_chunks(kind, read_chunks(file, kind), workers):
+                result = service.import_records(chunk.records)
+                added += len(result.added)
+                updated += len(result.updated)
+                rejected.extend(chunk.rejected)
+
+    message = (
+        f"Imported {Out.res_attribute(path)}: {added} added, {updated} updated, "
+        f"{len(rejected)} rejected"
+    )
+    if rejected:
+        report = os.path.splitext(path)[0] + ".errors.csv"
+        with open(report, "w", encoding="utf-8", newline="") as file:
+            write_report(file, rejected, kind)
+        message += f"\n{Out.warn(f'rejected rows are listed in {report}')}"
+    return message
+
+
 # ---------- SYSTEM COMMANDS ----------
 
 
@@ -366,6 +677,8 @@ def help_command(args, ctx: AppContext):
         (("hello",), "Show greeting"),
         (("help",), "Show possible commands"),
         (("close / exit",), "Exit the bot"),
+        (("import-csv", "<contacts|notes> <file.csv> [--workers N]"),
+         "Import a CSV file in parallel, rejected rows go to <file>.errors.csv"),
     ]
 
     contacts = [
@@ -374,29 +687,49 @@ def help_command(args, ctx: AppContext):
         (("phone", "<username>"), "Show contact's phone number(s)"),
         (("all",), "Show all contacts"),
         (("find", "<search_text>"), "Find matching contacts; supports * wildcard"),
+        (("query", "<field:value ...> [--explain]"),
+         "Find contacts by name/phone/email/birthday/address, e.g. birthday:>01.01.1990"),
         (("set-birthday", "<username> <DD.MM.YYYY>"), "Set contact's birthday"),
         (("show-birthday", "<username>"), "Show contact's birthday"),
         (("birthdays", "<days>"), "Show upcoming birthdays in N days"),
+        (("birthday-stats", "[year]"), "Show birthdays per month and on weekends in a year"),
         (("set-email", "<username> <email>"), "Set email for contact"),
         (("set-address", "<username> <address>"), "Set address for contact"),
         (("delete-phone", "<username> <phone>"), "Delete phone from contact"),
+        (("move-phone", "<from_username> <to_username> <phone>"),
+         "Move phone to another contact"),
         (("delete-email", "<username>"), "Delete contact's email"),
         (("delete-birthday", "<username>"), "Delete contact's birthday"),
         (("delete-address", "<username>"), "Delete contact's address"),
         (("delete-contact", "<username>"), "Delete contact"),
+        (("duplicate-contacts", "[threshold]"),
+         "List likely duplicate contacts by shared phone/email/name/birthday"),
+        (("merge-contacts", "<target> <source> [source ...]"),
+         "Merge contacts into the target, sources are deleted"),
+        (("import-vcard", "<file.vcf>"), "Add or merge contacts from a vCard file"),
+        (("export-vcard", "<file.vcf>"), "Write all contacts to a vCard file"),
     ]
 
     notes = [
         (("add-note", "<note>"), "Add note, returns created note"),
-        (("note", "<note-id>"), "Show note details"),
+        (("note", "<note-id>"), "Show note details and related notes"),
         (("notes",), "Show all notes"),
         (("edit-note-title", "<note-id> <new-title>"), "Change note's title"),
         (("edit-note-body", "<note-id> <new-body>"), "Change note's body"),
         (("edit-note-tags", "<note-id> <tags>"), "Change note's tags (comma separated)"),
+        (("rename-tag", "<old_tag> <new_tag>"), "Rename a tag on all notes"),
         (("find-notes", "<query>"), "Find notes by text in title/body"),
+        (("query-notes", "<field:value ...> [--explain]"),
+         "Find notes by id/tag/title/body/created/updated, e.g. updated:>2026-01-01"),
+        (("search-notes", "<query> [--limit N]"), "Find the most relevant notes (BM25 ranking)"),
+        (("duplicate-notes", "[threshold]"),
+         "Group near-duplicate notes with estimated similarity (default 0.5)"),
+        (("notes-per-week", "[created|updated]"), "Count notes created or updated per week"),
         (("find-notes-tags", "<tags>"), "Find notes by tags"),
-        (("sort-notes-tags", "<tags>"), "Sort notes by tags"),
+        (("sort-notes-tags", "<tags> [--limit N] [--offset M]"), "Sort notes by tags, optionally one page"),
         (("delete-note", "<note-id>"), "Delete note"),
+        (("sync-notes", "<directory>"),
+         "Sync notes with Markdown files both ways, reporting conflicts"),
     ]
 
     def render_block(title: str, commands: list[tuple[tuple[str, ...], str]]):
@@ -429,6 +762,7 @@ def parse_input(user_input: str) -> Tuple[str, List[str]]:
 commands: Dict[str, Callable[[List[str], AppContext], str]] = {
     "hello": lambda args, ctx: "How can I help you?",
     "help": help_command,
+    "import-csv": import_csv,
 
     # Contact's commands
     "add": add_contact,
@@ -439,13 +773,20 @@ commands: Dict[str, Callable[[List[str], AppContext], str]] = {
     "set-address": set_address,
     "change": edit_phone,
     "delete-phone": delete_phone,
+    "move-phone": move_phone,
     "delete-email": delete_email,
     "delete-birthday": delete_birthday,
     "delete-address": delete_address,
     "find": find_contacts,
+    "query": query_contacts,
     "all": all_contacts,
     "birthdays": upcoming_birthdays,
+    "birthday-stats": birthday_stats,
     "delete-contact": delete_contact,
+    "duplicate-contacts": duplicate_contacts,
+    "merge-contacts": merge_contacts,
+    "import-vcard": import_vcard,
+    "export-vcard": export_vcard,
 
     # Note's commands
     "add-note": add_note,
@@ -454,10 +795,16 @@ commands: Dict[str, Callable[[List[str], AppContext], str]] = {
     "edit-note-title": edit_note_title,
     "edit-note-body": edit_note_body,
     "edit-note-tags": edit_note_tags,
+    "rename-tag": rename_tag,
     "find-notes": find_notes,
+    "query-notes": query_notes,
+    "search-notes": search_notes,
+    "duplicate-notes": duplicate_notes,
+    "notes-per-week": notes_per_week,
     "find-notes-tags": find_notes_by_tags,
     "sort-notes-tags": sort_notes_by_tags,
     "delete-note": delete_note,
+    "sync-notes": sync_notes,
 }
 
 
@@ -0,0 +1,96 @@
+from typing import Callable, Iterable
+
+from core.app_context import AppContext
+from services.completion_index import PrefixIndex
+
+CONTACT_COMMANDS = {
+    "add", "phone", "change", "set-email", "set-birthday", "set-address",
+    "show-birthday", "delete-phone", "delete-email", "delete-birthday",
+    "delete-address", "delete-contact", "move-phone", "merge-contacts",
+}
+NOTE_COMMANDS = {
+    "note", "edit-note-title", "edit-note-body", "edit-note-tags", "delete-note",
+}
+TAG_COMMANDS = {"find-notes-tags", "sort-notes-tags"}
+
+
+class ArgumentCompleter:
+    """
+    Tab completion of command names and their arguments.
+
+    Contact names and note ids are completed for the first argument, tags for
+    every argument of the tag commands. Candidates come from indexes the
+    services keep in sync with the repositories, so a Tab press costs one
+    bisect rather than a scan. Readline splits words at spaces, so a quoted
+    name still open at the cursor is completed as a whole and only the part
+    after its last space is handed back.
+    """
+    def __init__(
+        self,
+        commands: Iterable[str],
+        ctx: AppContext | None = None,
+        limit: int = 200,
+    ):
+        self.__commands = PrefixIndex()
+        self.__commands.update(commands)
+        self.__ctx = ctx
+        self.__limit = limit
+
+    def complete(self, line: str, text: str) -> list[str]:
+        """Return completions of text, the word ending the line typed so far."""
+        start = _open_quote(line)
+        if start < 0 or len(line) - start <= len(text):
+            return self.__complete_word(line, text)
+
+        token = line[start:]
+        typed = len(token) - len(text)
+        return [value[typed:] for value in self.__complete_word(line, token)]
+
+    def __complete_word(self, line: str, text: str) -> list[str]:
+        words = line[:len(line) - len(text)].split()
+        if not words:
+            return self.__commands.complete(text, self.__limit)
+        if self.__ctx is None:
+            return []
+
+        command, position = words[0].lower(), len(words) - 1
+        if command in TAG_COMMANDS:
+            return self.__complete_tags(text)
+        if position == 0 and command in CONTACT_COMMANDS:
+            return self.__complete_quoted(text, self.__ctx.contacts.complete_names)
+        if position == 0 and command in NOTE_COMMANDS:
+            return self.__ctx.notes.complete_ids(text, self.__limit)
+        return []
+
+    def __complete_tags(self, text: str) -> list[str]:
+        # tags may be typed comma separated, only the last one is completed
+        head, _, prefix = text.rpartition(",")
+        head = head + "," if head else ""
+        return [
+            head + tag
+            for tag in self.__ctx.notes.complete_tags(prefix, self.__limit)
+        ]
+
+    def __complete_quoted(
+        self, text: str, complete: Callable[[str, int], list[str]]
+    ) -> list[str]:
+        # names with spaces are inserted quoted, as the command parser expects
+        quote = text[:1] if text[:1] in ("'", '"') else ""
+        values = complete(text[len(quote):], self.__limit)
+        mark = quote or '"'
+        return [
+            mark + value + mark if quote or " " in value else value
+            for value in values
+        ]
+
+
+def _open_quote(line: str) -> int:
+    """Index of the quote opening an unterminated last word, or -1"""
+    quote, start = "", -1
+    for i, char in enumerate(line):
+        if quote:
+            if char == quote:
+                quote = ""
+        elif char in ("'", '"') and (i == 0 or line[i - 1].isspace()):
+            quote, start = char, i
+    return start if quote else -1
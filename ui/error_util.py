@@ -11,6 +11,7 @@ def input_error(func):
 
     Handles:
         - AlreadyExistError, NotFoundError: displays the exception message
+          and "did you mean" suggestions carried by NotFoundError
         - KeyError, ValueError, IndexError: displays a formatted error message
         - Any other Exception: displays exception type and message
     """
@@ -18,7 +19,14 @@ def input_error(func):
         try:
             return func(*args, **kwargs)
 
-        except (AlreadyExistError, NotFoundError) as e:
+        except NotFoundError as e:
+            message = f"{Out.ERROR}{e.message}{Out.RESET}"
+            if e.suggestions:
+                suggestions = ", ".join(e.suggestions)
+                message += f"\n{Out.WARNING}Did you mean: {suggestions}?{Out.RESET}"
+            return message
+
+        except AlreadyExistError as e:
             return f"{Out.ERROR}{e.message}{Out.RESET}"
 
         except KeyError as e:
@@ -1,7 +1,13 @@
 from enum import Enum
 
 from repositories import NotesInMemoryRepository, ContactsInMemoryRepository
-from storage import FileStorage, JsonSerializer, PickleSerializer
+from storage import (
+    FileStorage,
+    Durability,
+    JsonSerializer,
+    PickleSerializer,
+    IndexedNoteSerializer,
+)
 from models import Note, Contact
 
 
@@ -9,13 +15,23 @@ class SerializerType(Enum):
     """Enumeration of supported serializer types."""
     JSON = "json"
     PICKLE = "pickle"
+    INDEXED = "indexed"  # notes only: metadata index + memory-mapped bodies
 
 
 def create_notes_repo(
         filename: str,
-        serializer_type: SerializerType = SerializerType.PICKLE
+        serializer_type: SerializerType = SerializerType.PICKLE,
+        durability: Durability = Durability.ALWAYS,
+        concurrent: bool = False,
+        shared_ids: bool = True,
 ) -> NotesInMemoryRepository:
-    """Create a notes repository"""
+    """
+    Create a notes repository, concurrent ones may be shared by threads.
+
+    With ``shared_ids`` note ids are reserved in the data directory, so
+    sessions sharing the file never collide; without it nothing is written
+    until the repository is flushed.
+    """
 
     match serializer_type:
         case SerializerType.JSON:
@@ -27,19 +43,27 @@ def create_notes_repo(
             )
         case SerializerType.PICKLE:
             notes_serializer = PickleSerializer()
+        case SerializerType.INDEXED:
+            notes_serializer = IndexedNoteSerializer()
         case _:
             raise ValueError(f"Unknown serializer: {serializer_type}")
 
-    notes_file_storage = FileStorage[int, Note](filename, notes_serializer)
+    notes_file_storage = FileStorage[int, Note](
+        filename, notes_serializer, durability=durability, rekey=Note.with_id
+    )
 
-    return NotesInMemoryRepository(notes_file_storage)
+    return NotesInMemoryRepository(
+        notes_file_storage, concurrent, notes_file_storage if shared_ids else None
+    )
 
 
 def create_contacts_repo(
         filename: str,
-        serializer_type: SerializerType = SerializerType.PICKLE
+        serializer_type: SerializerType = SerializerType.PICKLE,
+        durability: Durability = Durability.ALWAYS,
+        concurrent: bool = False,
 ) -> ContactsInMemoryRepository:
-    """Create a contacts repository"""
+    """Create a contacts repository, concurrent ones may be shared by threads"""
 
     match serializer_type:
         case SerializerType.JSON:
@@ -52,6 +76,8 @@ def create_contacts_repo(
         case _:
             raise ValueError(f"Unknown serializer: {serializer_type}")
 
-    contacts_file_storage = FileStorage[str, Contact](filename, contacts_serializer)
+    contacts_file_storage = FileStorage[str, Contact](
+        filename, contacts_serializer, durability=durability
+    )
 
-    return ContactsInMemoryRepository(contacts_file_storage)
+    return ContactsInMemoryRepository(contacts_file_storage, concurrent)